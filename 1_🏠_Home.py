@@ -2,51 +2,35 @@
 # Import Library Needed
 # ------------------------------- | ------------------------------- | -------------------------------
 # Standard Library
-import os
+import functools
 import time
-import base64
 import datetime
-import json
 import pathlib
-from collections import Counter
-import warnings
 
 # Third-Party
+# NOTE: plotly diimport di dalam fungsi render_* (lazy) supaya dialog, sidebar & hero banner
+# tampil tanpa menunggu import plotting; geopandas/shapely hanya dimuat oleh utils.geo.
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from textwrap import dedent
-import seaborn as sns
-import geopandas as gpd
-import plotly.express as px
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
-from PIL import Image
 import streamlit as st
-import joblib
 
-# Silence warnings
-warnings.filterwarnings("ignore")
+# Local
+from utils import assets, backtest, clustering, data_loader, features, figure_cache, forecast_artifact, forecast_store, forecasting, geo, hotspot, panel, reconcile, regions, simulation, spatial, stability, startup, storage, timing, ui
 
-# Pandas display options
-pd.set_option("display.max_columns", None)
-# pd.set_option("display.max_rows", None)
-pd.set_option("display.float_format", lambda x: f"{x:.4f}")
-
-# Matplotlib defaults (optional)
-plt.style.use("default")  # or another style if desired
-
-# Seaborn defaults (optional)
-sns.set_theme(context="notebook", style="whitegrid")
+# Silence warnings & pandas display options (sekali per proses, bukan tiap rerun)
+startup.configure_once()
 
 
 # ------------------------------- | ------------------------------- | -------------------------------
 # Configuration Streamlit Web App
 # ------------------------------- | ------------------------------- | -------------------------------
 
-# Loading Image using PIL
-web_icon = Image.open('icon/Only LOGO.png') # Adding Image to web app
-st.set_page_config(page_title="NutriHealth AI Dashboard", layout="wide", initial_sidebar_state="auto", page_icon = web_icon)
+# Favicon PNG kecil hasil build aset (tanpa PIL.Image.open logo 3 MB di setiap rerun)
+st.set_page_config(page_title="NutriHealth AI Dashboard", layout="wide", initial_sidebar_state="auto", page_icon = assets.favicon_path())
+
+# Timer rerun ini: tiap section dibungkus timing.span(...) (overlay debug opt-in di sidebar)
+timing.begin_run()
 
 
 # ------------------------------- | ------------------------------- | -------------------------------
@@ -60,19 +44,16 @@ div[data-testid="stDialog"] hr { margin: 0px 0 !important; }   /* default ~1rem
 </style>
 """, unsafe_allow_html=True)
 
-# Fungsi encode image ke base64 agar bisa di-embed di HTML <img>
-def img_b64(path):
-    return base64.b64encode(pathlib.Path(path).read_bytes()).decode()
-
 # Dialog sambutan
 @st.dialog(" ")
 def welcome_dialog():
     
-    img64 = img_b64("icon/Only LOGO.png")  # pakai slash, hindari spasi kalau bisa
+    # Logo varian WebP 500 px (2× lebar tampil); static URL / base64 di-cache per proses
+    logo_html = assets.asset_html("logo", 250, alt="NutriHealth AI")
     st.markdown(
         f"""
         <div style="text-align:center;">
-            <img src="data:image/png;base64,{img64}" width="250"/>
+            {logo_html}
         </div>
         <h3 style='text-align:center; margin:0.5rem 0 0.75rem 0;'>
             NutriHealth AI: Generasi Emas 2045 Dashboard 🎉
@@ -141,19 +122,21 @@ def welcome_dialog():
 if "welcomed" not in st.session_state:
     welcome_dialog()
 else:
-    st.toast("Welcome back to NutriHealth AI!", icon="🎉")
-    time.sleep(0.5)
-    st.toast("Semoga harimu menyenangkan!" , icon="☀️")
-    time.sleep(0.5)
-    st.toast("Ayo jelajahi insight-nya!", icon="🚀")
+    # NOTE: sleep di sini memblokir seluruh rerun (±1 s) → ditandai lewat budget "welcome_toasts"
+    with timing.span("welcome_toasts"):
+        st.toast("Welcome back to NutriHealth AI!", icon="🎉")
+        time.sleep(0.5)
+        st.toast("Semoga harimu menyenangkan!" , icon="☀️")
+        time.sleep(0.5)
+        st.toast("Ayo jelajahi insight-nya!", icon="🚀")
     
 # ------------------------------- | ------------------------------- | -------------------------------
 # Sidebar Configuration — NutriHealth AI
 # ------------------------------- | ------------------------------- | -------------------------------
 
-with st.sidebar:
+with timing.span("sidebar"), st.sidebar:
     # Logo / GIF (opsional)
-    st.image("icon/Only LOGO.png", use_container_width=True)
+    st.markdown(assets.asset_html("logo", alt="NutriHealth AI"), unsafe_allow_html=True)
 
     # Informasi Dashboard (Sidebar)
     with st.sidebar.expander("ℹ️ Dashboard"):
@@ -174,48 +157,61 @@ with st.sidebar:
             """
         )
 
+    # Status cache data (hit/miss per dataset) — untuk memastikan rerun tidak membaca ulang disk
+    with st.sidebar.expander("🗄️ Cache Data"):
+        st.dataframe(data_loader.cache_stats(), use_container_width=True, hide_index=True)
+
+    # Overlay timing per section (opt-in; juga bisa via ?debug=timing)
+    st.toggle("⏱️ Debug timing", key="debug_timing")
+
 # ------------------------------- | ------------------------------- | -------------------------------
 # banner gambar sebagai hero image
 # ------------------------------- | ------------------------------- | -------------------------------
 
 # Menampilkan banner gambar sebagai hero image  ========================================
-st.image('source/Main Hero Banner.jpg', use_container_width=True)
+# (varian WebP/AVIF ±40 KB hasil `python -m utils.assets`, bukan JPG asli 3 MB)
+with timing.span("hero"):
+    st.markdown(assets.asset_html("hero", alt="NutriHealth AI — Generasi Emas 2045"), unsafe_allow_html=True)
 
 # ------------------------------- | ------------------------------- | -------------------------------
 # Isi dari Dashboard NutriHealth AI
 # # ------------------------------- | ------------------------------- | -------------------------------
 
-# CSS untuk memposisikan tabs di tengah
+# Custom CSS untuk sub-section title (dipakai semua tab → didefinisikan global)
 st.markdown("""
     <style>
-        div[data-baseweb="tab-list"] {
-            display: flex;
-            justify-content: center;
+        .sub-section-title {
+            text-align: center;
+            font-size: 24px;        /* lebih kecil dari sebelumnya */
+            font-weight: 600;
+            padding: 10px;          /* lebih tipis */
+            background-color: #88CD33; 
+            color: white;
+            border-radius: 6px;
+            margin-top: 15px;
+            margin-bottom: 15px;
         }
     </style>
 """, unsafe_allow_html=True)
 
-# Membuat Tabs untuk membagi tampilan menjadi beberapa section
-tab1, tab2, tab3 = st.tabs(["📈 EDA & Tren", "🔮 Forecasting Result", "🗺️ Clustering Maps"])
+# Tiap tab dibungkus fungsi render_*; hanya tab aktif yang dieksekusi (lihat dispatch di bawah)
 
 # -------------------------------------- Tab 1: EDA & Tren -------------------------------------- #
-with tab1:
-    # Custom CSS untuk sub-section title
-    st.markdown("""
-        <style>
-            .sub-section-title {
-                text-align: center;
-                font-size: 24px;        /* lebih kecil dari sebelumnya */
-                font-weight: 600;
-                padding: 10px;          /* lebih tipis */
-                background-color: #88CD33; 
-                color: white;
-                border-radius: 6px;
-                margin-top: 15px;
-                margin-bottom: 15px;
-            }
-        </style>
-    """, unsafe_allow_html=True)
+def render_eda_tab():
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    # ---- Filter region (panel kab/kota × bulan; default roll-up provinsi)
+    region_options = panel.regions()
+    region = st.selectbox(
+        "Wilayah", region_options, index=0, key="eda_region",
+        format_func=lambda r: f"{r} (provinsi)" if r == panel.PROVINCE else r,
+        help="Data kab/kota dibaca dari data/ABT_KabKota.csv bila tersedia; tanpa file itu hanya series provinsi.",
+    )
+
+    # Versi panel → bagian key cache figure (figure dibangun ulang hanya jika CSV berubah);
+    # region ikut jadi parameter key sehingga tiap wilayah punya figure sendiri
+    panel_version = panel.version()
 
 
     # ------------------------------- >>> Sub-section: Profil Tenaga Kesehatan & Layanan OBGYN ------------------------------- #
@@ -225,25 +221,25 @@ with tab1:
 
     st.markdown("<br>", unsafe_allow_html=True)
 
-    # Folder path
-    dataPath = os.path.join('data', 'ABT_Master.csv')
-    df = pd.read_csv(dataPath) # Load Data
-
-    df_cluster1 = df[[
-    "Date",
-    "Jumlah Bidan",
-    "Jumlah Perawat",
-    "Jumlah Dokter Umum",
-    "Jumlah Ahli Gizi",
-    "Layanan OBGYN"]]  
-    
-    df_cluster1['Date'] = pd.to_datetime(df_cluster1['Date'])
-
-    # Drop baris kosong tanpa overwrite df
-    cleaned_df = df_cluster1.dropna(how="all")
-    cleaned_df = cleaned_df.dropna(subset=["Jumlah Bidan", "Jumlah Perawat", "Jumlah Dokter Umum", "Jumlah Ahli Gizi"])
-    # --- Tambah kolom Tahun ---
-    cleaned_df["Year"] = pd.to_datetime(cleaned_df["Date"]).dt.year
+    # Load Data (Parquet bertipe, hanya kolom yang dipakai; Date sudah datetime)
+    with timing.span("data:panel.staff", "data"):
+        df_cluster1 = panel.region_frame(region, columns=[
+        "Date",
+        "Jumlah Bidan",
+        "Jumlah Perawat",
+        "Jumlah Dokter Umum",
+        "Jumlah Ahli Gizi",
+        "Layanan OBGYN"])  # tabel cache di-share lintas session → jangan dimutasi in-place
+
+    # Persiapan data (melt / pivot / corr) ada DI DALAM builder: saat figure cache hit, tidak ada
+    # transformasi yang dijalankan ulang. Frame bersama disiapkan lazy, sekali per rerun saat miss.
+    @functools.lru_cache(maxsize=None)
+    def staff_cleaned():
+        # Drop baris kosong tanpa overwrite df
+        cleaned_df = df_cluster1.dropna(how="all")
+        cleaned_df = cleaned_df.dropna(subset=["Jumlah Bidan", "Jumlah Perawat", "Jumlah Dokter Umum", "Jumlah Ahli Gizi"])
+        # --- Tambah kolom Tahun ---
+        return cleaned_df.assign(Year=cleaned_df["Date"].dt.year)
 
     # Membuat dua kolom untuk menampilkan informasi
     col1, col2 = st.columns([5, 5])  # Kolom pertama lebih kecil (5) dan kolom kedua lebih besar (5)
@@ -251,91 +247,117 @@ with tab1:
     # Kolom Kiri: Informasi Data dan Metric
     with col1:
         # --- [1.] Boxplot (Outlier Detection) ---
-        # Drop kolom Date biar hanya numerik yang diplot
-        df_box = df_cluster1.drop(columns=["Date"], errors="ignore")
-        fig, ax = plt.subplots(figsize=(10, 8))
-        sns.boxplot(data=df_box, ax=ax)
-
-        ax.set_title("Boxplot Variabel Tenaga Kesehatan & Layanan", fontsize=25, pad=22, fontweight="bold")
-        ax.set_xticklabels(ax.get_xticklabels(), rotation=0, ha='center')
+        def build_staff_boxplot():
+            # Drop kolom Date biar hanya numerik yang diplot
+            df_box = df_cluster1.drop(columns=["Date"], errors="ignore")
+
+            # Plotly (bukan matplotlib/seaborn): ikut figure cache & tidak ada figure yang bocor di server
+            fig = px.box(
+                df_box.melt(var_name="Variabel", value_name="Nilai"),
+                x="Variabel",
+                y="Nilai",
+                color="Variabel",
+                points="outliers",   # tampilkan outlier
+                title="Boxplot Variabel Tenaga Kesehatan & Layanan"
+            )
+            fig.update_layout(
+                title=dict(
+                    text="Boxplot Variabel Tenaga Kesehatan & Layanan",
+                    x=0.5, xanchor="center",
+                    font=dict(size=18)
+                ),
+                xaxis=dict(title="", tickangle=0),
+                yaxis_title="Jumlah",
+                showlegend=False,
+                margin=dict(t=70, l=40, r=20, b=40),
+                height=600
+            )
+            return fig
 
-        st.pyplot(fig)
+        fig = figure_cache.cached_figure("eda.staff_boxplot", panel_version, build_staff_boxplot, region=region)
+        st.plotly_chart(fig, use_container_width=True)
             
         
         
         # --- [3.] Tren Jumlah Tenaga Kesehatan ---
         
-        # Tentukan kolom tenaga kesehatan
-        cols = ["Jumlah Bidan", "Jumlah Perawat", "Jumlah Dokter Umum", "Jumlah Ahli Gizi"]
+        def build_staff_trend():
+            # Tentukan kolom tenaga kesehatan
+            cols = ["Jumlah Bidan", "Jumlah Perawat", "Jumlah Dokter Umum", "Jumlah Ahli Gizi"]
+
+            # Ubah ke long format
+            df_long = staff_cleaned().melt(
+                id_vars="Date",
+                value_vars=cols,
+                var_name="Tenaga Kesehatan",
+                value_name="Jumlah"
+            )
 
-        # Ubah ke long format
-        df_long = cleaned_df.melt(
-            id_vars="Date",
-            value_vars=cols,
-            var_name="Tenaga Kesehatan",
-            value_name="Jumlah"
-        )
+            # Buat line chart satu figure
+            fig = px.line(
+                df_long,
+                x="Date",
+                y="Jumlah",
+                color="Tenaga Kesehatan",
+                markers=True,
+                title="Tren Jumlah Tenaga Kesehatan"
+            )
 
-        # Buat line chart satu figure
-        fig = px.line(
-            df_long,
-            x="Date",
-            y="Jumlah",
-            color="Tenaga Kesehatan",
-            markers=True,
-            title="Tren Jumlah Tenaga Kesehatan"
-        )
+            # Title & legend: center, no overlap
+            fig.update_layout(
+                title=dict(
+                    text="Tren Jumlah Tenaga Kesehatan",
+                    x=0.5, xanchor="center",
+                    y=1, yanchor="top",         # judul sedikit di bawah tepi atas
+                    font=dict(size=18)
+                ),
+                legend=dict(
+                    orientation="h",
+                    x=0.5, xanchor="center",
+                    y=1.00, yanchor="bottom"       # legend di atas area plot, di bawah judul
+                ),
+                margin=dict(t=90),                # ruang atas cukup
+                xaxis_title="Tanggal",
+                yaxis_title="Jumlah",
+                xaxis=dict(tickangle=45),
+                height=600
+            )
+            return fig
 
-        # Title & legend: center, no overlap
-        fig.update_layout(
-            title=dict(
-                text="Tren Jumlah Tenaga Kesehatan",
-                x=0.5, xanchor="center",
-                y=1, yanchor="top",         # judul sedikit di bawah tepi atas
-                font=dict(size=18)
-            ),
-            legend=dict(
-                orientation="h",
-                x=0.5, xanchor="center",
-                y=1.00, yanchor="bottom"       # legend di atas area plot, di bawah judul
-            ),
-            margin=dict(t=90),                # ruang atas cukup
-            xaxis_title="Tanggal",
-            yaxis_title="Jumlah",
-            xaxis=dict(tickangle=45),
-            height=600
-        )
+        fig = figure_cache.cached_figure("eda.staff_trend", panel_version, build_staff_trend, region=region)
 
         st.plotly_chart(fig, use_container_width=True)
         
-        # Tambahkan kolom Year dan Month
-        df_cluster1["Year"] = df_cluster1["Date"].dt.year
-        df_cluster1["Month"] = df_cluster1["Date"].dt.month
-
-        # Pivot tabel
-        pivot = df_cluster1.pivot_table(values="Layanan OBGYN", index="Year", columns="Month", aggfunc="mean")
+        def build_obgyn_heatmap():
+            # Tambahkan kolom Year dan Month, lalu pivot tabel
+            pivot = df_cluster1.assign(
+                Year=df_cluster1["Date"].dt.year, Month=df_cluster1["Date"].dt.month
+            ).pivot_table(values="Layanan OBGYN", index="Year", columns="Month", aggfunc="mean")
+
+            # Plot heatmap interaktif
+            fig = px.imshow(
+                pivot,
+                text_auto=".0f",                  # tampilkan angka rata-rata
+                aspect="auto",
+                color_continuous_scale="YlOrRd",  # sama seperti seaborn
+                title="Heatmap Rata-rata Layanan OBGYN (Tahun vs Bulan)"
+            )
 
-        # Plot heatmap interaktif
-        fig = px.imshow(
-            pivot,
-            text_auto=".0f",                  # tampilkan angka rata-rata
-            aspect="auto",
-            color_continuous_scale="YlOrRd",  # sama seperti seaborn
-            title="Heatmap Rata-rata Layanan OBGYN (Tahun vs Bulan)"
-        )
+            # Styling title & axis
+            fig.update_layout(
+                title=dict(
+                    text="Heatmap Rata-rata Layanan OBGYN<br>(Tahun vs Bulan)",
+                    x=0.5, xanchor="center",
+                    y=0.97, yanchor="top",
+                    font=dict(size=18)
+                ),
+                xaxis_title="Bulan",
+                yaxis_title="Tahun",
+                margin=dict(t=60)
+            )
+            return fig
 
-        # Styling title & axis
-        fig.update_layout(
-            title=dict(
-                text="Heatmap Rata-rata Layanan OBGYN<br>(Tahun vs Bulan)",
-                x=0.5, xanchor="center",
-                y=0.97, yanchor="top",
-                font=dict(size=18)
-            ),
-            xaxis_title="Bulan",
-            yaxis_title="Tahun",
-            margin=dict(t=60)
-        )
+        fig = figure_cache.cached_figure("eda.obgyn_heatmap", panel_version, build_obgyn_heatmap, region=region)
 
         # Tampilkan di Streamlit
         st.plotly_chart(fig, use_container_width=True)
@@ -346,99 +368,107 @@ with tab1:
     with col2:
         # --- [2.] Rata-rata Jumlah Tenaga Kesehatan per Tahun ---
         
-        # --- Hitung rata-rata per tahun ---
-        avg_yearly = (
-            cleaned_df.groupby("Year")[["Jumlah Bidan", "Jumlah Perawat",
-                                        "Jumlah Dokter Umum", "Jumlah Ahli Gizi"]]
-            .mean()
-            .reset_index()
-        )
+        def build_staff_yearly_avg():
+            # --- Hitung rata-rata per tahun ---
+            avg_yearly = (
+                staff_cleaned().groupby("Year")[["Jumlah Bidan", "Jumlah Perawat",
+                                                 "Jumlah Dokter Umum", "Jumlah Ahli Gizi"]]
+                .mean()
+                .reset_index()
+            )
 
-        # --- Ubah ke long format biar cocok untuk Plotly ---
-        avg_long = avg_yearly.melt(
-            id_vars="Year",
-            value_vars=["Jumlah Bidan", "Jumlah Perawat", "Jumlah Dokter Umum", "Jumlah Ahli Gizi"],
-            var_name="Tenaga Kesehatan",
-            value_name="Rata-rata"
-        )
+            # --- Ubah ke long format biar cocok untuk Plotly ---
+            avg_long = avg_yearly.melt(
+                id_vars="Year",
+                value_vars=["Jumlah Bidan", "Jumlah Perawat", "Jumlah Dokter Umum", "Jumlah Ahli Gizi"],
+                var_name="Tenaga Kesehatan",
+                value_name="Rata-rata"
+            )
 
-        # --- Plot Barchart ---
-        fig = px.bar(
-            avg_long,
-            x="Year",
-            y="Rata-rata",
-            color="Tenaga Kesehatan",
-            barmode="group",
-            text="Rata-rata",
-            title="Rata-rata Jumlah Tenaga Kesehatan per Tahun"
-        )
+            # --- Plot Barchart ---
+            fig = px.bar(
+                avg_long,
+                x="Year",
+                y="Rata-rata",
+                color="Tenaga Kesehatan",
+                barmode="group",
+                text="Rata-rata",
+                title="Rata-rata Jumlah Tenaga Kesehatan per Tahun"
+            )
 
-        # Atur tampilan teks & layout
-        fig.update_traces(texttemplate="%{text:.0f}", textposition="outside")
-        fig.update_layout(
-            title=dict(
-                text="Rata-rata Jumlah Tenaga Kesehatan per Tahun",
-                x=0.5,                # rata tengah
-                xanchor="center",
-                y=1,               # geser judul lebih ke bawah
-                yanchor="top",
-                font=dict(size=18)
-            ),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.00,               # geser legend lebih ke atas
-                xanchor="center",
-                x=0.5
-            ),
-            margin=dict(t=90)        # tambah ruang atas supaya gak tabrakan
-        )
+            # Atur tampilan teks & layout
+            fig.update_traces(texttemplate="%{text:.0f}", textposition="outside")
+            fig.update_layout(
+                title=dict(
+                    text="Rata-rata Jumlah Tenaga Kesehatan per Tahun",
+                    x=0.5,                # rata tengah
+                    xanchor="center",
+                    y=1,               # geser judul lebih ke bawah
+                    yanchor="top",
+                    font=dict(size=18)
+                ),
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.00,               # geser legend lebih ke atas
+                    xanchor="center",
+                    x=0.5
+                ),
+                margin=dict(t=90)        # tambah ruang atas supaya gak tabrakan
+            )
+            return fig
+
+        fig = figure_cache.cached_figure("eda.staff_yearly_avg", panel_version, build_staff_yearly_avg, region=region)
         # Tampilkan di Streamlit
         st.plotly_chart(fig, use_container_width=True)
 
 
         # --- [4.] Tren Layanan OBGYN (Asli vs Rolling 3 Bulan) ---
         
-        # Rolling Mean Layanan OBGYN 
-        df_plot = df_cluster1[["Date", "Layanan OBGYN"]].copy()
-        df_plot["Rolling 3 Bulan"] = df_plot["Layanan OBGYN"].rolling(window=3).mean()
+        def build_obgyn_rolling():
+            # Rolling Mean Layanan OBGYN
+            df_plot = df_cluster1[["Date", "Layanan OBGYN"]].copy()
+            df_plot["Rolling 3 Bulan"] = df_plot["Layanan OBGYN"].rolling(window=3).mean()
+
+            # Ubah ke long format supaya bisa multi-line di plotly express
+            df_long = df_plot.melt(
+                id_vars="Date",
+                value_vars=["Layanan OBGYN", "Rolling 3 Bulan"],
+                var_name="Series",
+                value_name="Jumlah"
+            )
 
-        # Ubah ke long format supaya bisa multi-line di plotly express
-        df_long = df_plot.melt(
-            id_vars="Date",
-            value_vars=["Layanan OBGYN", "Rolling 3 Bulan"],
-            var_name="Series",
-            value_name="Jumlah"
-        )
+            # Plot
+            fig = px.line(
+                df_long,
+                x="Date",
+                y="Jumlah",
+                color="Series",
+                markers=True,
+                title="Tren Layanan OBGYN (Asli vs Rolling 3 Bulan)"
+            )
 
-        # Plot
-        fig = px.line(
-            df_long,
-            x="Date",
-            y="Jumlah",
-            color="Series",
-            markers=True,
-            title="Tren Layanan OBGYN (Asli vs Rolling 3 Bulan)"
-        )
+            # Styling title & legend
+            fig.update_layout(
+                title=dict(
+                    text="Tren Layanan OBGYN (Asli vs Rolling 3 Bulan)",
+                    x=0.5, xanchor="center",
+                    y=1, yanchor="top",
+                    font=dict(size=18)
+                ),
+                legend=dict(
+                    orientation="h",
+                    x=0.5, xanchor="center",
+                    y=1.00, yanchor="bottom"   # legend di atas plot, tidak tabrakan dengan title
+                ),
+                margin=dict(t=80),            # kasih ruang supaya title & legend gak tabrakan
+                xaxis_title="Tanggal",
+                yaxis_title="Jumlah",
+                height=500
+            )
+            return fig
 
-        # Styling title & legend
-        fig.update_layout(
-            title=dict(
-                text="Tren Layanan OBGYN (Asli vs Rolling 3 Bulan)",
-                x=0.5, xanchor="center",
-                y=1, yanchor="top",
-                font=dict(size=18)
-            ),
-            legend=dict(
-                orientation="h",
-                x=0.5, xanchor="center",
-                y=1.00, yanchor="bottom"   # legend di atas plot, tidak tabrakan dengan title
-            ),
-            margin=dict(t=80),            # kasih ruang supaya title & legend gak tabrakan
-            xaxis_title="Tanggal",
-            yaxis_title="Jumlah",
-            height=500
-        )
+        fig = figure_cache.cached_figure("eda.obgyn_rolling", panel_version, build_obgyn_rolling, region=region)
 
         # Tampilkan di Streamlit
         st.plotly_chart(fig, use_container_width=True)
@@ -447,28 +477,32 @@ with tab1:
         # --- [6.] Correlation Matrix Antar Variabel ---
 
 
-        # Hitung korelasi (drop kolom Date)
-        corr = df_cluster1.drop(columns=["Date"], errors="ignore").corr()
+        def build_staff_corr():
+            # Hitung korelasi (drop kolom Date)
+            corr = df_cluster1.drop(columns=["Date"], errors="ignore").corr()
 
-        # Plot heatmap interaktif
-        fig = px.imshow(
-            corr,
-            text_auto=".2f",        # tampilkan nilai korelasi
-            aspect="auto",
-            color_continuous_scale="RdBu",
-            zmin=-1, zmax=1,
-        )
+            # Plot heatmap interaktif
+            fig = px.imshow(
+                corr,
+                text_auto=".2f",        # tampilkan nilai korelasi
+                aspect="auto",
+                color_continuous_scale="RdBu",
+                zmin=-1, zmax=1,
+            )
 
-        # Styling title
-        fig.update_layout(
-            title=dict(
-                text="Correlation Matrix Antar Variabel",
-                x=0.5, xanchor="center",
-                y=0.97, yanchor="top",
-                font=dict(size=18)
-            ),
-            margin=dict(t=60)
-        )
+            # Styling title
+            fig.update_layout(
+                title=dict(
+                    text="Correlation Matrix Antar Variabel",
+                    x=0.5, xanchor="center",
+                    y=0.97, yanchor="top",
+                    font=dict(size=18)
+                ),
+                margin=dict(t=60)
+            )
+            return fig
+
+        fig = figure_cache.cached_figure("eda.staff_corr", panel_version, build_staff_corr, region=region)
 
         # Tampilkan di Streamlit
         st.plotly_chart(fig, use_container_width=True)
@@ -477,76 +511,79 @@ with tab1:
     # ------------------------------- >>> Sub-section: Outcome Kesehatan Ibu & Anak ------------------------------- #
     st.markdown('<div class="sub-section-title">👩‍🍼 Outcome Kesehatan Ibu & Anak</div>', unsafe_allow_html=True)
 
-    df_cluster2 = df[["Date","Persentase_ASI", "Rasio_BBLR", "Rasio_AKI", "Rasio_AKB"]] 
-    df_cluster2['Date'] = pd.to_datetime(df_cluster2['Date'], errors="coerce") # --- 1. Tipe data datetime ---
+    with timing.span("data:panel.mnch", "data"):
+        df_cluster2 = panel.region_frame(region, columns=["Date","Persentase_ASI", "Rasio_BBLR", "Rasio_AKI", "Rasio_AKB"])
 
     TARGET_ASI = 0.80 # operasional: ≥80% Realistis naik dari baseline 2024 (78,8%) → dorongan +1,2 pp masih “make sense”. “…cakupan ASI eksklusif… mencapai 78,8% (2024).”
-    df_cluster2["ASI_gap_target"] = df_cluster2["Persentase_ASI"] - TARGET_ASI # seberapa jauh dari target ASI eksklusif (positif = on track)
-    
+
     # --- [10.] Line Chart (Rasio AKI dan Rasio AKB) & (Persentase ASI dan Rasio BBLR) ---
 
-    # --- Siapkan data ---
-    df_plot = df_cluster2.copy()
-    df_plot["Date"] = pd.to_datetime(df_plot["Date"], errors="coerce")
+    def build_mnch_asi_bblr():
+        # Long format untuk figure ini
+        long_asi_bblr = df_cluster2.melt(
+            id_vars="Date",
+            value_vars=["Persentase_ASI", "Rasio_BBLR"],
+            var_name="Variabel",
+            value_name="Nilai"
+        )
 
-    # Long format untuk masing-masing figure
-    long_asi_bblr = df_plot.melt(
-        id_vars="Date",
-        value_vars=["Persentase_ASI", "Rasio_BBLR"],
-        var_name="Variabel",
-        value_name="Nilai"
-    )
+        # --- Figure 1: Persentase_ASI & Rasio_BBLR (warna biru-hijau) ---
+        fig_asi_bblr = px.line(
+            long_asi_bblr,
+            x="Date", y="Nilai", color="Variabel",
+            markers=True,
+            title="Persentase ASI & Rasio BBLR",
+            color_discrete_map={
+            "Persentase_ASI": "#0b6aae",  # biru tua
+            "Rasio_BBLR": "#78bbe1"       # biru muda
+            }
+        )
+        fig_asi_bblr.update_layout(
+            title=dict(text="Persentase ASI & Rasio BBLR", x=0.32, y=0.98, font=dict(size=20)),
+            legend=dict(orientation="h", x=0.5, xanchor="center", y=1.10, yanchor="bottom"),
+            margin=dict(t=110, l=40, r=20, b=40),
+            xaxis_title="Tanggal",
+            yaxis_title="Nilai",
+            hovermode="x unified",
+            height=500
+        )
+        fig_asi_bblr.update_xaxes(tickangle=45)
+        return fig_asi_bblr
 
-    long_aki_akb = df_plot.melt(
-        id_vars="Date",
-        value_vars=["Rasio_AKI", "Rasio_AKB"],
-        var_name="Variabel",
-        value_name="Nilai"
-    )
+    fig_asi_bblr = figure_cache.cached_figure("eda.mnch_asi_bblr", panel_version, build_mnch_asi_bblr, region=region)
 
-    # --- Figure 1: Persentase_ASI & Rasio_BBLR (warna biru-hijau) ---
-    fig_asi_bblr = px.line(
-        long_asi_bblr,
-        x="Date", y="Nilai", color="Variabel",
-        markers=True,
-        title="Persentase ASI & Rasio BBLR",
-        color_discrete_map={
-        "Persentase_ASI": "#0b6aae",  # biru tua
-        "Rasio_BBLR": "#78bbe1"       # biru muda
-        }
-    )
-    fig_asi_bblr.update_layout(
-        title=dict(text="Persentase ASI & Rasio BBLR", x=0.32, y=0.98, font=dict(size=20)),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=1.10, yanchor="bottom"),
-        margin=dict(t=110, l=40, r=20, b=40),
-        xaxis_title="Tanggal",
-        yaxis_title="Nilai",
-        hovermode="x unified",
-        height=500
-    )
-    fig_asi_bblr.update_xaxes(tickangle=45)
-
-    # --- Figure 2: Rasio_AKI & Rasio_AKB (warna oranye-merah) ---
-    fig_aki_akb = px.line(
-        long_aki_akb,
-        x="Date", y="Nilai", color="Variabel",
-        markers=True,
-        title="Rasio AKI & Rasio AKB",
-        color_discrete_map={
-        "Rasio_AKI": "#ff7f0e",  # oranye tua
-        "Rasio_AKB": "#fdae6b"   # oranye muda
-        }
-    )
-    fig_aki_akb.update_layout(
-        title=dict(text="Rasio AKI & Rasio AKB", x=0.32, y=0.98, font=dict(size=20)),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=1.10, yanchor="bottom"),
-        margin=dict(t=110, l=40, r=20, b=40),
-        xaxis_title="Tanggal",
-        yaxis_title="Nilai",
-        hovermode="x unified",
-        height=500
-    )
-    fig_aki_akb.update_xaxes(tickangle=45)
+    def build_mnch_aki_akb():
+        long_aki_akb = df_cluster2.melt(
+            id_vars="Date",
+            value_vars=["Rasio_AKI", "Rasio_AKB"],
+            var_name="Variabel",
+            value_name="Nilai"
+        )
+
+        # --- Figure 2: Rasio_AKI & Rasio_AKB (warna oranye-merah) ---
+        fig_aki_akb = px.line(
+            long_aki_akb,
+            x="Date", y="Nilai", color="Variabel",
+            markers=True,
+            title="Rasio AKI & Rasio AKB",
+            color_discrete_map={
+            "Rasio_AKI": "#ff7f0e",  # oranye tua
+            "Rasio_AKB": "#fdae6b"   # oranye muda
+            }
+        )
+        fig_aki_akb.update_layout(
+            title=dict(text="Rasio AKI & Rasio AKB", x=0.32, y=0.98, font=dict(size=20)),
+            legend=dict(orientation="h", x=0.5, xanchor="center", y=1.10, yanchor="bottom"),
+            margin=dict(t=110, l=40, r=20, b=40),
+            xaxis_title="Tanggal",
+            yaxis_title="Nilai",
+            hovermode="x unified",
+            height=500
+        )
+        fig_aki_akb.update_xaxes(tickangle=45)
+        return fig_aki_akb
+
+    fig_aki_akb = figure_cache.cached_figure("eda.mnch_aki_akb", panel_version, build_mnch_aki_akb, region=region)
 
     # --- Tampilkan berdampingan di Streamlit ---
     c1, c2 = st.columns(2)
@@ -558,33 +595,40 @@ with tab1:
 
     # --- [11.] Scatter (Persentase_ASI vs Rasio_AKI) & (Persentase_ASI vs Rasio_AKB) ---
     
-    # Ambil min dan max Persentase_ASI
+    # Batas bawah sumbu Persentase_ASI (batas atas = max data, dihitung di builder)
     x_min = 0.65
-    x_max = df_cluster2["Persentase_ASI"].max()
 
-    # --- Scatter Persentase_ASI vs Rasio_AKI ---
-    fig1 = px.scatter(
-        df_cluster2, x="Persentase_ASI", y="Rasio_AKI",
-        trendline="ols", trendline_color_override="red",
-        title="Persentase ASI vs Rasio AKI"
-    )
-    fig1.update_layout(
-        title=dict(text="Persentase ASI vs Rasio AKI", x=0.4, font=dict(size=20)),
-        xaxis_title="Persentase ASI", yaxis_title="Rasio AKI", height=400
-    )
-    fig1.update_xaxes(range=[x_min * 0.98, x_max * 1.02])  # kasih padding 2%
+    def build_mnch_asi_vs_aki():
+        # --- Scatter Persentase_ASI vs Rasio_AKI ---
+        fig1 = px.scatter(
+            df_cluster2, x="Persentase_ASI", y="Rasio_AKI",
+            trendline="ols", trendline_color_override="red",
+            title="Persentase ASI vs Rasio AKI"
+        )
+        fig1.update_layout(
+            title=dict(text="Persentase ASI vs Rasio AKI", x=0.4, font=dict(size=20)),
+            xaxis_title="Persentase ASI", yaxis_title="Rasio AKI", height=400
+        )
+        fig1.update_xaxes(range=[x_min * 0.98, df_cluster2["Persentase_ASI"].max() * 1.02])  # kasih padding 2%
+        return fig1
 
-    # --- Scatter Persentase_ASI vs Rasio_AKB ---
-    fig2 = px.scatter(
-        df_cluster2, x="Persentase_ASI", y="Rasio_AKB",
-        trendline="ols", trendline_color_override="red",
-        title="Persentase ASI vs Rasio AKB"
-    )
-    fig2.update_layout(
-        title=dict(text="Persentase ASI vs Rasio AKB", x=0.4, font=dict(size=20)),
-        xaxis_title="Persentase ASI", yaxis_title="Rasio AKB", height=400
-    )
-    fig2.update_xaxes(range=[x_min * 0.98, x_max * 1.02])  # sama padding
+    fig1 = figure_cache.cached_figure("eda.mnch_asi_vs_aki", panel_version, build_mnch_asi_vs_aki, region=region)
+
+    def build_mnch_asi_vs_akb():
+        # --- Scatter Persentase_ASI vs Rasio_AKB ---
+        fig2 = px.scatter(
+            df_cluster2, x="Persentase_ASI", y="Rasio_AKB",
+            trendline="ols", trendline_color_override="red",
+            title="Persentase ASI vs Rasio AKB"
+        )
+        fig2.update_layout(
+            title=dict(text="Persentase ASI vs Rasio AKB", x=0.4, font=dict(size=20)),
+            xaxis_title="Persentase ASI", yaxis_title="Rasio AKB", height=400
+        )
+        fig2.update_xaxes(range=[x_min * 0.98, df_cluster2["Persentase_ASI"].max() * 1.02])  # sama padding
+        return fig2
+
+    fig2 = figure_cache.cached_figure("eda.mnch_asi_vs_akb", panel_version, build_mnch_asi_vs_akb, region=region)
 
     # --- Tampilkan di Streamlit ---
     c1, c2 = st.columns(2)
@@ -595,112 +639,103 @@ with tab1:
 
 
 
-    fig_gap = px.histogram(
-        df_cluster2,
-        x="ASI_gap_target",
-        nbins=20,
-        title="Distribusi ASI_gap_target (ASI − 0.80)"
-    )
-    fig_gap.add_shape(
-        type="line",
-        x0=0, x1=0, y0=0, y1=1,
-        xref="x", yref="paper",
-        line=dict(color="red", width=2, dash="dash")
-    )
-    fig_gap.add_annotation(x=0, y=1, yref="paper", text="On target (gap=0)", showarrow=False, yshift=12, font=dict(color="red"))
-    fig_gap.update_layout(title=dict(text="Distribusi ASI_gap_target (ASI − 0.80)", x=0.35, font=dict(size=18)),
-                        xaxis_title="Gap terhadap Target", yaxis_title="Frekuensi", margin=dict(t=90))
+    def build_mnch_asi_gap():
+        # seberapa jauh dari target ASI eksklusif (positif = on track)
+        df_gap = df_cluster2.assign(ASI_gap_target=df_cluster2["Persentase_ASI"] - TARGET_ASI)
+        fig_gap = px.histogram(
+            df_gap,
+            x="ASI_gap_target",
+            nbins=20,
+            title="Distribusi ASI_gap_target (ASI − 0.80)"
+        )
+        fig_gap.add_shape(
+            type="line",
+            x0=0, x1=0, y0=0, y1=1,
+            xref="x", yref="paper",
+            line=dict(color="red", width=2, dash="dash")
+        )
+        fig_gap.add_annotation(x=0, y=1, yref="paper", text="On target (gap=0)", showarrow=False, yshift=12, font=dict(color="red"))
+        fig_gap.update_layout(title=dict(text="Distribusi ASI_gap_target (ASI − 0.80)", x=0.35, font=dict(size=18)),
+                            xaxis_title="Gap terhadap Target", yaxis_title="Frekuensi", margin=dict(t=90))
+        return fig_gap
+
+    fig_gap = figure_cache.cached_figure("eda.mnch_asi_gap", panel_version, build_mnch_asi_gap, region=region)
 
     st.plotly_chart(fig_gap, use_container_width=True)
 
     # ------------------------------- >>> Sub-section: Kapasitas & Mutu Layanan Rumah Sakit ------------------------------- #
     st.markdown('<div class="sub-section-title">🏨 Kapasitas & Mutu Layanan Rumah Sakit</div>', unsafe_allow_html=True)
 
-    df_cluster3 = df[["Date","AVLOS (Day)", "BOR (%)", "GDR (/K)", "NDR (/K)", "TOI (Day)"]] 
-    df_cluster3['Date'] = pd.to_datetime(df_cluster3['Date'], errors="coerce") # --- 1. Tipe data datetime ---
-    df_cluster3 = df_cluster3.dropna() # --- 2. Drop baris kosong ---
-    df_cluster3 = df_cluster3.reset_index(drop=True) # --- 3. Reset indeks ---
-    df_cluster3["Year"] = df_cluster3["Date"].dt.year # --- 4. Tambah kolom Tahun ---
-    
-    # # Feature Engineering: bikin fitur-fitur bulanan yang bermakna untuk analisis/monitoring RS (tanpa lag/rolling)
-    df_cluster3['days_in_month'] = df_cluster3['Date'].dt.days_in_month # panjang bulan (28–31) untuk normalisasi/perbandingan adil
-    # # --- Operasional bed / aliran pasien ---
-    df_cluster3['HI'] = df_cluster3['AVLOS (Day)'] + df_cluster3['TOI (Day)'] # Hospitalization Interval: lama siklus bed (dirawat + jeda)
-    # NOTE: jika ada risiko pembagian nol, tambahkan epsilon kecil di penyebut (opsional)
-    df_cluster3['BTO_month'] = df_cluster3['days_in_month'] / (df_cluster3['HI']) # Bed Turnover per bulan: berapa kali 1 bed “berputar”/bulan
-    df_cluster3['IdleShare'] = 1 - df_cluster3['BOR (%)']/100.0 # porsi bed menganggur (1 - occupancy)
-    # --- Mortalitas rawat inap ---
-    df_cluster3['EDR'] = np.maximum(0, df_cluster3['GDR (/K)'] - df_cluster3['NDR (/K)']) # Early-Death Component ≈ kematian <48 jam (triase/emergency)
-
-    # --- Kategori manajerial ---
-    def bor_status(x):
-        # Kategori utilisasi bed: <60% under, 60–85% optimal, >85% saturated
-        if np.isnan(x): return np.nan
-        if x < 60: return 'under-utilized'
-        if x <= 80: return 'optimal'
-        return 'saturated'
-
-    def toi_status(x):
-        # Kategori interval jeda antar pasien: <1 hari cepat, 1–3 sehat, >3 lambat
-        if np.isnan(x): return np.nan
-        if x < 1: return 'cepat'
-        if x <= 3: return 'sehat'
-        return 'lambat'
-
-    df_cluster3['BOR_status'] = df_cluster3['BOR (%)'].apply(bor_status)      # label utilisasi tempat tidur
-    df_cluster3['TOI_status'] = df_cluster3['TOI (Day)'].apply(toi_status)    # label kecepatan turnover bed
-    df_cluster3['Capacity_alert'] = ((df_cluster3['BOR (%)'] > 80) &          # alert kapasitas: bed padat + jeda sangat cepat
-                            (df_cluster3['TOI (Day)'] < 1)).astype(int)
+    with timing.span("data:panel.capacity", "data"):
+        df_cluster3 = panel.region_frame(region, columns=["Date","AVLOS (Day)", "BOR (%)", "GDR (/K)", "NDR (/K)", "TOI (Day)"])
+
+    # Dipanggil hanya dari builder (figure cache miss), sekali per rerun
+    @functools.lru_cache(maxsize=None)
+    def capacity_frame():
+        with timing.span("features:capacity", "features"):
+            df = df_cluster3.dropna() # --- 2. Drop baris kosong ---
+            df = df.reset_index(drop=True) # --- 3. Reset indeks ---
+            df["Year"] = df["Date"].dt.year # --- 4. Tambah kolom Tahun ---
+
+            # Feature Engineering (utils.features, vectorized): HI, BTO_month, IdleShare, EDR,
+            # BOR_status / TOI_status (categorical dari kode bin) & Capacity_alert — aman untuk HI = 0 / NaN
+            return features.add_capacity_features(df)
 
 
     # --- [7.] Distribusi Kategori (BOR_status, TOI_status, Capacity_alert) ---
     cat_cols = ["BOR_status", "TOI_status", "Capacity_alert"]
 
-    # Siapkan figure: 1 baris, 3 kolom
-    fig = make_subplots(
-        rows=1, cols=3,
-        subplot_titles=[f"Distribusi {c}" for c in cat_cols]
-    )
+    def build_capacity_categories():
+        from plotly.subplots import make_subplots
 
-    # Tambahkan bar chart per kolom kategori
-    for i, col in enumerate(cat_cols, start=1):
-        counts = df_cluster3[col].value_counts(dropna=False).sort_index()
-        x_vals = [str(x) for x in counts.index]  # pastikan string (termasuk NaN -> 'nan')
-        y_vals = counts.values
-
-        fig.add_trace(
-            go.Bar(
-                x=x_vals,
-                y=y_vals,
-                text=y_vals,
-                textposition="outside",
-                hovertemplate=col + ": %{x}<br>Count: %{y}<extra></extra>",
-                showlegend=False
-            ),
-            row=1, col=i
+        # Siapkan figure: 1 baris, 3 kolom
+        fig = make_subplots(
+            rows=1, cols=3,
+            subplot_titles=[f"Distribusi {c}" for c in cat_cols]
         )
 
-        # Estetika sumbu X tiap subplot
-        fig.update_xaxes(
-            title_text=col,
-            tickangle=0,
-            categoryorder="array",
-            categoryarray=x_vals,   # urut sesuai index sort
-            row=1, col=i
+        # Tambahkan bar chart per kolom kategori
+        for i, col in enumerate(cat_cols, start=1):
+            counts = capacity_frame()[col].value_counts(dropna=False).sort_index()
+            x_vals = [str(x) for x in counts.index]  # pastikan string (termasuk NaN -> 'nan')
+            y_vals = counts.values
+
+            fig.add_trace(
+                go.Bar(
+                    x=x_vals,
+                    y=y_vals,
+                    text=y_vals,
+                    textposition="outside",
+                    hovertemplate=col + ": %{x}<br>Count: %{y}<extra></extra>",
+                    showlegend=False
+                ),
+                row=1, col=i
+            )
+
+            # Estetika sumbu X tiap subplot
+            fig.update_xaxes(
+                title_text=col,
+                tickangle=0,
+                categoryorder="array",
+                categoryarray=x_vals,   # urut sesuai index sort
+                row=1, col=i
+            )
+
+        # Layout umum
+        fig.update_layout(
+            title=dict(
+                text="Distribusi Kategori (BOR_status, TOI_status, Capacity_alert)",
+                x=0.5, xanchor="center",
+                y=0.95, yanchor="top",
+                font=dict(size=20)
+            ),
+            height=450,
+            margin=dict(t=90, l=40, r=20, b=40),
+            bargap=0.25,
         )
+        return fig
 
-    # Layout umum
-    fig.update_layout(
-        title=dict(
-            text="Distribusi Kategori (BOR_status, TOI_status, Capacity_alert)",
-            x=0.5, xanchor="center",
-            y=0.95, yanchor="top",
-            font=dict(size=20)
-        ),
-        height=450,
-        margin=dict(t=90, l=40, r=20, b=40),
-        bargap=0.25,
-    )
+    fig = figure_cache.cached_figure("eda.capacity_categories", panel_version, build_capacity_categories, region=region)
 
     # Tampilkan di Streamlit
     st.plotly_chart(fig, use_container_width=True)
@@ -709,88 +744,98 @@ with tab1:
     
     numeric_cols = ["AVLOS (Day)", "BOR (%)", "GDR (/K)", "NDR (/K)",
                 "TOI (Day)", "HI", "BTO_month", "IdleShare", "EDR"]
-    
-    # Hitung korelasi
-    corr = df_cluster3[numeric_cols].corr()
-
-    # Plot heatmap dengan Plotly Express
-    fig = px.imshow(
-        corr,
-        text_auto=".2f",                 # tampilkan nilai korelasi
-        aspect="auto",
-        color_continuous_scale="RdYlBu", # sama seperti seaborn
-        zmin=-1, zmax=1
-    )
 
-    # Styling title & layout
-    fig.update_layout(
-        title=dict(
-            text="Heatmap Korelasi Variabel Numerik",
-            x=0.5, xanchor="center",
-            y=0.95, yanchor="top",
-            font=dict(size=20)
-        ),
-        margin=dict(t=50)  # ruang atas supaya title & colorbar tidak tabrakan
-    )
+    def build_capacity_corr():
+        # Hitung korelasi
+        corr = capacity_frame()[numeric_cols].corr()
+
+        # Plot heatmap dengan Plotly Express
+        fig = px.imshow(
+            corr,
+            text_auto=".2f",                 # tampilkan nilai korelasi
+            aspect="auto",
+            color_continuous_scale="RdYlBu", # sama seperti seaborn
+            zmin=-1, zmax=1
+        )
+
+        # Styling title & layout
+        fig.update_layout(
+            title=dict(
+                text="Heatmap Korelasi Variabel Numerik",
+                x=0.5, xanchor="center",
+                y=0.95, yanchor="top",
+                font=dict(size=20)
+            ),
+            margin=dict(t=50)  # ruang atas supaya title & colorbar tidak tabrakan
+        )
+        return fig
+
+    fig = figure_cache.cached_figure("eda.capacity_corr", panel_version, build_capacity_corr, region=region)
 
     # Tampilkan di Streamlit
     st.plotly_chart(fig, use_container_width=True)
 
 
-    # --- Data siap plot ---
-    df_plot = df_cluster3.copy()
-    df_plot["Date"] = pd.to_datetime(df_plot["Date"], errors="coerce")
-
     group1 = ["BOR (%)", "GDR (/K)", "EDR", "NDR (/K)"]
     group2 = ["AVLOS (Day)", "TOI (Day)", "HI", "BTO_month", "IdleShare"]
 
-    # =========================
-    # Figure 1 (kiri): group1
-    # =========================
-    fig1 = go.Figure()
-    for c in group1:
-        fig1.add_trace(
-            go.Scatter(
-                x=df_plot["Date"], y=df_plot[c],
-                mode="lines+markers",
-                name=c,
-                hovertemplate=c + ": %{y:.2f}<br>Tanggal: %{x|%Y-%m-%d}<extra></extra>"
+    def build_capacity_trend_mortality():
+        # =========================
+        # Figure 1 (kiri): group1
+        # =========================
+        df_plot = capacity_frame()
+        fig1 = go.Figure()
+        for c in group1:
+            fig1.add_trace(
+                go.Scatter(
+                    x=df_plot["Date"], y=df_plot[c],
+                    mode="lines+markers",
+                    name=c,
+                    hovertemplate=c + ": %{y:.2f}<br>Tanggal: %{x|%Y-%m-%d}<extra></extra>"
+                )
             )
-        )
-
-    fig1.update_layout(
-        title=dict(text="Tren Waktu: BOR, GDR, EDR, NDR", x=0.20, y=0.98, font=dict(size=20)),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=1.10, yanchor="bottom"),
-        hovermode="x unified",
-        height=520,
-        xaxis_title="Tanggal",
-        yaxis_title="Nilai"
-    )
-    fig1.update_xaxes(tickangle=45)
 
-    # =========================
-    # Figure 2 (kanan): group2
-    # =========================
-    fig2 = go.Figure()
-    for c in group2:
-        fig2.add_trace(
-            go.Scatter(
-                x=df_plot["Date"], y=df_plot[c],
-                mode="lines+markers",
-                name=c,
-                hovertemplate=c + ": %{y:.2f}<br>Tanggal: %{x|%Y-%m-%d}<extra></extra>"
+        fig1.update_layout(
+            title=dict(text="Tren Waktu: BOR, GDR, EDR, NDR", x=0.20, y=0.98, font=dict(size=20)),
+            legend=dict(orientation="h", x=0.5, xanchor="center", y=1.10, yanchor="bottom"),
+            hovermode="x unified",
+            height=520,
+            xaxis_title="Tanggal",
+            yaxis_title="Nilai"
+        )
+        fig1.update_xaxes(tickangle=45)
+        return fig1
+
+    fig1 = figure_cache.cached_figure("eda.capacity_trend_mortality", panel_version, build_capacity_trend_mortality, region=region)
+
+    def build_capacity_trend_flow():
+        # =========================
+        # Figure 2 (kanan): group2
+        # =========================
+        df_plot = capacity_frame()
+        fig2 = go.Figure()
+        for c in group2:
+            fig2.add_trace(
+                go.Scatter(
+                    x=df_plot["Date"], y=df_plot[c],
+                    mode="lines+markers",
+                    name=c,
+                    hovertemplate=c + ": %{y:.2f}<br>Tanggal: %{x|%Y-%m-%d}<extra></extra>"
+                )
             )
+
+        fig2.update_layout(
+            title=dict(text="Tren Waktu: AVLOS, TOI, HI, BTO, IdleShare", x=0.32, y=0.98, font=dict(size=20)),
+            legend=dict(orientation="h", x=0.5, xanchor="center", y=1.10, yanchor="bottom"),
+            hovermode="x unified",
+            height=520,
+            xaxis_title="Tanggal",
+            yaxis_title="Nilai"
         )
+        fig2.update_xaxes(tickangle=45)
+        return fig2
 
-    fig2.update_layout(
-        title=dict(text="Tren Waktu: AVLOS, TOI, HI, BTO, IdleShare", x=0.32, y=0.98, font=dict(size=20)),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=1.10, yanchor="bottom"),
-        hovermode="x unified",
-        height=520,
-        xaxis_title="Tanggal",
-        yaxis_title="Nilai"
-    )
-    fig2.update_xaxes(tickangle=45)
+    fig2 = figure_cache.cached_figure("eda.capacity_trend_flow", panel_version, build_capacity_trend_flow, region=region)
 
     # =========================
     # Tampilkan berdampingan
@@ -805,33 +850,37 @@ with tab1:
 
     # --- [9.] Korelasi Variabel Numerik Kapasitas RS ---
 
-    # Ubah ke long format untuk Plotly
-    df_long = df_cluster3[numeric_cols].melt(var_name="Variabel", value_name="Nilai")
-
-    # Plot boxplot interaktif
-    fig = px.box(
-        df_long,
-        x="Variabel",
-        y="Nilai",
-        color="Variabel",
-        points="outliers",   # tampilkan outlier
-        title="Boxplot Variabel Numerik",
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
+    def build_capacity_boxplot():
+        # Ubah ke long format untuk Plotly
+        df_long = capacity_frame()[numeric_cols].melt(var_name="Variabel", value_name="Nilai")
 
-    # Styling
-    fig.update_layout(
-        title=dict(
-            text="Boxplot Variabel Numerik",
-            x=0.5, xanchor="center",
-            font=dict(size=20)
-        ),
-        xaxis=dict(title="Variabel", tickangle=45),
-        yaxis_title="Nilai",
-        showlegend=False,
-        margin=dict(t=80, l=40, r=20, b=40),
-        height=600
-    )
+        # Plot boxplot interaktif
+        fig = px.box(
+            df_long,
+            x="Variabel",
+            y="Nilai",
+            color="Variabel",
+            points="outliers",   # tampilkan outlier
+            title="Boxplot Variabel Numerik",
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+
+        # Styling
+        fig.update_layout(
+            title=dict(
+                text="Boxplot Variabel Numerik",
+                x=0.5, xanchor="center",
+                font=dict(size=20)
+            ),
+            xaxis=dict(title="Variabel", tickangle=45),
+            yaxis_title="Nilai",
+            showlegend=False,
+            margin=dict(t=80, l=40, r=20, b=40),
+            height=600
+        )
+        return fig
+
+    fig = figure_cache.cached_figure("eda.capacity_boxplot", panel_version, build_capacity_boxplot, region=region)
 
     # Tampilkan di Streamlit
     st.plotly_chart(fig, use_container_width=True)
@@ -839,7 +888,7 @@ with tab1:
 
 
 # -------------------------------------- Tab 2: Hasil Forecasting -------------------------------------- #
-with tab2:
+def render_forecast_tab():
     st.markdown(
         '<div class="sub-section-title">📈 Hasil Forecasting Kapasitas RS & Outcome Kesehatan Ibu–Anak</div>',
         unsafe_allow_html=True
@@ -851,20 +900,46 @@ with tab2:
         """
     )
 
-    # ---- Load hasil (kamu sudah punya file ini)
-    fr   = pd.read_csv("data/forecast_results.csv")
-    df_f = pd.read_csv("data/df_merged_after_forecast.csv")
-    df_f["Date"] = pd.to_datetime(df_f["Date"], errors="coerce")
-    df_f = df_f.sort_values("Date").set_index("Date")
-    fr["date"] = pd.to_datetime(fr["date"], errors="coerce")
+    render_forecast_panel()
 
-    # ---- Daftar indikator
-    target_cols = [
-        "BOR (%)", "AVLOS (Day)", "NDR (/K)", "GDR (/K)", "TOI (Day)",
-        "Rasio_AKI", "Rasio_AKB", "Rasio_BBLR"
-    ]
+
+# Label radio sumber forecast → nama sumber di forecast_artifact.SOURCES
+FC_SOURCES = {"File offline": "offline", "Engine in-app": "engine", "Global LightGBM": "global"}
+# Label radio interval → level band simulasi (None = CI 95% bawaan model, "fan" = fan chart)
+FC_INTERVALS = {"95% CI (model)": None, "50%": 50, "80%": 80, "95%": 95, "Fan chart": "fan"}
+
+
+# Panel forecast (kontrol + kartu KPI + figure + tabel) sebagai fragment: interaksi kontrol
+# hanya merender ulang panel ini, bukan seluruh halaman (toast, hero banner, sidebar, dst.)
+@st.fragment
+def render_forecast_panel():
+    import plotly.graph_objects as go
+
+    # rerun fragment saja → timer sendiri (saat full rerun span masuk timer halaman)
+    timing.begin_fragment("fragment:forecast")
 
     # ========= UI Kontrol =========
+    # sumber dipilih lebih dulu: daftar indikator bergantung pada sumber (rekonsiliasi = series count)
+    source = st.radio(
+        "Sumber forecast", list(FC_SOURCES), index=0, horizontal=True, key="fc_source",
+        help="Engine in-app: fit S-Naive/ETS/SARIMA per series dari data ABT terkini (paralel, di-cache per hash data). "
+             "Global LightGBM: satu model gradient boosting untuk semua target & region.",
+    )
+    source_key = FC_SOURCES[source]
+    if source_key == "engine":
+        # provinsi ← kab/kota: hanya bermakna jika panel punya lebih dari satu region
+        recon = st.radio(
+            "Rekonsiliasi hierarki", ["Tanpa", *reconcile.METHODS.values()], index=0, horizontal=True,
+            key="fc_reconcile", disabled=len(panel.regions()) < 2,
+            help="Forecast provinsi = jumlah forecast kab/kota (bottom-up atau MinT-WLS) untuk indikator count "
+                 "(tenaga kesehatan, layanan OBGYN, bayi BBLR); indikator rasio tidak punya penyebut di data "
+                 "sehingga tidak bisa direkonsiliasi. Aktif jika data ABT_KabKota.csv tersedia.",
+        )
+        source_key = {label: method for method, label in reconcile.METHODS.items()}.get(recon, source_key)
+
+    # ---- Daftar indikator
+    target_cols = reconcile.TARGETS if source_key in reconcile.METHODS else forecasting.TARGET_COLS
+
     c1, c2, c3 = st.columns([2, 1, 1])
     with c1:
         target = st.selectbox("Pilih indikator", target_cols, index=0)
@@ -873,29 +948,44 @@ with tab2:
         window_months = None if window_opt == "Semua" else int(window_opt)
     with c3:
         st.markdown("<br>", unsafe_allow_html=True)
-        show_ci = st.toggle("Tampilkan 95% CI", value=True)  # <<-- toggle 
+        show_ci = st.toggle("Tampilkan interval", value=True)  # <<-- toggle 
 
+    interval_opt = st.radio(
+        "Interval ketidakpastian", list(FC_INTERVALS), index=0, horizontal=True, key="fc_interval",
+        disabled=not show_ci,
+        help=f"50/80/95% & fan chart: kuantil dari {simulation.N_PATHS:,} jalur residual bootstrap "
+             "(dihitung sekali per target, lalu di-cache).",
+    )
+
+    # ---- Load hasil: file offline (forecast_results.csv), engine in-app (opsional terekonsiliasi),
+    #      atau model global, sudah di-group per target (lookup O(1) per indikator)
+    if source_key == "offline":
+        with timing.span("data:forecast_results", "data"):
+            store = forecast_store.offline_store()
+    else:
+        spinner = "Training model global LightGBM…" if source_key == "global" else "Fitting model forecast…"
+        with timing.span(f"features:forecast_{source_key}", "features"), st.spinner(spinner):
+            store = forecast_store.store_for(source_key)
+    fc_target = store.get(target)
 
     # ========= Ambil series aktual & forecast =========
-    if target not in df_f.columns:
-        st.error(f"Kolom '{target}' tidak ditemukan di data.")
+    # satu baca ter-index dari artefak tidy (region, target, date, kind, quantile):
+    # kolom actual / yhat / yhat_lower / yhat_upper untuk indikator terpilih
+    if source_key != "offline" and fc_target is None:
+        st.warning(f"Series '{target}' terlalu pendek untuk difit engine.")
+        st.stop()
+    with timing.span("data:forecast_long", "data"):
+        df_f = forecast_artifact.load_target(target, source=source_key)
+    if df_f.empty:
+        st.error(f"Indikator '{target}' tidak ditemukan di data forecast.")
         st.stop()
 
-    y = df_f[target]
-
-    # coba ambil CI langsung dari df_f; kalau tidak ada → fallback ke fr
-    low_col = f"{target}_fc_lower"
-    up_col  = f"{target}_fc_upper"
-    if low_col in df_f.columns and up_col in df_f.columns:
-        lower = df_f[low_col]
-        upper = df_f[up_col]
-    else:
-        fr_t   = fr[fr["target"] == target].set_index("date").sort_index()
-        lower  = fr_t["yhat_lower"].rename(low_col).reindex(y.index)
-        upper  = fr_t["yhat_upper"].rename(up_col).reindex(y.index)
+    y     = df_f["actual"].combine_first(df_f["yhat"]).rename(target)
+    lower = df_f["yhat_lower"]
+    upper = df_f["yhat_upper"]
 
-    # periode forecast ditandai oleh keberadaan CI
-    fc_mask = ~lower.isna()
+    # periode forecast = baris kind "forecast" di artefak
+    fc_mask = df_f["yhat"].notna()
 
     # ========= Window opsional =========
     if window_months is not None:
@@ -904,7 +994,7 @@ with tab2:
         y     = y.loc[start:end]
         lower = lower.reindex(y.index)
         upper = upper.reindex(y.index)
-        fc_mask = ~lower.isna()
+        fc_mask = fc_mask.reindex(y.index, fill_value=False)
 
     # pisahkan actual vs forecast
     y_actual   = y[~fc_mask]
@@ -917,15 +1007,38 @@ with tab2:
     last_fc_txt     = y_forecast.index.max().strftime("%Y-%m") if len(y_forecast) else "–"
 
     # cari nama model dari forecast_results (jika tersedia)
-    model_name = "-"
-    if len(fr[fr["target"] == target]):
-        model_name = fr.loc[fr["target"] == target, "model"].dropna().iloc[0]
+    model_name = store.model_name(target)
+
+    # akurasi rolling-origin backtest (MASE/sMAPE) untuk target terpilih; fold di-cache per hash data,
+    # fold yang belum ada dihitung di thread latar belakang (kartu menampilkan ⏳ sampai siap)
+    with timing.span("features:backtest", "features"):
+        acc = backtest.accuracy_or_start(target)
+    if acc is None:
+        acc_txt = "⏳"
+    else:
+        acc_best = acc[acc["model"] == model_name]
+        acc_txt = (
+            f"{acc_best['MASE'].iloc[0]:.2f} / {acc_best['sMAPE'].iloc[0]:.1f}%" if len(acc_best) else "–"
+        )
 
-    k1, k2, k3, k4 = st.columns(4)
+    k1, k2, k3, k4, k5 = st.columns(5)
     k1.metric("Last Actual", last_actual_txt)
     k2.metric("First Forecast", first_fc_txt)
     k3.metric("Last Forecast", last_fc_txt)
     k4.metric("Model Terbaik", model_name)
+    k5.metric("MASE / sMAPE", acc_txt, help=f"Rata-rata {backtest.N_FOLDS} fold rolling-origin, horizon {backtest.HORIZON} bulan.")
+
+    with st.expander("📏 Ringkasan akurasi model (MASE/sMAPE)"):
+        if acc is None:
+            st.caption("⏳ Backtest sedang dihitung di latar belakang — tabel muncul setelah panel dirender ulang.")
+        else:
+            st.dataframe(
+                acc[["model", "rank", "folds", "MASE", "sMAPE"]].style
+                   .format({"MASE": "{:.3f}", "sMAPE": "{:.2f}%"})
+                   .apply(lambda row: ["font-weight: 700" if row["model"] == model_name else ""] * len(row), axis=1),
+                use_container_width=True, hide_index=True,
+            )
+            st.caption("MASE < 1 → lebih akurat daripada naive musiman. Baris tebal = model yang dipakai.")
 
     # ========= Plotly: Actual vs Forecast =========
     fig = go.Figure()
@@ -947,16 +1060,38 @@ with tab2:
             hovertemplate="Tanggal: %{x|%Y-%m}<br>Nilai: %{y:.2f}<extra></extra>"
         ))
 
+    # band yang digambar: [(label, lower, upper, opacity)]; simulasi dibaca dari grid kuantil ter-cache
+    bands = []
+    interval_level = FC_INTERVALS[interval_opt]
     if show_ci and len(y_forecast):
         idx_fc = y_forecast.index
+        if interval_level is None:
+            bands = [("95% CI", lower.loc[idx_fc], upper.loc[idx_fc], 0.2)]
+        else:
+            with timing.span("features:forecast_quantiles", "features"), st.spinner("Simulasi jalur forecast…"):
+                grid = simulation.quantile_grid(target, source=source_key)
+            if grid is None:
+                st.info("Grid simulasi tidak tersedia untuk indikator ini.")
+            elif interval_level == "fan":
+                levels = sorted(simulation.FAN_LEVELS, reverse=True)
+                bands = [(f"{lv}%", *simulation.band(grid, lv), 0.12) for lv in levels]
+            else:
+                bands = [(f"{interval_level}% (bootstrap)", *simulation.band(grid, interval_level), 0.2)]
+
+    for label, band_lo, band_up, opacity in bands:
+        band_lo, band_up = band_lo.reindex(idx_fc), band_up.reindex(idx_fc)
+        # fan chart: hover hanya untuk level band standar agar tooltip tidak penuh
+        hover = interval_level != "fan" or int(label.rstrip("%")) in simulation.BAND_LEVELS
         fig.add_trace(go.Scatter(
-            x=idx_fc, y=upper.loc[idx_fc].values,
+            x=idx_fc, y=band_up.values,
             line=dict(width=0), showlegend=False, hoverinfo="skip"
         ))
         fig.add_trace(go.Scatter(
-            x=idx_fc, y=lower.loc[idx_fc].values,
-            fill="tonexty", name="95% CI", line=dict(width=0),
-            opacity=0.2, hovertemplate="Lower: %{y:.2f}<extra></extra>"
+            x=idx_fc, y=band_lo.values,
+            fill="tonexty", name=label, line=dict(width=0),
+            opacity=opacity, hovertemplate=f"{label}: %{{y:.2f}}<extra></extra>" if hover else None,
+            hoverinfo=None if hover else "skip",
+            showlegend=interval_level != "fan" or label == f"{max(simulation.FAN_LEVELS)}%",
         ))
 
     subtitle = (
@@ -975,7 +1110,8 @@ with tab2:
     )
     fig.update_xaxes(tickformat="%Y-%m", ticks="outside")
 
-    st.plotly_chart(fig, use_container_width=True)
+    with timing.span("serialize:forecast_chart", "serialize"):
+        st.plotly_chart(fig, use_container_width=True)
 
     # # (Opsional) tabel kecil contoh 10 baris forecast_res untuk indikator terpilih
     # with st.expander("Lihat tabel ringkas hasil forecast (top 10)"):
@@ -990,7 +1126,7 @@ with tab2:
             index=1  # default ke 10
         )
 
-        tmp = fr[fr["target"] == target].sort_values("date")
+        tmp = fc_target.table() if fc_target else pd.DataFrame(columns=forecasting.RESULT_COLUMNS)
 
         if row_opt != "Full":
             n = int(row_opt)
@@ -998,54 +1134,118 @@ with tab2:
 
         st.dataframe(tmp, use_container_width=True)
 
+    # rerun fragment tidak bisa menulis ke sidebar → overlay timing-nya ditampilkan inline
+    if timing.is_fragment_run():
+        timing.render_overlay(st)
+
 
 
 # -------------------------------------- Tab 3: Clustering Maps -------------------------------------- #
-with tab3:
-    def clean_nama_daerah(name: str) -> str:
-        name = name.strip().upper()
-        if name.startswith("KABUPATEN"):
-            daerah = name.replace("KABUPATEN", "").strip().title()
-            return daerah
-        elif name.startswith("KOTA"):
-            daerah = name.replace("KOTA", "").strip().title()
-            return daerah
-        else:
-            return name.title()
-        
-    
+def render_cluster_tab():
+    render_cluster_panel()
+
+
+# Peta cluster sebagai fragment: ganti sumber/fitur/k hanya merender ulang peta + ringkasan,
+# bukan seluruh halaman (re-clustering sendiri di-memo per konfigurasi)
+@st.fragment
+def render_cluster_panel():
+    import plotly.express as px
+    import plotly.graph_objects as go
 
+    timing.begin_fragment("fragment:cluster")
+
+    # Perkiraan viewport peta (lebar kontainer layout wide, tinggi figure) → dasar pemilihan level geometri
+    MAP_VIEWPORT_PX = (1200, 600)
 
     # ------------------------------- >>> Sub-section: Peta Cluster Kesehatan Kabupaten/Kota di Jawa Timur ------------------------------- #
     st.markdown('<div class="sub-section-title">🗺️ Peta Cluster Kesehatan Kabupaten/Kota di Jawa Timur</div>', unsafe_allow_html=True)
 
+    # ===== 0) Kontrol clustering: kolom Cluster offline atau k-means in-app (di-memo per fitur & k) =====
+    cc1, cc2, cc3 = st.columns([1, 2.2, 1])
+    with cc1:
+        cl_source = st.radio("Sumber cluster", ["File offline", "Engine in-app"], index=0, key="cl_source")
+    with cc2:
+        cl_groups = st.multiselect(
+            "Fitur clustering", list(clustering.FEATURE_GROUPS), default=clustering.DEFAULT_GROUPS,
+            key="cl_features", disabled=cl_source == "File offline",
+        )
+    with cc3:
+        cl_k = st.slider("Jumlah cluster (k)", *clustering.K_RANGE, value=clustering.DEFAULT_K,
+                         key="cl_k", disabled=cl_source == "File offline")
+
     # ===== 1) Data =====
-    df_cl = pd.read_csv("data/Cluster-ABT-v2.csv")
-    df_cl = df_cl.drop_duplicates(subset=["nama_kabupaten_kota"], keep="first")
-    df_cl["nama_norm"] = df_cl["nama_kabupaten_kota"].apply(clean_nama_daerah)
+    with timing.span("data:cluster", "data"):
+        df_cl = data_loader.load("cluster").copy()
+
+    cluster_label_map = {0: "Perlu Diperhatikan", 1: "Baik", 2: "Warning", 3: "Cukup"}
+    legend_levels = clustering.LEVEL_NAMES[clustering.DEFAULT_K]
+    if cl_source == "Engine in-app" and not cl_groups:
+        st.warning("Pilih minimal satu fitur clustering — peta memakai kolom Cluster offline.")
+    if cl_source == "Engine in-app" and cl_groups:
+        with timing.span("features:kmeans", "features"):
+            cl_result = clustering.cluster(cl_groups, cl_k)
+        df_cl["Cluster_label"] = cl_result.label_series(df_cl.index)   # sebelum dedup: label per baris file
+        legend_levels = cl_result.names
+        # stabilitas label (bootstrap) dihitung di thread latar belakang; hover memakainya begitu siap
+        cl_stability = stability.get_or_start(cl_groups, cl_k)
+        if cl_stability is not None:
+            df_cl = df_cl.join(cl_stability.frame(df_cl.index))
+        else:
+            st.caption(f"⏳ Stabilitas label ({stability.N_BOOT} bootstrap) sedang dihitung di latar belakang — "
+                       "keyakinan label muncul di hover setelah peta dirender ulang.")
+    else:
+        df_cl["Cluster_label"] = df_cl["Cluster"].map(cluster_label_map)
+
+    # Geometry store: simplifikasi multi-level, centroid & bbox sudah di-cache per versi GeoJSON
+    with timing.span("data:geo_store", "data"):
+        geo_store = geo.get_store()
 
-    gdf = gpd.read_file("data/jatim_kabkota.geojson")
-    gdf["nama_norm"] = gdf["NAME_2"].apply(lambda x: x.strip() if isinstance(x, str) else x)
+    # Join ke polygon lewat kode BPS (CC_2): dimensi wilayah + index alias, satu map vektor;
+    # "KOTA X" vs "KABUPATEN X" tidak bertabrakan, baris tak dikenal / ganda dilaporkan
+    with timing.span("features:region_join", "features"):
+        merged, join_report = regions.join(
+            df_cl, "nama_kabupaten_kota", codes=regions.dataset_codes("cluster", "nama_kabupaten_kota")
+        )
+
+    # Agregat titik fasilitas (opsional) per kab/kota: STRtree + bincount, di-cache per versi file
+    with timing.span("features:facility_join", "features"):
+        facilities = spatial.facility_table()
+    if facilities is not None:
+        merged = merged.merge(facilities, on=regions.CODE_COL, how="left")
 
-    merged = gdf.merge(df_cl, on="nama_norm", how="left")
+    # Baris hover tambahan (kolom, label, format) — posisi customdata mengikuti urutan hover_data
+    extra_hover = []
+    if "label_confidence" in merged.columns:
+        extra_hover.append(("label_confidence", "Keyakinan label", ":.0%"))
+    if facilities is not None:
+        extra_hover.append((spatial.COUNT_COL, "Fasilitas kesehatan", ":,.0f"))
 
     # Label & warna
-    cluster_label_map = {0: "Perlu Diperhatikan", 1: "Baik", 2: "Warning", 3: "Cukup"}
-    merged["Cluster_label"] = merged["Cluster"].map(cluster_label_map).fillna("Lainnya")
+    merged["Cluster_label"] = merged["Cluster_label"].fillna("Lainnya")
 
     color_map = {
+        "Kritis":             "#7f0000",  # merah gelap (k=6)
         "Perlu Diperhatikan": "#d00000",  # merah terang
         "Warning":             "#f1c40f",  # kuning
         "Cukup":               "#74c69d",  # hijau muda
         "Baik":                "#2d6a4f",  # hijau tua
+        "Sangat Baik":        "#081c15",  # hijau sangat tua (k≥5)
         "Lainnya":             "#bdbdbd"   # abu (missing)
     }
-    legend_order = ["Perlu Diperhatikan", "Warning", "Cukup", "Baik", "Lainnya"]
+    legend_order = [*legend_levels, "Lainnya"]
 
     # ===== 2) Siapkan GeoJSON untuk Plotly =====
-    merged = merged.reset_index().rename(columns={"index": "fid"})   # id unik
-    geojson_obj = json.loads(merged.to_json())
-    feature_key = "properties.fid"
+    # Level simplifikasi dipilih dari ukuran viewport peta (≈ lebar kontainer wide × tinggi figure)
+    detail_opt = st.radio(
+        "Detail peta", ["Auto", "Tinggi", "Sedang", "Rendah"],
+        index=0, horizontal=True, key="map_detail"
+    )
+    if detail_opt == "Auto":
+        map_level = geo.level_for_viewport(MAP_VIEWPORT_PX[0], MAP_VIEWPORT_PX[1], geo_store.bounds)
+    else:
+        map_level = detail_opt.lower()
+    geojson_obj = geo_store.geojson(map_level)   # fitur ringan: hanya id (= fid) + geometry
+    feature_key = "id"
 
     # ===== 3) Choropleth =====
     fig = px.choropleth(
@@ -1056,12 +1256,13 @@ with tab3:
         color="Cluster_label",
         category_orders={"Cluster_label": legend_order},
         color_discrete_map=color_map,
-        hover_name="nama_norm",
+        hover_name="region_name",
         hover_data={
             "Cluster_label": True,
             "indeks_kesehatan": True,
             "jumlah_bayi_bblr": True,
             "jumlah_kematian_ibu": True,
+            **{col: True for col, _, _ in extra_hover},
             "fid": False
         },
         title=" "
@@ -1076,13 +1277,15 @@ with tab3:
             "Cluster: %{z}<br>"
             "Indeks Kesehatan: %{customdata[1]:.2f}<br>"
             "BBLR (jumlah): %{customdata[2]:,.0f}<br>"
-            "Kematian Ibu (jumlah): %{customdata[3]:,.0f}<extra></extra>"
+            "Kematian Ibu (jumlah): %{customdata[3]:,.0f}"
+            + "".join(f"<br>{label}: %{{customdata[{i}]{fmt}}}" for i, (_, label, fmt) in enumerate(extra_hover, start=4))
+            + "<extra></extra>"
         )
     )
 
     # === KUNCI BIAR LEBAR ===
-    # Hitung bounding box (EPSG:4326), lalu set lon/lat range agar rasio horizontal maksimal
-    minx, miny, maxx, maxy = merged.to_crs(epsg=4326).geometry.total_bounds
+    # Bounding box (EPSG:4326) dari cache, lalu set lon/lat range agar rasio horizontal maksimal
+    minx, miny, maxx, maxy = geo_store.bounds
     pad_x = (maxx - minx) * 0.08    # padding kanan-kiri
     pad_y = (maxy - miny) * 0.12    # padding atas-bawah
 
@@ -1099,19 +1302,13 @@ with tab3:
         legend=dict(title="Kategori Cluster", orientation="h",
                     x=0.5, xanchor="center", y=1.02, yanchor="bottom"),
         autosize=True,
-        height=600,  # 480–560 ok; makin kecil → terasa lebih melebar
+        height=MAP_VIEWPORT_PX[1],  # 480–560 ok; makin kecil → terasa lebih melebar
         margin=dict(t=70, l=10, r=10, b=10),
         hoverlabel=dict(bgcolor="white", font_size=12)
     )
 
-    # (Opsional) Label centroid singkat
-    centroids = merged.geometry.centroid.to_crs(epsg=4326)
-    merged["lon"] = centroids.x
-    merged["lat"] = centroids.y
-    merged["label_short"] = (
-        merged["nama_norm"].str.replace("Kabupaten ", "", case=False)
-                            .str.replace("Kota ", "", case=False)
-    )
+    # (Opsional) Label centroid singkat (centroid sudah di-cache di geometry store)
+    merged = merged.merge(geo_store.centroids, on="fid", how="left")
     fig.add_trace(
         go.Scattergeo(
             lon=merged["lon"], lat=merged["lat"],
@@ -1123,17 +1320,36 @@ with tab3:
         )
     )
 
-    # Tampilkan peta
-    st.plotly_chart(fig, use_container_width=True)
+    # Masalah data sumber harus terlihat di peta, bukan hanya di expander: join kode tidak bisa
+    # menebak baris ganda "KOTA X" (nilainya tampak skala kabupaten) milik polygon kabupaten mana
+    if join_report.duplicates or join_report.unmatched:
+        problems = []
+        if join_report.duplicates:
+            problems.append(f"{len(join_report.duplicates)} baris ganda ({', '.join(join_report.duplicates)}) "
+                            "— kemungkinan data Kabupaten yang tertulis sebagai Kota, dipakai baris pertama")
+        if join_report.unmatched:
+            problems.append(f"{len(join_report.unmatched)} nama tidak dikenali ({', '.join(join_report.unmatched)})")
+        st.warning(
+            f"⚠️ Data cluster `{data_loader.dataset_path('cluster').name}` bermasalah: " + "; ".join(problems) + ". "
+            f"{len(join_report.missing)} wilayah tampil abu-abu (tanpa data)"
+            + (f": {', '.join(join_report.missing)}" if join_report.missing else "")
+            + ". Perbaiki file sumbernya agar polygon tersebut terisi."
+        )
+
+    # Tampilkan peta (to_json GeoJSON + trace → payload ke browser)
+    with timing.span("serialize:cluster_map", "serialize"):
+        st.plotly_chart(fig, use_container_width=True)
 
     # ===== 4) Ringkasan jumlah kab/kota per cluster (centered, flex) =====
     counts = merged["Cluster_label"].value_counts().reindex(legend_order, fill_value=0)
 
     badge_color = {
+        "Kritis": "#7f0000",
         "Perlu Diperhatikan": "#d00000",
         "Warning": "#f1c40f",
         "Cukup": "#74c69d",
         "Baik": "#2d6a4f",
+        "Sangat Baik": "#081c15",
         "Lainnya": "#bdbdbd",
     }
 
@@ -1161,6 +1377,107 @@ with tab3:
 
     st.markdown(f'<div class="cluster-metrics">{items_html}</div>', unsafe_allow_html=True)
 
+    if not join_report.ok:
+        with st.expander("ℹ️ Catatan join data cluster ↔ wilayah"):
+            if join_report.missing:
+                st.caption("Wilayah tanpa data cluster (abu-abu): " + ", ".join(join_report.missing))
+            if join_report.duplicates:
+                st.caption("Baris ganda di data cluster (dipakai baris pertama): " + ", ".join(join_report.duplicates))
+            if join_report.unmatched:
+                st.caption("Nama tidak dikenali: " + ", ".join(join_report.unmatched))
+
+    # ------------------------------- >>> Sub-section: Hotspot Indikator (Getis-Ord Gi*) ------------------------------- #
+    st.markdown('<div class="sub-section-title">🔥 Hotspot Indikator Kabupaten/Kota (Getis-Ord Gi*)</div>', unsafe_allow_html=True)
+
+    hc1, hc2, hc3 = st.columns([1, 2, 1])
+    with hc1:
+        # layer kedua = payload peta kedua → hanya dirender jika diminta (budget fragment cluster)
+        hs_on = st.toggle("Tampilkan layer hotspot", value=False, key="hs_on")
+    with hc2:
+        hs_column = st.selectbox(
+            "Indikator", hotspot.INDICATORS, index=hotspot.INDICATORS.index(clustering.RANK_COL),
+            key="hs_column", disabled=not hs_on,
+        )
+    with hc3:
+        hs_edges = st.checkbox("Tampilkan graf ketetanggaan", value=False, key="hs_edges", disabled=not hs_on)
+
+    if hs_on:
+        # Bobot kontiguitas (sparse) di-cache per versi GeoJSON; statistik + permutasi di-memo per indikator
+        with timing.span("features:hotspot", "features"):
+            hs_result = hotspot.analyze(hs_column)
+        hs_frame = regions.dimension()[["fid", regions.CODE_COL, "region_name"]].merge(
+            hs_result.frame(), on=regions.CODE_COL
+        )
+        hs_frame["nilai"] = hotspot.indicator_values(hs_column)
+
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Moran's I", f"{hs_result.moran_i:.3f}", help=f"E[I] = {hs_result.moran_expected:.3f} (tanpa autokorelasi)")
+        m2.metric("p-value (permutasi)", f"{hs_result.moran_p:.3f}", help=f"{hs_result.permutations} permutasi")
+        m3.metric("Wilayah hotspot / coldspot",
+                  f"{hs_frame['hotspot'].str.startswith('Hotspot').sum()} / {hs_frame['hotspot'].str.startswith('Coldspot').sum()}")
+
+        hotspot_colors = {
+            "Hotspot 95%":   "#b2182b",   # nilai tinggi berkumpul
+            "Hotspot 90%":   "#ef8a62",
+            "Tidak signifikan": "#f7f7f7",
+            "Coldspot 90%":  "#67a9cf",
+            "Coldspot 95%":  "#2166ac",   # nilai rendah berkumpul
+            "Tanpa data":    "#bdbdbd",
+        }
+        fig_hs = px.choropleth(
+            hs_frame,
+            geojson=geojson_obj,
+            locations="fid",
+            featureidkey=feature_key,
+            color="hotspot",
+            category_orders={"hotspot": hotspot.HOTSPOT_LEVELS},
+            color_discrete_map=hotspot_colors,
+            hover_name="region_name",
+            hover_data={"nilai": True, "gi_z": True, "gi_p": True, "fid": False},
+        )
+        fig_hs.update_traces(
+            marker_line_width=0.8,
+            marker_line_color="#9e9e9e",
+            hovertemplate=(
+                "<b>%{hovertext}</b><br>"
+                "Kelas: %{z}<br>"
+                f"{hs_column}: " "%{customdata[0]:,.2f}<br>"
+                "Gi* z: %{customdata[1]:.2f}<br>"
+                "p-value: %{customdata[2]:.3f}"
+                "<extra></extra>"
+            )
+        )
+        if hs_edges:
+            # Graf networkx: satu trace garis antar centroid (None memutus segmen)
+            centroids = merged.set_index(regions.CODE_COL)[["lon", "lat"]]
+            codes = hotspot.contiguity().codes
+            edge_lon, edge_lat = [], []
+            for a, b in hotspot.graph().edges():
+                edge_lon += [centroids.at[codes[a], "lon"], centroids.at[codes[b], "lon"], None]
+                edge_lat += [centroids.at[codes[a], "lat"], centroids.at[codes[b], "lat"], None]
+            fig_hs.add_trace(go.Scattergeo(lon=edge_lon, lat=edge_lat, mode="lines",
+                                           line=dict(width=1, color="#424242"), showlegend=False, hoverinfo="skip"))
+        fig_hs.update_geos(
+            projection_type="mercator",
+            lonaxis_range=[minx - pad_x, maxx + pad_x],
+            lataxis_range=[miny - pad_y, maxy + pad_y],
+            visible=False
+        )
+        fig_hs.update_layout(
+            legend=dict(title="Kelas Gi*", orientation="h", x=0.5, xanchor="center", y=1.02, yanchor="bottom"),
+            autosize=True,
+            height=MAP_VIEWPORT_PX[1],
+            margin=dict(t=40, l=10, r=10, b=10),
+            hoverlabel=dict(bgcolor="white", font_size=12)
+        )
+        with timing.span("serialize:hotspot_map", "serialize"):
+            st.plotly_chart(fig_hs, use_container_width=True)
+        st.caption("Hotspot = wilayah bernilai tinggi yang dikelilingi tetangga bernilai tinggi (coldspot: sebaliknya), "
+                   f"tetangga = kab/kota bersinggungan batas; p-value dari {hs_result.permutations} permutasi kondisional.")
+
+    if timing.is_fragment_run():
+        timing.render_overlay(st)
+
 
 
 
@@ -1191,6 +1508,21 @@ with tab3:
 
 
 
+
+
+# -------------------------------------- Dispatch Tab (lazy) -------------------------------------- #
+# Berbeda dengan st.tabs (semua body tab dieksekusi tiap rerun), hanya section aktif yang
+# menghitung & men-serialisasi figure-nya. Tab lain baru dihitung saat dibuka.
+HOME_TABS = {
+    "📈 EDA & Tren": render_eda_tab,
+    "🔮 Forecasting Result": render_forecast_tab,
+    "🗺️ Clustering Maps": render_cluster_tab,
+}
+
+active_tab = ui.lazy_tabs(list(HOME_TABS), key="home_tab")
+render_tab = HOME_TABS[active_tab]
+with timing.span("tab:" + render_tab.__name__.split("_")[1]):   # tab:eda / tab:forecast / tab:cluster
+    render_tab()
 
 
 # =================== PURE STREAMLIT FOOTER (robust) ===================
@@ -1212,7 +1544,7 @@ def render_footer():
 
     # Brand & deskripsi
     with col1:
-        st.image("icon/Only LOGO.png", width=100)
+        st.markdown(assets.asset_html("logo", 100, alt="NutriHealth AI"), unsafe_allow_html=True)
         st.markdown("**NutriHealth AI**")
         st.caption(
             "Insight KIA & kapasitas RS berbasis EDA dan hasil forecast (ETS/SARIMA). "
@@ -1257,6 +1589,9 @@ def render_footer():
 # panggil di paling bawah halaman
 render_footer()
 
+# Overlay timing (opt-in) dirender paling akhir supaya semua span rerun ini sudah tercatat
+timing.render_overlay()
+
 # ======================================================================
 
 
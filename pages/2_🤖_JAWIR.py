@@ -1,9 +1,10 @@
 from openai import OpenAI
 import streamlit as st
 import os
-from PIL import Image
 from dotenv import load_dotenv
 
+from utils import assets
+
 # ----------------- Load environment -----------------
 load_dotenv()
 
@@ -48,9 +49,8 @@ if "messages" not in st.session_state:
     ]
 
 # ----------------- Page Config -----------------
-# Loading Image using PIL
-web_icon = Image.open('icon/Only LOGO.png') # Adding Image to web app
-st.set_page_config(page_title="JAWIR", layout="wide", initial_sidebar_state="auto", page_icon = web_icon)
+# Favicon kecil hasil build aset (bukan logo PNG 3 MB)
+st.set_page_config(page_title="JAWIR", layout="wide", initial_sidebar_state="auto", page_icon = assets.favicon_path())
 
 # ----------------- Custom Header -----------------
 st.markdown(
@@ -9,14 +9,14 @@ import base64
 from textwrap import dedent
 
 import streamlit as st
-from PIL import Image
 
-web_icon = Image.open('icon/Only LOGO.png')  # konsisten dengan file lain
+from utils import assets
+
 st.set_page_config(
     page_title="Panduan NutriHealth AI",
     layout="wide",
     initial_sidebar_state="auto",
-    page_icon=web_icon
+    page_icon=assets.favicon_path()  # favicon kecil hasil build aset, konsisten dengan file lain
 )
 
 # ------------------------------- | ------------------------------- | -------------------------------
@@ -0,0 +1,41 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test metrik & fold backtest — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import backtest
+
+
+def test_mase_scales_by_seasonal_naive_error():
+    train = np.arange(24, dtype=float)                                # naive lag-12 error = 12
+    assert backtest.mase(np.array([30.0, 31.0]), np.array([24.0, 25.0]), train, m=12) == pytest.approx(0.5)
+
+
+def test_mase_falls_back_to_lag_one_for_short_train_and_nan_for_flat_train():
+    train = np.array([1.0, 3.0, 5.0])                                  # < m + 1 → lag 1, error 2
+    assert backtest.mase(np.array([8.0]), np.array([7.0]), train, m=12) == pytest.approx(0.5)
+    assert np.isnan(backtest.mase(np.array([1.0]), np.array([2.0]), np.ones(30), m=12))
+
+
+def test_smape_is_symmetric_and_ignores_zero_pairs():
+    y, yhat = np.array([100.0, 0.0]), np.array([50.0, 0.0])
+    assert backtest.smape(y, yhat) == pytest.approx(200 * 50 / 150)
+    assert backtest.smape(y, yhat) == backtest.smape(yhat, y)
+    assert np.isnan(backtest.smape(np.zeros(3), np.zeros(3)))
+
+
+def test_origins_end_at_last_observation_and_skip_empty_train():
+    assert backtest.origins(30, n_folds=3, horizon=6, step=2) == [20, 22, 24]
+    assert backtest.origins(8, n_folds=6, horizon=6, step=1) == [1, 2]
+
+
+def test_fold_key_depends_only_on_data_up_to_fold_end():
+    idx = pd.date_range("2020-01-01", periods=40, freq="MS")
+    y = pd.Series(np.arange(40.0), idx)
+    later = y.copy()
+    later.iloc[-1] = -1.0
+    assert backtest.fold_key(y, 20, "ets", 6) == backtest.fold_key(later, 20, "ets", 6)
+    assert backtest.fold_key(y, 20, "ets", 6) != backtest.fold_key(y, 21, "ets", 6)
+    assert backtest.fold_key(y, 20, "ets", 6) != backtest.fold_key(y, 20, "snaive", 6)
@@ -0,0 +1,58 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test k-means & urutan label cluster — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import clustering, data_loader
+
+
+@pytest.fixture
+def blobs() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    centres = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+    return np.concatenate([c + rng.normal(scale=0.5, size=(20, 2)) for c in centres])
+
+
+def test_kmeans_recovers_separated_blobs(blobs):
+    labels, centroids, inertia = clustering.kmeans(blobs, 3)
+    groups = labels.reshape(3, 20)
+    assert all(len(set(g)) == 1 for g in groups) and len({g[0] for g in groups}) == 3
+    assert centroids.shape == (3, 2) and inertia > 0
+
+
+def test_kmeans_is_deterministic_for_a_seed(blobs):
+    a = clustering.kmeans(blobs, 4, seed=7)
+    b = clustering.kmeans(blobs, 4, seed=7)
+    np.testing.assert_array_equal(a[0], b[0])
+    np.testing.assert_array_equal(a[1], b[1])
+    assert a[2] == b[2]
+
+
+def test_rank_labels_orders_clusters_by_mean_rank_value():
+    labels = np.array([2, 2, 0, 0, 1, 1])
+    rank_values = np.array([1.0, 1.0, 9.0, 9.0, 5.0, 5.0])
+    assert list(clustering.rank_labels(labels, rank_values, 3)) == [0, 0, 2, 2, 1, 1]
+
+
+def test_standardize_gives_zero_mean_unit_variance():
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0, 4.0], "b": [10.0, 10.0, 20.0, 20.0]})
+    out = clustering.standardize(df, ["a", "b"])
+    np.testing.assert_allclose(out[["a", "b"]].mean(), 0.0, atol=1e-12)
+    np.testing.assert_allclose(out[["a", "b"]].std(ddof=0), 1.0)
+
+
+def test_cluster_is_stable_across_calls():
+    a = clustering.cluster(k=clustering.DEFAULT_K)
+    data_loader.invalidate("cluster")
+    b = clustering.cluster(k=clustering.DEFAULT_K)
+    assert a is not b
+    np.testing.assert_array_equal(a.labels, b.labels)
+
+
+def test_standardize_fills_nan_with_mean_and_zeroes_constant_columns():
+    df = pd.DataFrame({"a": [1.0, np.nan, 3.0], "c": [5.0, 5.0, 5.0]})
+    out = clustering.standardize(df, ["a", "c"])
+    assert out.loc[1, "a"] == 0.0
+    assert (out["c"] == 0.0).all()
@@ -0,0 +1,44 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test fitur kapasitas — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+import numpy as np
+import pandas as pd
+
+from utils import features
+
+
+def test_safe_divide_returns_nan_for_zero_negative_and_nan_denominators():
+    out = features.safe_divide(np.array([1.0, 1.0, 1.0, 6.0]), np.array([0.0, -2.0, np.nan, 3.0]))
+    assert np.isnan(out[:3]).all()
+    assert out[3] == 2.0
+
+
+def test_safe_divide_broadcasts_scalar_denominator():
+    np.testing.assert_allclose(features.safe_divide(np.array([2.0, 4.0]), np.array(2.0)), [1.0, 2.0])
+
+
+def test_status_labels_bounds_are_inclusive_and_nan_stays_nan():
+    values = np.array([59.9, 60.0, 80.0, 80.1, np.nan])
+    labels = features.status_labels(values, features.BOR_THRESHOLDS, features.BOR_LEVELS)
+    assert list(labels.categories) == features.BOR_LEVELS and labels.ordered
+    assert list(labels[:4]) == ["under-utilized", "optimal", "optimal", "saturated"]
+    assert pd.isna(labels[4])
+
+
+def test_add_capacity_features_handles_zero_interval_and_missing_input():
+    df = pd.DataFrame({
+        "Date": pd.to_datetime(["2024-02-01", "2024-03-01", "2024-04-01"]),
+        features.AVLOS_COL: [0.0, 4.0, np.nan],
+        features.TOI_COL: [0.0, 0.5, 2.0],
+        features.BOR_COL: [85.0, 85.0, 70.0],
+        features.GDR_COL: [30.0, 20.0, 10.0],
+        features.NDR_COL: [10.0, 25.0, 5.0],
+    })
+    out = features.add_capacity_features(df)
+    assert set(features.CAPACITY_FEATURES) <= set(out.columns)
+    assert list(out["days_in_month"]) == [29, 31, 30]
+    assert np.isnan(out.loc[0, "BTO_month"])                         # HI = 0 → NaN, bukan inf
+    assert np.isfinite(out.loc[1, "BTO_month"])
+    assert list(out["EDR"][:2]) == [20.0, 0.0]                        # GDR < NDR → 0
+    assert list(out["Capacity_alert"]) == [1, 1, 0]
+    assert pd.isna(out.loc[2, "HI"])
@@ -0,0 +1,66 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test Moran's I & Getis-Ord Gi* — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+pytest.importorskip("geopandas")
+
+from utils import geo, hotspot  # noqa: E402
+
+PERMUTATIONS = 199
+
+
+@pytest.fixture(scope="module")
+def longitude() -> np.ndarray:
+    """Bujur centroid per wilayah (urut dimensi = urut fid): nilai dengan autokorelasi spasial kuat."""
+    return geo.get_store().centroids.sort_values("fid")["lon"].to_numpy(dtype=float)
+
+
+def test_contiguity_is_symmetric_binary_without_self_links():
+    W = hotspot.contiguity().W
+    assert (W != W.T).nnz == 0
+    assert set(np.unique(W.data)) <= {1.0}
+    assert not W.diagonal().any()
+
+
+def test_moran_detects_a_spatial_gradient(longitude):
+    result = hotspot.compute(longitude, "lon", permutations=PERMUTATIONS)
+    assert result.moran_expected == pytest.approx(-1 / (len(longitude) - 1))
+    assert result.moran_i > 0.5
+    assert result.moran_p == pytest.approx(1 / (PERMUTATIONS + 1))
+
+
+def test_compute_is_deterministic(longitude):
+    a = hotspot.compute(longitude, permutations=PERMUTATIONS)
+    b = hotspot.compute(longitude, permutations=PERMUTATIONS)
+    assert a.moran_i == b.moran_i and a.moran_p == b.moran_p
+    np.testing.assert_array_equal(a.gi_p, b.gi_p)
+
+
+def test_gi_star_marks_a_high_value_neighbourhood_as_hotspot_and_skips_missing():
+    W = hotspot.contiguity().W
+    centre = int(np.asarray(W.sum(axis=1)).ravel().argmax())           # wilayah dengan tetangga terbanyak
+    values = np.zeros(W.shape[0])
+    values[centre] = 1.0
+    values[W[centre].indices] = 1.0
+    far = int(np.flatnonzero(values == 0)[0])
+    values[far] = np.nan
+
+    result = hotspot.compute(values, permutations=PERMUTATIONS)
+    assert np.nanargmax(result.gi_z) == centre
+    assert result.frame()["hotspot"].iloc[centre].startswith("Hotspot")
+    assert np.isnan(result.gi_z[far]) and result.frame()["hotspot"].iloc[far] == hotspot.NO_DATA
+
+
+def test_compute_rejects_constant_values():
+    with pytest.raises(ValueError):
+        hotspot.compute(np.ones(hotspot.contiguity().W.shape[0]), permutations=PERMUTATIONS)
+
+
+def test_classify_uses_the_strictest_significant_level():
+    z = np.array([2.5, -2.5, 1.8, 0.3, np.nan])
+    p = np.array([0.01, 0.01, 0.07, 0.5, np.nan])
+    assert list(hotspot.classify(z, p)) == ["Hotspot 95%", "Coldspot 95%", "Hotspot 90%",
+                                             hotspot.NOT_SIGNIFICANT, hotspot.NO_DATA]
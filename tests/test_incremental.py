@@ -0,0 +1,58 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test rencana update inkremental — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import incremental
+
+IDX = pd.date_range("2023-01-01", periods=30, freq="MS")
+Y = pd.Series(np.linspace(50.0, 80.0, 30), IDX)
+N_PREV = 27
+
+
+def _state(n_obs=N_PREV, last_full_refit=None, upper=100.0, horizon=3) -> incremental.SeriesState:
+    dates = pd.date_range(IDX[n_obs], periods=horizon, freq="MS")
+    return incremental.SeriesState(
+        model="ets", params=[], n_obs=n_obs, last_obs=str(IDX[n_obs - 1].date()),
+        last_full_refit=last_full_refit or IDX[n_obs - 1].strftime("%Y-%m"),
+        history_sha1=incremental.history_sha1(Y.iloc[:n_obs]),
+        forecast={"date": dates.strftime("%Y-%m-%d").tolist(),
+                  "lower": [0.0] * horizon, "upper": [upper] * horizon},
+    )
+
+
+def test_plan_full_without_state_or_when_forced():
+    assert incremental.plan(Y, None)[0] == "full"
+    assert incremental.plan(Y, _state(), force_full=True)[0] == "full"
+
+
+def test_plan_skip_without_new_months():
+    assert incremental.plan(Y.iloc[:N_PREV], _state())[0] == "skip"
+
+
+def test_plan_warm_when_new_months_stay_inside_previous_band():
+    assert incremental.plan(Y, _state()) == ("warm", "3 bulan baru")
+
+
+def test_plan_full_when_history_changes():
+    revised = Y.copy()
+    revised.iloc[0] += 1.0
+    assert incremental.plan(revised, _state()) == ("full", "histori berubah")
+
+
+def test_plan_full_on_schedule():
+    old_refit = (IDX[N_PREV - 1] - pd.DateOffset(months=incremental.REFIT_EVERY_MONTHS)).strftime("%Y-%m")
+    assert incremental.plan(Y, _state(last_full_refit=old_refit))[0] == "full"
+
+
+def test_plan_full_on_drift():
+    action, reason = incremental.plan(Y, _state(upper=60.0))
+    assert action == "full" and reason.startswith("drift")
+
+
+@pytest.mark.parametrize("horizon", [0, 2])
+def test_plan_full_when_new_months_have_no_stored_band(horizon):
+    action, reason = incremental.plan(Y, _state(horizon=horizon))
+    assert action == "full" and "horizon" in reason
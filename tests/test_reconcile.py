@@ -0,0 +1,80 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test rekonsiliasi hierarki — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("scipy")
+
+from utils import panel, reconcile  # noqa: E402
+
+BOTTOM = ["Kota Surabaya", "Kabupaten Malang", "Kabupaten Kediri"]
+DATES = pd.date_range("2025-01-01", periods=3, freq="MS")
+
+
+def _base(target: str, values: dict, half_widths: dict) -> pd.DataFrame:
+    rows = []
+    for region, yhat in values.items():
+        for date, v in zip(DATES, yhat):
+            rows.append({"region": region, "target": target, "date": date, "yhat": v,
+                         "yhat_lower": v - half_widths[region], "yhat_upper": v + half_widths[region],
+                         "model": "ets", "last_obs": DATES[0] - pd.DateOffset(months=1)})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def base() -> pd.DataFrame:
+    counts = _base(
+        "Layanan OBGYN",
+        {panel.PROVINCE: [1000.0, 1100.0, 1050.0], "Kota Surabaya": [400.0, 420.0, 410.0],
+         "Kabupaten Malang": [300.0, 310.0, 305.0], "Kabupaten Kediri": [200.0, 210.0, 205.0]},
+        {panel.PROVINCE: 50.0, "Kota Surabaya": 10.0, "Kabupaten Malang": 40.0, "Kabupaten Kediri": 20.0},
+    )
+    rates = _base("BOR (%)", {r: [60.0, 61.0, 62.0] for r in [panel.PROVINCE, *BOTTOM]},
+                  {r: 5.0 for r in [panel.PROVINCE, *BOTTOM]})
+    return pd.concat([counts, rates], ignore_index=True)
+
+
+def _wide(df: pd.DataFrame, target: str) -> pd.DataFrame:
+    return df[df["target"] == target].pivot(index="date", columns="region", values="yhat")
+
+
+def test_targets_are_forecastable_count_columns():
+    assert reconcile.TARGETS and set(reconcile.TARGETS) <= set(panel.SUM_COLS)
+
+
+@pytest.mark.parametrize("method", list(reconcile.METHODS))
+def test_province_equals_sum_of_regions_after_reconcile(base, method):
+    before = _wide(base, "Layanan OBGYN")
+    assert not np.allclose(before[panel.PROVINCE], before[BOTTOM].sum(axis=1))   # input tidak koheren
+
+    out = reconcile.reconcile(base, method)
+    after = _wide(out, "Layanan OBGYN")
+    np.testing.assert_allclose(after[panel.PROVINCE], after[BOTTOM].sum(axis=1))
+    assert list(out.columns) == list(base.columns) and len(out) == len(base)
+
+
+def test_bottom_up_keeps_regions_and_mint_moves_uncertain_node_most(base):
+    bu = _wide(reconcile.reconcile(base, "bottom_up"), "Layanan OBGYN")
+    before = _wide(base, "Layanan OBGYN")
+    np.testing.assert_allclose(bu[BOTTOM], before[BOTTOM])
+
+    mint = _wide(reconcile.reconcile(base, "mint_wls"), "Layanan OBGYN")
+    shift = (mint[BOTTOM] - before[BOTTOM]).abs().iloc[0]
+    assert shift.idxmax() == "Kabupaten Malang"          # interval base paling lebar di antara kab/kota
+
+
+def test_interval_width_is_kept(base):
+    out = reconcile.reconcile(base, "mint_wls")
+    np.testing.assert_allclose(out["yhat_upper"] - out["yhat_lower"], base["yhat_upper"] - base["yhat_lower"])
+
+
+def test_rate_targets_pass_through(base):
+    out = reconcile.reconcile(base, "mint_wls")
+    pd.testing.assert_frame_equal(_wide(out, "BOR (%)"), _wide(base, "BOR (%)"))
+
+
+def test_single_node_hierarchy_is_unchanged(base):
+    province_only = base[base["region"] == panel.PROVINCE].reset_index(drop=True)
+    pd.testing.assert_frame_equal(reconcile.reconcile(province_only, "mint_wls"), province_only)
@@ -0,0 +1,49 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test normalisasi nama & join wilayah — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+import pandas as pd
+import pytest
+
+from utils import regions
+
+
+def test_normalize_separates_kota_and_kabupaten_forms():
+    keys = regions.normalize(pd.Series(["KOTA BLITAR", "Kabupaten Blitar", "Kab. Blitar", "KAB BLITAR",
+                                        "Blitar", "kota  Batu", "Kotabaru"]))
+    assert list(keys) == ["KOTA|BLITAR", "KAB|BLITAR", "KAB|BLITAR", "KAB|BLITAR", "|BLITAR", "KOTA|BATU",
+                          "KOTA|BARU"]
+
+
+def test_normalize_strips_punctuation_and_spaces():
+    assert regions.normalize(pd.Series([" Kab. Tulung-agung "])).iloc[0] == "KAB|TULUNGAGUNG"
+
+
+@pytest.fixture(scope="module")
+def dim() -> pd.DataFrame:
+    pytest.importorskip("geopandas")
+    return regions.dimension()
+
+
+def _code(dim: pd.DataFrame, name: str) -> int:
+    return int(dim.loc[dim["region_name"] == name, regions.CODE_COL].iloc[0])
+
+
+def test_resolve_keeps_kota_and_kabupaten_apart(dim):
+    codes = regions.resolve(pd.Series(["KOTA BLITAR", "KABUPATEN BLITAR", "Blitar", "Banyuwangi"]))
+    assert codes.iloc[0] == _code(dim, "Kota Blitar")
+    assert codes.iloc[1] == _code(dim, "Blitar")
+    assert pd.isna(codes.iloc[2])                                      # nama polos ambigu → tidak ditebak
+    assert codes.iloc[3] == _code(dim, "Banyuwangi")
+
+
+def test_join_reports_unmatched_duplicates_and_missing(dim):
+    df = pd.DataFrame({"nama": ["KOTA MALANG", "KABUPATEN MALANG", "KOTA MALANG", "ATLANTIS"],
+                       "nilai": [1.0, 2.0, 3.0, 4.0]})
+    joined, report = regions.join(df, "nama")
+    assert len(joined) == len(dim) and list(joined[regions.CODE_COL]) == list(dim[regions.CODE_COL])
+    values = joined.set_index("region_name")["nilai"]
+    assert values["Kota Malang"] == 1.0                                # baris pertama yang dipakai
+    assert values["Malang"] == 2.0
+    assert report.unmatched == ["ATLANTIS"]
+    assert report.duplicates == ["KOTA MALANG"]
+    assert len(report.missing) == len(dim) - 2 and not report.ok
@@ -0,0 +1,62 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test penempatan titik ke polygon kab/kota — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+import numpy as np
+import pandas as pd
+import pytest
+
+gpd = pytest.importorskip("geopandas")
+
+from utils import data_loader, regions, spatial  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def polygons():
+    gdf = gpd.read_file(data_loader.dataset_path("geo_kabkota"))
+    return gdf.to_crs(epsg=4326) if gdf.crs is not None else gdf.set_crs(epsg=4326)
+
+
+def test_points_inside_polygons_get_their_region_code(polygons):
+    inside = polygons.geometry.representative_point()
+    codes = spatial.get_index().assign_points(inside.x.to_numpy(), inside.y.to_numpy())
+    np.testing.assert_array_equal(codes, polygons["CC_2"].astype(np.int64).to_numpy())
+
+
+def test_far_points_and_missing_coordinates_are_unassigned():
+    codes = spatial.get_index().assign_points(np.array([0.0, np.nan]), np.array([0.0, np.nan]))
+    assert list(codes) == [-1, -1]
+
+
+def test_points_just_outside_the_coast_are_snapped(polygons):
+    import shapely
+
+    coords = shapely.get_coordinates(polygons.geometry.values)
+    x, y = coords[coords[:, 1].argmax()]                               # titik paling utara Jawa Timur
+    index = spatial.get_index()
+    near = index.assign_points(np.array([x]), np.array([y + spatial.SNAP_DEG / 2]))
+    far = index.assign_points(np.array([x]), np.array([y + 10 * spatial.SNAP_DEG]))
+    assert near[0] != -1 and far[0] == -1
+
+
+def test_aggregate_counts_categories_and_only_named_value_columns(polygons):
+    pts = polygons.geometry.representative_point().iloc[:2]
+    chunk = pd.DataFrame({
+        spatial.LON_COL: [pts.iloc[0].x, pts.iloc[0].x, pts.iloc[1].x, 0.0],
+        spatial.LAT_COL: [pts.iloc[0].y, pts.iloc[0].y, pts.iloc[1].y, 0.0],
+        "jenis": ["Puskesmas", "RS", "Puskesmas", "RS"],
+        "tempat_tidur": [0.0, 50.0, 10.0, 99.0],
+        "kode_faskes": [1001, 1002, 1003, 1004],
+    })
+    table, outside = spatial.aggregate([chunk.iloc[:2], chunk.iloc[2:]], value_cols=["tempat_tidur"])
+    assert outside == 1
+    assert "kode_faskes" not in table.columns
+    by_code = table.set_index(regions.CODE_COL)
+    first, second = (int(polygons["CC_2"].iloc[i]) for i in range(2))
+    assert by_code.loc[first, spatial.COUNT_COL] == 2 and by_code.loc[first, "tempat_tidur"] == 50.0
+    assert by_code.loc[second, "n_jenis_puskesmas"] == 1
+    assert table[spatial.COUNT_COL].sum() == table.filter(like=spatial.CATEGORY_PREFIX).to_numpy().sum() == 3
+
+
+def test_aggregate_rejects_value_columns_that_clash_with_counts():
+    with pytest.raises(ValueError):
+        spatial.aggregate(pd.DataFrame(), value_cols=[spatial.COUNT_COL])
@@ -0,0 +1,17 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Test budget cold start Home — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Regresi cold start gagal di CI, bukan hanya saat `python -m utils.startup` dijalankan manual.
+#   python -m pytest tests/test_startup.py
+#   NUTRIHEALTH_STARTUP_BUDGET_S=6.5 python -m pytest tests/test_startup.py
+import pytest
+
+pytest.importorskip("streamlit.testing.v1", reason="AppTest (streamlit.testing) tidak tersedia")
+
+from utils import startup  # noqa: E402
+
+
+def test_cold_start_within_budget():
+    budget_s = startup.budget_seconds()
+    elapsed = startup.cold_start_seconds()
+    assert elapsed <= budget_s, f"Cold start Home {elapsed:.2f} s melebihi budget {budget_s:.2f} s"
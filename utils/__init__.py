@@ -0,0 +1 @@
+"""Helper modules NutriHealth AI Dashboard (data, cache, & komputasi)."""
@@ -0,0 +1,147 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Static Asset Pipeline — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Logo & hero banner asli berukuran MB (PNG 3.2 MB, JPG 3 MB). Build step di bawah membuat varian
+# WebP (+ AVIF bila Pillow mendukung) pada lebar tampilan yang benar-benar dipakai, ditaruh di
+# static/img/ dan disajikan lewat static serving Streamlit (.streamlit/config.toml), sehingga
+# browser bisa cache & server tidak perlu decode/re-encode gambar di setiap rerun.
+#
+# Build ulang setelah mengganti logo/banner:
+#   python -m utils.assets
+import base64
+import functools
+import pathlib
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from utils.data_loader import ROOT_DIR
+
+STATIC_DIR = ROOT_DIR / "static"
+VARIANT_DIR = STATIC_DIR / "img"
+STATIC_URL_PREFIX = "app/static/img"
+
+WEBP_QUALITY = 80
+AVIF_QUALITY = 60
+FAVICON_SIZE = 64
+
+
+@dataclass(frozen=True)
+class AssetSpec:
+    source: str                  # path relatif dari root repo
+    widths: Tuple[int, ...]      # lebar varian (px) = lebar tampilan × DPR yang didukung
+    dpr: int = 2                 # device pixel ratio target saat memilih varian
+
+
+# Lebar tampilan: logo dialog 250 px, footer 100 px, sidebar ±300 px; hero = lebar kontainer wide
+ASSETS: Dict[str, AssetSpec] = {
+    "logo": AssetSpec("icon/Only LOGO.png", widths=(200, 500, 600)),
+    "hero": AssetSpec("source/Main Hero Banner.jpg", widths=(800, 1400), dpr=1),
+}
+
+
+def variant_path(name: str, width: int, ext: str = "webp") -> pathlib.Path:
+    return VARIANT_DIR / f"{name}-{width}.{ext}"
+
+
+def favicon_path() -> str:
+    """Favicon PNG kecil (page_icon); fallback ke logo asli jika belum di-build."""
+    path = VARIANT_DIR / f"logo-{FAVICON_SIZE}.png"
+    return str(path) if path.is_file() else str(ROOT_DIR / ASSETS["logo"].source)
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Build step
+# ------------------------------- | ------------------------------- | -------------------------------
+def build(verbose: bool = True) -> None:
+    """Generate varian WebP/AVIF (+ favicon PNG) untuk semua aset terdaftar."""
+    from PIL import Image, features
+
+    Image.MAX_IMAGE_PIXELS = None  # sumber lokal tepercaya; hero asli ±113 MP
+    VARIANT_DIR.mkdir(parents=True, exist_ok=True)
+    with_avif = features.check("avif")
+
+    for name, spec in ASSETS.items():
+        with Image.open(ROOT_DIR / spec.source) as img:
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+            for width in spec.widths:
+                w = min(width, img.width)
+                resized = img.resize((w, round(img.height * w / img.width)), Image.LANCZOS)
+                resized.save(variant_path(name, width, "webp"), "WEBP", quality=WEBP_QUALITY, method=6)
+                if with_avif:
+                    resized.save(variant_path(name, width, "avif"), "AVIF", quality=AVIF_QUALITY)
+            if name == "logo":
+                icon = img.copy()
+                icon.thumbnail((FAVICON_SIZE, FAVICON_SIZE), Image.LANCZOS)
+                icon.save(VARIANT_DIR / f"logo-{FAVICON_SIZE}.png", "PNG", optimize=True)
+
+    # invalidasi lookup yang sudah di-cache di proses ini
+    _best_variant.cache_clear()
+    asset_b64.cache_clear()
+
+    if verbose:
+        total = 0
+        for path in sorted(VARIANT_DIR.iterdir()):
+            total += path.stat().st_size
+            print(f"{path.relative_to(ROOT_DIR)}  {path.stat().st_size / 1024:7.1f} KB")
+        print(f"Total: {total / 1024:.1f} KB")
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Lookup (di-cache per proses)
+# ------------------------------- | ------------------------------- | -------------------------------
+@functools.lru_cache(maxsize=None)
+def _best_variant(name: str, display_width: int, ext: str = "webp") -> Optional[int]:
+    """Lebar varian terkecil yang >= display_width × dpr (atau terbesar yang tersedia)."""
+    spec = ASSETS[name]
+    available = [w for w in sorted(spec.widths) if variant_path(name, w, ext).is_file()]
+    if not available:
+        return None
+    needed = display_width * spec.dpr
+    return next((w for w in available if w >= needed), available[-1])
+
+
+def _static_serving_enabled() -> bool:
+    import streamlit as st
+
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def asset_b64(name: str, display_width: int) -> Tuple[str, str]:
+    """(mime, base64) varian terbaik; di-encode sekali per proses, bukan di setiap rerun."""
+    width = _best_variant(name, display_width)
+    if width is not None:
+        path, mime = variant_path(name, width), "image/webp"
+    else:
+        path = ROOT_DIR / ASSETS[name].source
+        mime = "image/png" if path.suffix.lower() == ".png" else "image/jpeg"
+    return mime, base64.b64encode(path.read_bytes()).decode()
+
+
+def asset_src(name: str, display_width: int) -> str:
+    """URL untuk atribut src <img>: static URL (cacheable) jika tersedia, selain itu data URI."""
+    width = _best_variant(name, display_width)
+    if width is not None and _static_serving_enabled():
+        return f"{STATIC_URL_PREFIX}/{name}-{width}.webp"
+    mime, b64 = asset_b64(name, display_width)
+    return f"data:{mime};base64,{b64}"
+
+
+def asset_html(name: str, display_width: Optional[int] = None, alt: str = "") -> str:
+    """Tag <picture> (AVIF → WebP) untuk aset; display_width None = lebar penuh kontainer."""
+    width_hint = display_width or max(ASSETS[name].widths)
+    src = asset_src(name, width_hint)
+    size_attr = f'width="{display_width}"' if display_width else 'style="width:100%; height:auto; display:block;"'
+
+    avif_width = _best_variant(name, width_hint, "avif")
+    avif_source = ""
+    if avif_width is not None and src.startswith(STATIC_URL_PREFIX):
+        avif_source = f'<source type="image/avif" srcset="{STATIC_URL_PREFIX}/{name}-{avif_width}.avif">'
+    return f'<picture>{avif_source}<img src="{src}" alt="{alt}" {size_attr}/></picture>'
+
+
+if __name__ == "__main__":
+    build()
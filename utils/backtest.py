@@ -0,0 +1,221 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Rolling-Origin Backtest — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Evaluasi akurasi tiap target × model kandidat × fold (origin bergulir di akhir series):
+#   fold k: train = y[:origin_k], test = y[origin_k : origin_k + HORIZON]
+# Metrik: MASE (skala = MAE naive musiman di data train) & sMAPE (%).
+#
+# Tiap (target, model, fold) = satu task, dijalankan paralel di ProcessPoolExecutor. Hasil fold
+# di-cache per key hash (train, test, model, horizon), jadi menambah satu model kandidat hanya
+# menghitung fold model itu — fold model lain diambil dari cache.
+# Cache disk dipartisi per (region, target): tiap batch fold baru ditulis sebagai file part sendiri
+# (nama unik, tmp + rename), jadi dua session yang miss bersamaan tidak saling menimpa. Tab
+# Forecasting memakai `accuracy_or_start`: fold yang belum ada dihitung di thread latar belakang.
+#
+#   python -m utils.backtest                 # semua target, semua model
+#   python -m utils.backtest --models S-Naive "ETS(add,None)"
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, forecasting, panel
+
+N_FOLDS = 6
+HORIZON = 6                 # bulan per fold
+STEP = 1                    # jarak antar origin (bulan)
+CACHE_DIR = forecasting.CACHE_DIR / "backtest_folds"
+FOLD_COLUMNS = ["key", "region", "target", "model", "origin", "mase", "smape"]
+
+_RUNNING: Dict[Tuple[str, str], threading.Thread] = {}
+_LOCK = threading.Lock()
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Metrik
+# ------------------------------- | ------------------------------- | -------------------------------
+def mase(y: np.ndarray, yhat: np.ndarray, train: np.ndarray, m: int = forecasting.SEASONAL_PERIOD) -> float:
+    """MAE forecast / MAE in-sample naive musiman (naive lag-1 jika train < m + 1)."""
+    lag = m if len(train) > m else 1
+    scale = np.mean(np.abs(train[lag:] - train[:-lag]))
+    if not np.isfinite(scale) or scale == 0:
+        return np.nan
+    return float(np.mean(np.abs(y - yhat)) / scale)
+
+
+def smape(y: np.ndarray, yhat: np.ndarray) -> float:
+    """Symmetric MAPE (%); titik dengan |y| + |ŷ| = 0 diabaikan."""
+    denom = np.abs(y) + np.abs(yhat)
+    mask = denom > 0
+    if not mask.any():
+        return np.nan
+    return float(np.mean(2 * np.abs(y - yhat)[mask] / denom[mask]) * 100)
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Fold & task
+# ------------------------------- | ------------------------------- | -------------------------------
+def origins(n_obs: int, n_folds: int = N_FOLDS, horizon: int = HORIZON, step: int = STEP) -> List[int]:
+    """Indeks origin (panjang train) tiap fold, fold terakhir berakhir di observasi terakhir."""
+    last = n_obs - horizon
+    return [o for o in range(last - (n_folds - 1) * step, last + 1, step) if o > 0]
+
+
+def fold_key(y: pd.Series, origin: int, model: str, horizon: int) -> str:
+    h = hashlib.sha1(json.dumps([forecasting.ENGINE_VERSION, model, horizon, str(y.index[0])]).encode())
+    h.update(np.ascontiguousarray(y.to_numpy(dtype=np.float64)[:origin + horizon]).tobytes())
+    h.update(str(origin).encode())
+    return h.hexdigest()
+
+
+def _run_fold(task: Tuple[str, str, str, str, pd.Series, int, int]) -> Dict:
+    key, region, target, model, y, origin, horizon = task
+    train, test = y.iloc[:origin], y.to_numpy()[origin:origin + horizon]
+    try:
+        yhat = forecasting.fit_model(model, train).forecast(horizon).yhat
+        yhat = np.clip(yhat, 0, None)
+        scores = (mase(test, yhat, train.to_numpy()), smape(test, yhat))
+    except Exception:
+        scores = (np.nan, np.nan)
+    return {"key": key, "region": region, "target": target, "model": model,
+            "origin": y.index[origin - 1], "mase": scores[0], "smape": scores[1]}
+
+
+def partition_dir(region: str, target: str) -> pathlib.Path:
+    return (CACHE_DIR / f"region={urllib.parse.quote(region, safe='')}"
+            / f"target={urllib.parse.quote(target, safe='')}")
+
+
+def _read_cache(region: str, target: str) -> pd.DataFrame:
+    parts = sorted(partition_dir(region, target).glob("part-*.parquet"))
+    if not parts:
+        return pd.DataFrame(columns=FOLD_COLUMNS)
+    return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True).drop_duplicates("key")
+
+
+def _write_part(rows: pd.DataFrame, region: str, target: str) -> None:
+    """Tambah fold baru sebagai file part baru (nama unik → penulis bersamaan tidak bentrok)."""
+    folder = partition_dir(region, target)
+    folder.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=folder, prefix=".tmp-", suffix=".parquet", delete=False) as f:
+        tmp = pathlib.Path(f.name)
+    rows.to_parquet(tmp, index=False)
+    tmp.replace(folder / f"part-{tmp.stem[len('.tmp-'):]}.parquet")
+
+
+def plan(regions: Sequence[str], targets: Sequence[str], models: Optional[Sequence[str]] = None,
+         horizon: int = HORIZON) -> Tuple[pd.DataFrame, List[str], List[Tuple]]:
+    """(fold di cache, key fold yang dibutuhkan, task fold yang belum di-cache)."""
+    cached, wanted, pending = [], [], []
+    for region in regions:
+        frame = panel.region_frame(region, columns=["Date", *targets])
+        for target in targets:
+            cache = _read_cache(region, target)
+            cached.append(cache)
+            cached_keys = set(cache["key"])
+            y = forecasting.prepare_series(frame, target)
+            for model in (models or list(forecasting.MODELS)):
+                for origin in origins(len(y), horizon=horizon):
+                    if origin < forecasting.MODELS[model].min_obs:
+                        continue
+                    key = fold_key(y, origin, model, horizon)
+                    wanted.append(key)
+                    if key not in cached_keys:
+                        pending.append((key, region, target, model, y, origin, horizon))
+    return pd.concat(cached, ignore_index=True) if cached else pd.DataFrame(columns=FOLD_COLUMNS), wanted, pending
+
+
+def run_folds(regions: Optional[Sequence[str]] = None, targets: Sequence[str] = forecasting.TARGET_COLS,
+              models: Optional[Sequence[str]] = None, horizon: int = HORIZON,
+              workers: Optional[int] = None) -> pd.DataFrame:
+    """Skor per fold untuk semua (region, target, model, fold); hanya fold yang belum di-cache yang difit."""
+    regions = list(regions) if regions is not None else panel.regions()
+    cache, wanted, pending = plan(regions, targets, models, horizon)
+
+    if pending:
+        workers = workers or min(len(pending), os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rows = list(pool.map(_run_fold, pending, chunksize=max(1, len(pending) // (4 * workers))))
+        else:
+            rows = [_run_fold(task) for task in pending]
+        new = pd.DataFrame(rows, columns=FOLD_COLUMNS)
+        for (region, target), part in new.groupby(["region", "target"], sort=False):
+            _write_part(part, region, target)
+        cache = pd.concat([cache, new], ignore_index=True)
+
+    return cache[cache["key"].isin(wanted)].drop_duplicates("key").drop(columns="key").reset_index(drop=True)
+
+
+def accuracy_table(folds: pd.DataFrame) -> pd.DataFrame:
+    """Ringkasan tidy per (region, target, model): rata-rata MASE/sMAPE lintas fold + peringkat MASE."""
+    out = (
+        folds.groupby(["region", "target", "model"], as_index=False)
+        .agg(folds=("mase", "count"), MASE=("mase", "mean"), sMAPE=("smape", "mean"))
+    )
+    out["rank"] = out.groupby(["region", "target"])["MASE"].rank(method="min").astype("Int64")
+    return out.sort_values(["region", "target", "rank"]).reset_index(drop=True)
+
+
+def target_accuracy(target: str, region: str = panel.PROVINCE) -> pd.DataFrame:
+    """Tabel akurasi satu target (untuk tab Forecasting), di-cache per versi data ABT."""
+    def _compute(_p):
+        return accuracy_table(run_folds([region], [target]))
+
+    return data_loader.cached_read(
+        f"abt:backtest[{region}|{target}]", panel.source_paths(), _compute
+    )
+
+
+def accuracy_or_start(target: str, region: str = panel.PROVINCE) -> Optional[pd.DataFrame]:
+    """Tabel akurasi jika sudah di memori / semua fold ada di disk; jika belum, hitung di thread
+    latar belakang & return None (UI tidak menunggu fit fold)."""
+    hit, table = data_loader.peek(f"abt:backtest[{region}|{target}]", panel.source_paths())
+    if hit:
+        return table
+    # thread yang sedang jalan dicek dulu: selama fold dihitung, rerun tidak membaca ulang part parquet
+    # & tidak meng-hash ulang series lewat plan()
+    with _LOCK:
+        running = _RUNNING.get((region, target))
+        if running is not None and (running.is_alive() or running.ident is None):   # ident None: terdaftar, belum start
+            return None
+        thread = threading.Thread(target=target_accuracy, args=(target, region),
+                                  name=f"backtest-{region}-{target}", daemon=True)
+        _RUNNING[(region, target)] = thread
+
+    try:
+        pending = plan([region], [target])[2]
+    except BaseException:
+        with _LOCK:
+            _RUNNING.pop((region, target), None)
+        raise
+    if not pending:                                                   # semua fold sudah di cache disk
+        with _LOCK:
+            _RUNNING.pop((region, target), None)
+        return target_accuracy(target, region)
+    thread.start()
+    return None
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest (MASE/sMAPE) semua target × model.")
+    parser.add_argument("--models", nargs="*", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    table = accuracy_table(run_folds(models=args.models, workers=args.workers))
+    pd.set_option("display.float_format", lambda x: f"{x:.3f}")
+    print(table.to_string(index=False))
+    print(f"\n{time.perf_counter() - t0:.1f} s")
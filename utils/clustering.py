@@ -0,0 +1,171 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# In-app Clustering Engine — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Pengganti kolom `Cluster` offline di Cluster-ABT-v2.csv: k-means (inisialisasi k-means++) di atas
+# indikator kab/kota, dihitung di app dengan NumPy (scikit-learn tidak ada di requirements).
+#   - standardisasi z-score SEMUA kolom kandidat dihitung sekali per versi file (vektorisasi);
+#     subset fitur = pilih kolom dari matriks itu, tidak distandardisasi ulang;
+#   - hasil k-means di-memo per (fitur, k), jadi ganti kembali ke konfigurasi lama = lookup;
+#   - label cluster diurutkan dari rata-rata indeks_kesehatan (terendah → "Perlu Diperhatikan"),
+#     sehingga warna peta tetap bermakna untuk k berapa pun.
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader
+
+NAME_COL = "nama_kabupaten_kota"
+RANK_COL = "indeks_kesehatan"
+FEATURE_GROUPS: Dict[str, List[str]] = {
+    "Indeks kesehatan": ["indeks_kesehatan"],
+    "BBLR": ["jumlah_bayi_bblr"],
+    "Kematian ibu (AKI)": ["jumlah_kematian_ibu"],
+    "Persalinan di faskes": ["jumlahpersalinandi_fasilitas_kesehatan"],
+    "Gizi balita": ["persentase_balita_gizi_buruk", "prev_balita_gizi_kurang"],
+    "Tenaga kesehatan": ["JUMLAH TENAGA BIDAN", "JUMLAH TENAGA DOKTER UMUM",
+                         "JUMLAH TENAGA GIZI", "JUMLAH TENAGA PERAWAT"],
+    "Kelas RS": ["KELAS A", "KELAS B", "KELAS C", "KELAS D"],
+}
+DEFAULT_GROUPS = ["Indeks kesehatan", "BBLR", "Kematian ibu (AKI)", "Tenaga kesehatan", "Kelas RS"]
+K_RANGE = (2, 6)
+DEFAULT_K = 4
+N_INIT = 10
+MAX_ITER = 100
+SEED = 42
+
+# Nama kategori per k, urut dari indeks_kesehatan terendah → tertinggi (k=4 = kategori file offline)
+LEVEL_NAMES: Dict[int, List[str]] = {
+    2: ["Perlu Diperhatikan", "Baik"],
+    3: ["Perlu Diperhatikan", "Cukup", "Baik"],
+    4: ["Perlu Diperhatikan", "Warning", "Cukup", "Baik"],
+    5: ["Perlu Diperhatikan", "Warning", "Cukup", "Baik", "Sangat Baik"],
+    6: ["Kritis", "Perlu Diperhatikan", "Warning", "Cukup", "Baik", "Sangat Baik"],
+}
+
+
+@dataclass(frozen=True)
+class ClusterResult:
+    features: Tuple[str, ...]
+    k: int
+    labels: np.ndarray          # kode cluster per baris data cluster, 0 = indeks_kesehatan terendah
+    names: List[str]            # nama kategori per kode
+    inertia: float
+
+    def label_series(self, index: pd.Index) -> pd.Series:
+        return pd.Series(np.asarray(self.names, dtype=object)[self.labels], index=index, name="Cluster_label")
+
+
+def feature_columns(groups: Sequence[str]) -> List[str]:
+    return [col for g in groups for col in FEATURE_GROUPS[g]]
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Standardisasi (sekali per versi data)
+# ------------------------------- | ------------------------------- | -------------------------------
+def standardize(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """Z-score semua kolom sekaligus; NaN diisi rata-rata kolom, kolom konstan → 0."""
+    X = df[list(columns)].to_numpy(dtype=float)
+    mean = np.nanmean(X, axis=0)
+    std = np.nanstd(X, axis=0)
+    Z = (np.where(np.isnan(X), mean, X) - mean) / np.where(std > 0, std, 1.0)
+    return pd.DataFrame(Z, index=df.index, columns=list(columns))
+
+
+def standardized() -> pd.DataFrame:
+    """Matriks z-score semua kolom kandidat, di-cache per versi Cluster-ABT-v2.csv."""
+    all_cols = feature_columns(FEATURE_GROUPS)
+    return data_loader.cached_read(
+        "cluster:standardized", data_loader.dataset_path("cluster"),
+        lambda _p: standardize(data_loader.load("cluster"), all_cols),
+    )
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# k-means++ (NumPy)
+# ------------------------------- | ------------------------------- | -------------------------------
+def _sq_dist(X: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Jarak kuadrat [n × k] lewat ‖x‖² - 2x·c + ‖c‖²."""
+    return np.maximum((X ** 2).sum(1)[:, None] - 2 * X @ C.T + (C ** 2).sum(1)[None, :], 0.0)
+
+
+def assign(X: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Kode centroid terdekat untuk tiap baris X."""
+    return _sq_dist(X, C).argmin(1)
+
+
+def _kmeans_pp(X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centers = [X[rng.integers(len(X))]]
+    closest = _sq_dist(X, centers[0][None, :])[:, 0]
+    for _ in range(1, k):
+        probs = closest / closest.sum() if closest.sum() > 0 else None
+        centers.append(X[rng.choice(len(X), p=probs)])
+        closest = np.minimum(closest, _sq_dist(X, centers[-1][None, :])[:, 0])
+    return np.stack(centers)
+
+
+def kmeans(X: np.ndarray, k: int, n_init: int = N_INIT, max_iter: int = MAX_ITER,
+           seed: int = SEED) -> Tuple[np.ndarray, np.ndarray, float]:
+    """(labels, centroid, inertia) terbaik dari `n_init` run Lloyd dengan inisialisasi k-means++."""
+    rng = np.random.default_rng(seed)
+    best = None
+    for _ in range(n_init):
+        C = _kmeans_pp(X, k, rng)
+        labels = np.full(len(X), -1)
+        for _ in range(max_iter):
+            new = assign(X, C)
+            if np.array_equal(new, labels):
+                break
+            labels = new
+            counts = np.bincount(labels, minlength=k)
+            sums = np.zeros_like(C)
+            np.add.at(sums, labels, X)
+            C = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], C)   # cluster kosong → centroid lama
+        inertia = float(_sq_dist(X, C)[np.arange(len(X)), labels].sum())
+        if best is None or inertia < best[2]:
+            best = (labels, C, inertia)
+    return best
+
+
+def rank_labels(labels: np.ndarray, rank_values: np.ndarray, k: int) -> np.ndarray:
+    """Kode ulang cluster: 0 = rata-rata `rank_values` terendah."""
+    sums = np.bincount(labels, weights=rank_values, minlength=k)
+    means = sums / np.maximum(np.bincount(labels, minlength=k), 1)
+    order = np.argsort(means, kind="stable")
+    remap = np.empty(k, dtype=int)
+    remap[order] = np.arange(k)
+    return remap[labels]
+
+
+def cluster(groups: Sequence[str] = DEFAULT_GROUPS, k: int = DEFAULT_K) -> ClusterResult:
+    """k-means untuk subset fitur `groups` & jumlah cluster `k`; di-memo per konfigurasi & versi data."""
+    columns = tuple(feature_columns(groups))
+    if not columns:
+        raise ValueError("Pilih minimal satu kelompok fitur untuk clustering.")
+    if not K_RANGE[0] <= k <= K_RANGE[1]:
+        raise ValueError(f"k harus di rentang {K_RANGE[0]}–{K_RANGE[1]}.")
+
+    def _compute(_p):
+        Z = standardized()[list(columns)].to_numpy()
+        labels, _, inertia = kmeans(Z, k)
+        rank_values = data_loader.load("cluster")[RANK_COL].to_numpy(dtype=float)
+        return ClusterResult(columns, k, rank_labels(labels, np.nan_to_num(rank_values), k), LEVEL_NAMES[k], inertia)
+
+    return data_loader.cached_read(
+        f"cluster:kmeans[{k}|{','.join(columns)}]", data_loader.dataset_path("cluster"), _compute
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    _df = data_loader.load("cluster")
+    for _k in range(K_RANGE[0], K_RANGE[1] + 1):
+        t0 = time.perf_counter()
+        _res = cluster(k=_k)
+        _counts = _res.label_series(_df.index).value_counts().reindex(_res.names).tolist()
+        print(f"k={_k}: inertia {_res.inertia:.1f}, ukuran {_counts} ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+    _res = cluster()
+    print("\nvs kolom Cluster offline (crosstab):")
+    print(pd.crosstab(_df["Cluster"], _res.label_series(_df.index)))
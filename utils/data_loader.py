@@ -0,0 +1,195 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Data Access Layer — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Semua dataset di folder data/ dimuat lewat modul ini, sekali per proses server.
+# Cache di-share lintas session (read-only!) dan di-key dengan signature file (mtime + size)
+# serta hash konten, sehingga file yang berubah otomatis dimuat ulang.
+import hashlib
+import pathlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+ROOT_DIR = pathlib.Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / "data"
+
+
+def _read_csv(path: pathlib.Path):
+    return pd.read_csv(path)
+
+
+def _read_geojson(path: pathlib.Path):
+    import geopandas as gpd  # berat → import saat dibutuhkan saja
+    return gpd.read_file(path)
+
+
+# Registry dataset: nama logis -> (nama file di data/, fungsi reader)
+DATASETS: Dict[str, Tuple[str, Callable[[pathlib.Path], Any]]] = {
+    "abt":              ("ABT_Master.csv", _read_csv),
+    "abt_kabkota":      ("ABT_KabKota.csv", _read_csv),       # opsional: panel kab/kota × bulan
+    "forecast_results": ("forecast_results.csv", _read_csv),
+    "merged_forecast":  ("df_merged_after_forecast.csv", _read_csv),
+    "cluster":          ("Cluster-ABT-v2.csv", _read_csv),
+    "geo_kabkota":      ("jatim_kabkota.geojson", _read_geojson),
+    "facilities":       ("Fasilitas_Kesehatan.csv", _read_csv),   # opsional: titik faskes (longitude, latitude, jenis, …)
+}
+
+
+@dataclass
+class _Entry:
+    signature: tuple             # (mtime_ns, size) per file sumber
+    digest: str                  # sha1 konten file (digabung "|" jika beberapa file)
+    data: Any
+
+
+@dataclass
+class _Counter:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+
+_CACHE: Dict[str, _Entry] = {}
+_STATS: Dict[str, _Counter] = {}
+_LOCK = threading.RLock()                        # hanya untuk _CACHE/_STATS/_KEY_LOCKS, bukan untuk reader
+_KEY_LOCKS: Dict[str, threading.RLock] = {}
+
+
+def dataset_path(name: str) -> pathlib.Path:
+    """Path absolut file untuk dataset terdaftar."""
+    if name not in DATASETS:
+        raise KeyError(f"Dataset '{name}' tidak terdaftar. Pilihan: {sorted(DATASETS)}")
+    return DATA_DIR / DATASETS[name][0]
+
+
+def _signature(path: pathlib.Path) -> Tuple[int, int]:
+    if not path.exists():
+        return -1, -1                            # file opsional yang (belum / sudah tidak) ada
+    st_ = path.stat()
+    return st_.st_mtime_ns, st_.st_size
+
+
+def _paths(source: Union[pathlib.Path, Sequence[pathlib.Path]]) -> Tuple[pathlib.Path, ...]:
+    return (source,) if isinstance(source, pathlib.Path) else tuple(source)
+
+
+def _signatures(paths: Sequence[pathlib.Path]) -> tuple:
+    return tuple(_signature(p) for p in paths)
+
+
+def _digests(paths: Sequence[pathlib.Path]) -> str:
+    return "|".join(file_digest(p) if p.exists() else "-" for p in paths)
+
+
+def file_digest(path: pathlib.Path, chunk_size: int = 1 << 20) -> str:
+    """Hash sha1 konten file (dibaca per chunk)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _key_lock(key: str) -> threading.RLock:
+    with _LOCK:
+        return _KEY_LOCKS.setdefault(key, threading.RLock())
+
+
+def _lookup(key: str, sig: tuple, digest: Optional[str] = None) -> Tuple[bool, Any]:
+    """(hit, data) untuk entry `key`; cocok lewat signature, atau lewat hash konten jika `digest` diberikan."""
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return False, None
+        if entry.signature != sig:
+            if digest is None or entry.digest != digest:
+                return False, None
+            entry.signature = sig                  # file di-touch / di-checkout ulang, isi sama
+        _STATS.setdefault(key, _Counter()).hits += 1
+        return True, entry.data
+
+
+def cached_read(key: str, path: Union[pathlib.Path, Sequence[pathlib.Path]],
+                reader: Callable[[Any], Any]) -> Any:
+    """Baca `path` lewat `reader` sekali per proses; cache di-key `key` + signature/hash file.
+
+    Dipakai juga oleh modul lain (mis. storage) untuk turunan dari file sumber yang sama.
+    `path` boleh berupa beberapa file (turunan dari >1 sumber): entry valid selama SEMUA file sama;
+    file yang tidak ada ikut di-hash sebagai "tidak ada", jadi menghapus sumber opsional juga terdeteksi.
+    Lock global hanya dipegang saat cek / publish entry; `reader` jalan di bawah lock per key,
+    jadi hitungan berat satu key tidak memblokir load dataset lain di session lain.
+    """
+    paths = _paths(path)
+    sig = _signatures(paths)
+    hit, data = _lookup(key, sig)
+    if hit:
+        return data
+
+    with _key_lock(key):
+        # thread lain mungkin baru selesai mengisi key ini selama kita menunggu
+        sig = _signatures(paths)
+        hit, data = _lookup(key, sig)
+        if hit:
+            return data
+        # mtime/size berubah → cek hash konten dulu (mis. file di-touch / di-checkout ulang)
+        digest = _digests(paths)
+        hit, data = _lookup(key, sig, digest)
+        if hit:
+            return data
+
+        data = reader(path)
+        with _LOCK:
+            _STATS.setdefault(key, _Counter()).misses += 1
+            _CACHE[key] = _Entry(signature=sig, digest=digest, data=data)
+        return data
+
+
+def peek(key: str, path: Union[pathlib.Path, Sequence[pathlib.Path]]) -> Tuple[bool, Any]:
+    """(hit, data) untuk `key` tanpa membaca / menghitung apa pun (hanya cek signature file)."""
+    return _lookup(key, _signatures(_paths(path)))
+
+
+def load(name: str) -> Any:
+    """Muat dataset `name` dari cache proses; baca dari disk hanya jika file berubah.
+
+    Objek yang dikembalikan di-share lintas session → JANGAN dimodifikasi in-place.
+    Pakai `.copy()` dulu kalau perlu menambah/mengubah kolom.
+    """
+    return cached_read(name, dataset_path(name), DATASETS[name][1])
+
+
+def dataset_version(name: str) -> str:
+    """Versi (hash konten) dataset; dipakai sebagai bagian key cache turunan."""
+    load(name)
+    with _LOCK:
+        return _CACHE[name].digest
+
+
+def invalidate(name: Optional[str] = None) -> None:
+    """Buang cache satu dataset beserta turunannya (atau semua jika `name` None) secara eksplisit."""
+    with _LOCK:
+        if name is None:
+            names = list(_CACHE)
+        else:
+            names = [k for k in _CACHE if k == name or k.startswith(f"{name}:")]
+        for n in names:
+            if _CACHE.pop(n, None) is not None:
+                _STATS.setdefault(n, _Counter()).invalidations += 1
+
+
+def cache_stats() -> pd.DataFrame:
+    """Counter hit/miss per dataset, untuk memastikan rerun tidak membaca ulang disk."""
+    with _LOCK:
+        rows = [
+            {
+                "dataset": n,
+                "hits": c.hits,
+                "misses": c.misses,
+                "invalidations": c.invalidations,
+                "version": _CACHE[n].digest[:10] if n in _CACHE else None,
+            }
+            for n, c in sorted(_STATS.items())
+        ]
+    return pd.DataFrame(rows, columns=["dataset", "hits", "misses", "invalidations", "version"])
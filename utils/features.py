@@ -0,0 +1,132 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Capacity Feature Engine — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Fitur kapasitas & mutu layanan RS (HI, BTO_month, IdleShare, EDR, BOR_status, TOI_status,
+# Capacity_alert) dihitung full vectorized di numpy — tanpa Series.apply per baris — sehingga
+# bisa dipakai untuk ABT provinsi (puluhan baris) maupun data SIRS level faskes × bulan (jutaan baris).
+#
+# Aturan aman:
+#   - pembagian dengan penyebut <= 0 / NaN → NaN (bukan inf)
+#   - nilai input NaN → fitur NaN & label kategori NaN (Capacity_alert = 0)
+#
+# Benchmark:
+#   python -m utils.features --rows 5000000
+import argparse
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Nama kolom input (sesuai ABT)
+AVLOS_COL = "AVLOS (Day)"
+BOR_COL = "BOR (%)"
+TOI_COL = "TOI (Day)"
+GDR_COL = "GDR (/K)"
+NDR_COL = "NDR (/K)"
+
+# Ambang kategori manajerial: x < lower → kategori 0, lower <= x <= upper → 1, x > upper → 2
+BOR_THRESHOLDS = (60.0, 80.0)
+BOR_LEVELS = ["under-utilized", "optimal", "saturated"]
+TOI_THRESHOLDS = (1.0, 3.0)
+TOI_LEVELS = ["cepat", "sehat", "lambat"]
+
+# Alert kapasitas: bed padat (BOR > 80) + jeda antar pasien sangat cepat (TOI < 1)
+ALERT_BOR_MIN = 80.0
+ALERT_TOI_MAX = 1.0
+
+CAPACITY_FEATURES = ["days_in_month", "HI", "BTO_month", "IdleShare", "EDR",
+                     "BOR_status", "TOI_status", "Capacity_alert"]
+
+
+def _values(df: pd.DataFrame, col: str) -> np.ndarray:
+    return df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den dengan hasil NaN jika penyebut <= 0 atau NaN."""
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den > 0)   # NaN > 0 → False
+    return out
+
+
+def status_labels(values: np.ndarray, thresholds: Sequence[float], levels: Sequence[str]) -> pd.Categorical:
+    """Label 3 tingkat (x < lo, lo <= x <= hi, x > hi) sebagai Categorical dari kode int8; NaN → NaN."""
+    lo, hi = thresholds
+    with np.errstate(invalid="ignore"):
+        codes = (values >= lo).astype(np.int8) + (values > hi).astype(np.int8)
+    codes[np.isnan(values)] = -1
+    return pd.Categorical.from_codes(codes, categories=list(levels), ordered=True)
+
+
+def add_capacity_features(df: pd.DataFrame, date_col: Optional[str] = "Date",
+                          days_in_month: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """DataFrame baru = df + fitur kapasitas (lihat CAPACITY_FEATURES).
+
+    Panjang bulan diambil dari `date_col` (datetime), atau dari `days_in_month` bila diberikan.
+    """
+    if days_in_month is None:
+        days_in_month = df[date_col].dt.days_in_month.to_numpy(dtype=np.float64)
+
+    avlos = _values(df, AVLOS_COL)
+    bor = _values(df, BOR_COL)
+    toi = _values(df, TOI_COL)
+    gdr = _values(df, GDR_COL)
+    ndr = _values(df, NDR_COL)
+
+    hi = avlos + toi                                      # Hospitalization Interval: dirawat + jeda
+    with np.errstate(invalid="ignore"):
+        edr = np.maximum(gdr - ndr, 0.0)                  # Early-Death Component ≈ kematian <48 jam (NaN tetap NaN)
+        alert = (bor > ALERT_BOR_MIN) & (toi < ALERT_TOI_MAX)
+
+    features = pd.DataFrame({
+        "days_in_month": days_in_month,
+        "HI": hi,
+        "BTO_month": safe_divide(days_in_month, hi),      # berapa kali 1 bed "berputar" per bulan
+        "IdleShare": 1.0 - bor / 100.0,                   # porsi bed menganggur
+        "EDR": edr,
+        "BOR_status": status_labels(bor, BOR_THRESHOLDS, BOR_LEVELS),
+        "TOI_status": status_labels(toi, TOI_THRESHOLDS, TOI_LEVELS),
+        "Capacity_alert": alert.astype(np.int8),
+    }, index=df.index)
+    return pd.concat([df.drop(columns=CAPACITY_FEATURES, errors="ignore"), features], axis=1)
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Benchmark
+# ------------------------------- | ------------------------------- | -------------------------------
+def synthetic_panel(rows: int, seed: int = 0, nan_share: float = 0.01) -> pd.DataFrame:
+    """Data sintetis faskes × bulan (ada NaN & HI = 0) untuk benchmark."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Date": pd.to_datetime("2020-01-01") + pd.to_timedelta(rng.integers(0, 72, rows) * 30, unit="D"),
+        AVLOS_COL: rng.gamma(4.0, 1.0, rows),
+        BOR_COL: rng.uniform(20, 110, rows),
+        TOI_COL: rng.gamma(2.0, 1.0, rows),
+        GDR_COL: rng.gamma(3.0, 10.0, rows),
+        NDR_COL: rng.gamma(2.0, 8.0, rows),
+    })
+    df.loc[df.sample(frac=0.001, random_state=seed).index, [AVLOS_COL, TOI_COL]] = 0.0
+    for col in (AVLOS_COL, BOR_COL, TOI_COL):
+        df.loc[df.sample(frac=nan_share, random_state=seed + 1).index, col] = np.nan
+    return df
+
+
+def benchmark(rows: int, repeat: int = 3) -> float:
+    """Waktu terbaik (detik) add_capacity_features untuk `rows` baris sintetis."""
+    df = synthetic_panel(rows)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        add_capacity_features(df)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fitur kapasitas RS (vectorized).")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    elapsed = benchmark(args.rows, args.repeat)
+    print(f"{args.rows:,} baris: {elapsed:.3f} s ({args.rows / elapsed / 1e6:.1f} juta baris/s)")
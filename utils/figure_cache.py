@@ -0,0 +1,95 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Figure Cache — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Cache LRU (per proses, di-share lintas session) untuk objek figure Plotly (go.Figure) apa adanya:
+# cache hit tidak membangun, men-deserialisasi, atau menyiapkan data ulang — builder (termasuk
+# melt/pivot/corr di dalamnya) hanya jalan saat miss. Key = (chart_id, versi dataset, parameter UI),
+# jadi figure hanya dibangun ulang kalau datanya berubah atau parameternya beda. Total ukuran dibatasi
+# (memory cap) lewat estimasi ukuran JSON yang dihitung sekali saat figure masuk cache.
+# Figure yang dikembalikan di-share: jangan dimutasi (st.plotly_chart hanya membacanya).
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Tuple
+
+from utils import timing
+
+if TYPE_CHECKING:  # plotly diimport lazy (lihat utils.startup)
+    import plotly.graph_objects as go
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024   # 64 MB (estimasi ukuran spesifikasi JSON)
+DEFAULT_MAX_ENTRIES = 512
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class FigureCache:
+    """LRU cache objek figure Plotly dengan batas jumlah entry & ukuran total."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Tuple[str, str, str], Tuple[go.Figure, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, chart_id: str, version: str, builder: Callable[[], "go.Figure"], **params) -> "go.Figure":
+        """Figure siap pakai untuk st.plotly_chart; `builder` hanya dipanggil saat cache miss."""
+        key = (chart_id, version, _params_key(params))
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+
+        # build di luar lock supaya chart lain tidak ikut menunggu
+        with timing.span(f"build:{chart_id}", "figure"):
+            fig = builder()
+        with timing.span(f"size:{chart_id}", "serialize"):
+            size = len(fig.to_json())
+
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = (fig, size)
+                self._bytes += size
+                self._evict()
+            else:                       # session lain sudah mengisi key yang sama lebih dulu
+                fig = self._items[key][0]
+        return fig
+
+    def _evict(self) -> None:
+        while self._items and (self._bytes > self.max_bytes or len(self._items) > self.max_entries):
+            _, (_, size) = self._items.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Instance bersama untuk seluruh proses server
+FIGURES = FigureCache()
+
+
+def cached_figure(chart_id: str, version: str, builder: Callable[[], "go.Figure"], **params) -> "go.Figure":
+    """Shortcut ke FIGURES.get(...)."""
+    return FIGURES.get(chart_id, version, builder, **params)
@@ -0,0 +1,220 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Tidy Forecast Artifact — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Pengganti kolom lebar `<target>_fc_lower` / `<target>_fc_upper` di df_merged_after_forecast.csv:
+# satu tabel panjang ber-key (region, target, date, kind, quantile) → value.
+#   kind     : "actual" | "forecast"
+#   quantile : 0.5 = nilai titik (aktual / yhat), ALPHA/2 & 1-ALPHA/2 = batas interval
+#
+# Disimpan sebagai Parquet ringkas (kategori ter-dictionary-encode, float32, zstd), diurutkan per
+# (region, target) dengan satu row group per pasangan, sehingga filter region+target saat membaca
+# hanya menyentuh row group itu. Loader mengembalikan irisan aktual + forecast + interval satu
+# target dalam satu pembacaan ber-index.
+#
+#   python -m utils.forecast_artifact      # build ulang artefak offline & tampilkan ukuran
+import pathlib
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, forecast_store, forecasting, panel, storage
+
+KEY_COLUMNS = ["region", "target", "date", "kind", "quantile"]
+Q_POINT = 0.5
+Q_LOWER = round(forecasting.ALPHA / 2, 4)
+Q_UPPER = round(1 - forecasting.ALPHA / 2, 4)
+
+# (kind, quantile) → nama kolom hasil load_target
+SLICE_COLUMNS = {
+    ("actual", Q_POINT): "actual",
+    ("forecast", Q_POINT): "yhat",
+    ("forecast", Q_LOWER): "yhat_lower",
+    ("forecast", Q_UPPER): "yhat_upper",
+}
+
+# Sumber artefak: nama → dataset sumber (hash-nya disimpan di metadata Parquet)
+SOURCES: Dict[str, List[str]] = {
+    "offline": ["merged_forecast", "forecast_results"],
+    "engine": ["abt", "abt_kabkota"],          # panel region (kab/kota opsional, lihat panel.source_paths)
+    "global": ["abt", "abt_kabkota"],
+    "bottom_up": ["abt", "abt_kabkota"],
+    "mint_wls": ["abt", "abt_kabkota"],
+}
+
+
+def artifact_path(source: str) -> pathlib.Path:
+    return storage.PARQUET_DIR / f"forecast_long_{source}.parquet"
+
+
+def _long(region: str, target: str, actual: pd.Series, yhat: pd.Series,
+          lower: pd.Series, upper: pd.Series) -> pd.DataFrame:
+    parts = [
+        ("actual", Q_POINT, actual), ("forecast", Q_POINT, yhat),
+        ("forecast", Q_LOWER, lower), ("forecast", Q_UPPER, upper),
+    ]
+    frames = [
+        pd.DataFrame({"date": s.index, "kind": kind, "quantile": q, "value": s.to_numpy()})
+        for kind, q, s in parts if len(s)
+    ]
+    out = pd.concat(frames, ignore_index=True).dropna(subset=["value"])
+    out.insert(0, "target", target)
+    out.insert(0, "region", region)
+    return out
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Build dari sumber yang ada
+# ------------------------------- | ------------------------------- | -------------------------------
+def build_offline() -> pd.DataFrame:
+    """Artefak dari df_merged_after_forecast.csv (lebar); CI yang tidak ada diambil dari forecast_results."""
+    merged = storage.load_table("merged_forecast").sort_values("Date").set_index("Date")
+    store = forecast_store.offline_store()
+    frames = []
+    for target in forecasting.TARGET_COLS:
+        if target not in merged.columns:
+            continue
+        lo, up = f"{target}_fc_lower", f"{target}_fc_upper"
+        if lo in merged.columns and up in merged.columns:
+            lower, upper = merged[lo], merged[up]
+        elif store.get(target) is not None:
+            lower, upper = (s.reindex(merged.index) for s in store.interval(target))
+        else:
+            lower = upper = pd.Series(np.nan, index=merged.index)
+        is_fc = lower.notna()               # periode forecast = baris yang punya interval
+        values = merged[target]
+        frames.append(_long(panel.PROVINCE, target, values[~is_fc], values[is_fc], lower[is_fc], upper[is_fc]))
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_engine(region: str = panel.PROVINCE, store: Optional[forecast_store.ForecastStore] = None) -> pd.DataFrame:
+    """Artefak dari engine in-app: aktual panel s/d last_obs + forecast & interval engine."""
+    store = store if store is not None else forecast_store.engine_store(region)
+    actuals = panel.region_frame(region).set_index("Date")
+    frames = []
+    for item in store:
+        actual = actuals[item.target].loc[:item.last_obs]
+        lower, upper = item.interval()
+        frames.append(_long(region, item.target, actual, item.series, lower, upper))
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_global(region: str = panel.PROVINCE) -> pd.DataFrame:
+    """Artefak dari model global LightGBM (struktur sama dengan artefak engine)."""
+    return build_engine(region, forecast_store.global_store(region))
+
+
+def build_reconciled(method: str, region: str = panel.PROVINCE) -> pd.DataFrame:
+    """Artefak dari forecast engine yang sudah direkonsiliasi (provinsi ← kab/kota)."""
+    return build_engine(region, forecast_store.reconciled_store(method, region))
+
+
+BUILDERS = {
+    "offline": build_offline, "engine": build_engine, "global": build_global,
+    "bottom_up": lambda: build_reconciled("bottom_up"), "mint_wls": lambda: build_reconciled("mint_wls"),
+}
+
+
+def source_paths(source: str) -> List[pathlib.Path]:
+    """Semua file sumber artefak `source` (key cache turunan harus mengikuti SEMUA file ini)."""
+    return [data_loader.dataset_path(n) for n in SOURCES[source]]
+
+
+def _source_digest(source: str) -> str:
+    return "|".join(data_loader.file_digest(p) if p.exists() else "-" for p in source_paths(source))
+
+
+def write(df: pd.DataFrame, path: pathlib.Path, digest: str) -> pathlib.Path:
+    """Tulis artefak: urut (region, target, kind, quantile, date), satu row group per (region, target)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.sort_values(["region", "target", "kind", "quantile", "date"]).reset_index(drop=True)
+    df = df.astype({"region": "category", "target": "category", "kind": "category",
+                    "quantile": np.float32, "value": np.float32})
+    df["date"] = pd.to_datetime(df["date"]).astype("datetime64[ms]")
+    table = pa.Table.from_pandas(df[[*KEY_COLUMNS, "value"]], preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[storage.SOURCE_HASH_KEY] = digest.encode()
+    table = table.replace_schema_metadata(meta)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # nama tmp unik → penulis bersamaan (session lain / proses CLI) tidak menimpa file setengah jadi
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.stem}-", suffix=".tmp", delete=False) as f:
+        tmp = pathlib.Path(f.name)
+    bounds = np.flatnonzero(
+        (df["region"].ne(df["region"].shift()) | df["target"].ne(df["target"].shift())).to_numpy()
+    ).tolist() + [len(df)]
+    try:
+        with pq.ParquetWriter(tmp, table.schema, compression="zstd") as writer:
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                writer.write_table(table.slice(start, stop - start))
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
+
+
+def ensure_fresh(source: str = "offline") -> pathlib.Path:
+    """Build ulang artefak jika hash sumber berubah.
+
+    Lewat satu cached_read per source (key artefak, bukan per target): load_target target berbeda dari
+    session bersamaan menunggu satu rebuild yang sama, dan hash hanya dicek ulang saat sumber berubah.
+    """
+    def _check(_p):
+        import pyarrow.parquet as pq
+
+        path = artifact_path(source)
+        digest = _source_digest(source)
+        current = None
+        if path.is_file():
+            current = (pq.read_schema(path).metadata or {}).get(storage.SOURCE_HASH_KEY, b"").decode()
+        if current != digest:
+            write(BUILDERS[source](), path, digest)
+        return path
+
+    key = f"{SOURCES[source][0]}:artifact[{source}]"
+    path = data_loader.cached_read(key, source_paths(source), _check)
+    if not path.is_file():                  # artefak dihapus manual setelah dicek → build ulang
+        data_loader.invalidate(key)
+        path = data_loader.cached_read(key, source_paths(source), _check)
+    return path
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Loader
+# ------------------------------- | ------------------------------- | -------------------------------
+def _read_slice(path: pathlib.Path, region: str, target: str) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, filters=[("region", "=", region), ("target", "=", target)],
+                          columns=["date", "kind", "quantile", "value"])
+    long = table.to_pandas()
+    if long.empty:
+        return pd.DataFrame(columns=list(SLICE_COLUMNS.values()), index=pd.DatetimeIndex([], name="date"))
+    long["column"] = [SLICE_COLUMNS.get((k, round(float(q), 4))) for k, q in zip(long["kind"], long["quantile"])]
+    out = long.pivot(index="date", columns="column", values="value")
+    out.index = pd.DatetimeIndex(out.index, name="date")
+    return out.reindex(columns=list(SLICE_COLUMNS.values())).sort_index()
+
+
+def load_target(target: str, region: str = panel.PROVINCE, source: str = "offline") -> pd.DataFrame:
+    """Irisan satu target: index date, kolom actual / yhat / yhat_lower / yhat_upper.
+
+    Di-cache per (source, region, target) dan per versi SEMUA file sumber (mis. forecast_results.csv yang
+    ditulis ulang `utils.forecasting --write` ikut membatalkan cache); hasil di-share → jangan diubah in-place.
+    """
+    return data_loader.cached_read(
+        f"{SOURCES[source][0]}:long[{source}|{region}|{target}]", source_paths(source),
+        lambda _p: _read_slice(ensure_fresh(source), region, target),
+    )
+
+
+if __name__ == "__main__":
+    _path = ensure_fresh("offline")
+    import pyarrow.parquet as _pq
+
+    _meta = _pq.ParquetFile(_path).metadata
+    print(f"{_path.relative_to(data_loader.ROOT_DIR)}: {_meta.num_rows} baris, "
+          f"{_meta.num_row_groups} row group, {_path.stat().st_size / 1024:.1f} KB")
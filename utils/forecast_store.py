@@ -0,0 +1,135 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Forecast Store — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Hasil forecast (skema forecast_results: target,date,yhat,yhat_lower,yhat_upper,model,last_obs)
+# dikelompokkan SEKALI per (region, target) saat dimuat. Tiap grup menyimpan frame ber-index tanggal
+# (sudah urut), nama model, last_obs & horizon, sehingga lookup di tab Forecasting = akses dict O(1)
+# — tidak lagi memfilter `fr[fr["target"] == target]` berkali-kali per rerun, dan biayanya tidak
+# tumbuh dengan jumlah target × region × horizon yang disimpan.
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from utils import data_loader, forecasting, global_forecast, panel, reconcile, storage
+
+
+@dataclass(frozen=True)
+class TargetForecast:
+    region: str
+    target: str
+    model: str
+    last_obs: pd.Timestamp
+    frame: pd.DataFrame          # index: date (urut), kolom: yhat, yhat_lower, yhat_upper
+
+    @property
+    def horizon(self) -> int:
+        return len(self.frame)
+
+    @property
+    def series(self) -> pd.Series:
+        return self.frame["yhat"]
+
+    def interval(self) -> Tuple[pd.Series, pd.Series]:
+        return self.frame["yhat_lower"], self.frame["yhat_upper"]
+
+    def table(self) -> pd.DataFrame:
+        """Baris dalam skema forecast_results (untuk tabel ringkas)."""
+        out = self.frame.reset_index()
+        out.insert(0, "target", self.target)
+        out["model"] = self.model
+        out["last_obs"] = self.last_obs
+        return out[forecasting.RESULT_COLUMNS]
+
+
+class ForecastStore:
+    """Hasil forecast yang sudah di-group per (region, target)."""
+
+    def __init__(self, results: pd.DataFrame, region: str = panel.PROVINCE):
+        self._items: Dict[Tuple[str, str], TargetForecast] = {}
+        keys = ["region", "target"] if "region" in results.columns else ["target"]
+        for key, g in results.groupby(keys, sort=False, observed=True):
+            reg, target = key if len(keys) == 2 else (region, key[0])
+            frame = g.set_index("date")[["yhat", "yhat_lower", "yhat_upper"]].sort_index()
+            model = g["model"].dropna()
+            self._items[(reg, str(target))] = TargetForecast(
+                region=reg, target=str(target),
+                model=str(model.iloc[0]) if len(model) else "-",
+                last_obs=pd.Timestamp(g["last_obs"].iloc[0]),
+                frame=frame,
+            )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[TargetForecast]:
+        return iter(self._items.values())
+
+    def get(self, target: str, region: str = panel.PROVINCE) -> Optional[TargetForecast]:
+        return self._items.get((region, target))
+
+    def targets(self, region: str = panel.PROVINCE) -> List[str]:
+        return [t for (r, t) in self._items if r == region]
+
+    # ---- shortcut lookup
+    def series(self, target: str, region: str = panel.PROVINCE) -> Optional[pd.Series]:
+        item = self.get(target, region)
+        return item.series if item else None
+
+    def interval(self, target: str, region: str = panel.PROVINCE) -> Optional[Tuple[pd.Series, pd.Series]]:
+        item = self.get(target, region)
+        return item.interval() if item else None
+
+    def model_name(self, target: str, region: str = panel.PROVINCE, default: str = "-") -> str:
+        item = self.get(target, region)
+        return item.model if item else default
+
+    def horizon(self, target: str, region: str = panel.PROVINCE) -> int:
+        item = self.get(target, region)
+        return item.horizon if item else 0
+
+
+def offline_store() -> ForecastStore:
+    """Store dari data/forecast_results.csv (provinsi), di-cache per versi file."""
+    return data_loader.cached_read(
+        "forecast_results:store", data_loader.dataset_path("forecast_results"),
+        lambda _p: ForecastStore(storage.load_table("forecast_results")),
+    )
+
+
+def engine_store(region: str = panel.PROVINCE) -> ForecastStore:
+    """Store dari engine in-app (utils.forecasting), di-cache per versi data ABT."""
+    return data_loader.cached_read(
+        f"abt:forecast_store[{region}]", panel.source_paths(),
+        lambda _p: ForecastStore(forecasting.forecast_table(region), region=region),
+    )
+
+
+def global_store(region: str = panel.PROVINCE) -> ForecastStore:
+    """Store dari model global LightGBM (utils.global_forecast), di-cache per versi data ABT."""
+    return data_loader.cached_read(
+        f"abt:global_store[{region}]", panel.source_paths(),
+        lambda _p: ForecastStore(global_forecast.global_table(region), region=region),
+    )
+
+
+def reconciled_store(method: str = "mint_wls", region: str = panel.PROVINCE) -> ForecastStore:
+    """Store engine setelah rekonsiliasi hierarki (provinsi ← kab/kota), di-cache per (metode, region)."""
+    def _build(_p):
+        table = reconcile.reconciled_table(method)
+        return ForecastStore(table[table[panel.REGION_COL] == region].drop(columns=panel.REGION_COL), region=region)
+
+    return data_loader.cached_read(
+        f"abt:forecast_store_reconciled[{method}|{region}]", panel.source_paths(), _build
+    )
+
+
+def store_for(source: str, region: str = panel.PROVINCE) -> ForecastStore:
+    """Store untuk nama sumber forecast_artifact: offline / engine / global / metode rekonsiliasi."""
+    if source == "engine":
+        return engine_store(region)
+    if source == "global":
+        return global_store(region)
+    if source in reconcile.METHODS:
+        return reconciled_store(source, region)
+    return offline_store()
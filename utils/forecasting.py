@@ -0,0 +1,313 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Forecasting Engine — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Fit S-Naive, ETS & SARIMA (statsmodels) untuk tiap target indikator, pilih model terbaik lewat
+# holdout bulan terakhir, lalu forecast HORIZON bulan + interval 95%. Output memakai skema yang sama
+# dengan data/forecast_results.csv: target,date,yhat,yhat_lower,yhat_upper,model,last_obs
+#
+# - Tiap (region, target) = satu task; task dijalankan paralel di ProcessPoolExecutor.
+# - Hasil per task di-cache di disk dengan key hash input (nilai series + konfigurasi), jadi
+#   refit setelah data bulanan baru hanya menghitung series yang benar-benar berubah.
+#
+# Regenerasi file offline:
+#   python -m utils.forecasting --write
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import urllib.parse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, panel, storage
+
+TARGET_COLS = [
+    "BOR (%)", "AVLOS (Day)", "NDR (/K)", "GDR (/K)", "TOI (Day)",
+    "Rasio_AKI", "Rasio_AKB", "Rasio_BBLR",
+]
+RESULT_COLUMNS = ["target", "date", "yhat", "yhat_lower", "yhat_upper", "model", "last_obs"]
+
+HORIZON = 18               # bulan ke depan
+SEASONAL_PERIOD = 12
+VALIDATION_MONTHS = 6      # holdout untuk memilih model terbaik
+ALPHA = 0.05               # interval 95%
+Z_95 = 1.959963984540054
+
+CACHE_DIR = storage.PARQUET_DIR / "forecasts"
+ENGINE_VERSION = "2"       # naikkan jika logika fit berubah → cache lama otomatis tidak terpakai
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Model kandidat
+# ------------------------------- | ------------------------------- | -------------------------------
+@dataclass
+class Forecast:
+    yhat: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+
+class SeasonalNaive:
+    """y(t+h) = y(t+h-m); interval dari sd residual selisih musiman × sqrt(jumlah musim ke depan)."""
+
+    def __init__(self, y: pd.Series, m: int = SEASONAL_PERIOD):
+        self.m = m
+        self.values = y.to_numpy(dtype=float)
+        resid = self.values[m:] - self.values[:-m]
+        self.sigma = float(np.std(resid, ddof=1)) if len(resid) > 1 else 0.0
+
+    def forecast(self, h: int) -> Forecast:
+        steps = np.arange(h)
+        yhat = self.values[-self.m:][steps % self.m]
+        half = Z_95 * self.sigma * np.sqrt(steps // self.m + 1)
+        return Forecast(yhat, yhat - half, yhat + half)
+
+
+class _StatsmodelsWrapper:
+    def __init__(self, result, n_obs: int):
+        self.result = result
+        self.n_obs = n_obs
+
+    def forecast(self, h: int) -> Forecast:
+        if hasattr(self.result, "get_forecast"):          # SARIMAX
+            pred = self.result.get_forecast(h)
+            ci = np.asarray(pred.conf_int(alpha=ALPHA))
+            return Forecast(np.asarray(pred.predicted_mean), ci[:, 0], ci[:, 1])
+        frame = self.result.get_prediction(start=self.n_obs, end=self.n_obs + h - 1).summary_frame(alpha=ALPHA)
+        return Forecast(frame["mean"].to_numpy(), frame["pi_lower"].to_numpy(), frame["pi_upper"].to_numpy())
+
+
+def _ets(trend: Optional[str], seasonal: Optional[str]) -> Callable[[pd.Series], object]:
+    def build(y: pd.Series):
+        from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+
+        return ETSModel(
+            y, error="add", trend=trend, seasonal=seasonal,
+            seasonal_periods=SEASONAL_PERIOD if seasonal else None,
+        )
+    return build
+
+
+def _sarima(order: Tuple[int, int, int], seasonal_order: Tuple[int, int, int]) -> Callable[[pd.Series], object]:
+    def build(y: pd.Series):
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+        return SARIMAX(y, order=order, seasonal_order=(*seasonal_order, SEASONAL_PERIOD))
+    return build
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    build: Callable[[pd.Series], object]   # model statsmodels (belum difit) atau SeasonalNaive
+    min_obs: int                           # panjang series minimal agar model layak difit
+
+
+# Nama model mengikuti konvensi forecast_results.csv: ETS(trend,seasonal)
+MODELS: Dict[str, ModelSpec] = {
+    "S-Naive":                  ModelSpec(SeasonalNaive, SEASONAL_PERIOD + 2),
+    "ETS(add,None)":            ModelSpec(_ets("add", None), 12),
+    "ETS(None,add)":            ModelSpec(_ets(None, "add"), 2 * SEASONAL_PERIOD + 2),
+    "ETS(add,add)":             ModelSpec(_ets("add", "add"), 2 * SEASONAL_PERIOD + 4),
+    "SARIMA(0,1,1)(0,1,1)12":   ModelSpec(_sarima((0, 1, 1), (0, 1, 1)), 2 * SEASONAL_PERIOD + 6),
+    "SARIMA(1,1,0)(1,0,0)12":   ModelSpec(_sarima((1, 1, 0), (1, 0, 0)), SEASONAL_PERIOD + 6),
+}
+
+
+def fit_model(name: str, y: pd.Series):
+    """Fit model kandidat `name` (warning konvergensi statsmodels diabaikan)."""
+    model = MODELS[name].build(y)
+    if isinstance(model, SeasonalNaive):
+        return model
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return _StatsmodelsWrapper(model.fit(disp=False), len(y))
+
+
+def apply_params(name: str, y: pd.Series, params: Sequence[float]):
+    """Warm start: jalankan filter/smoother model `name` di series `y` dengan parameter tersimpan (tanpa optimasi)."""
+    model = MODELS[name].build(y)
+    if isinstance(model, SeasonalNaive):
+        return model
+    params = np.asarray(params, dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        # SARIMAX (state space): filter; ETSModel hanya punya smooth
+        result = model.filter(params) if hasattr(model, "filter") else model.smooth(params)
+    return _StatsmodelsWrapper(result, len(y))
+
+
+def model_params(fitted) -> List[float]:
+    """Parameter hasil fit (kosong untuk S-Naive) → disimpan sebagai state warm start."""
+    return [float(v) for v in np.asarray(fitted.result.params)] if isinstance(fitted, _StatsmodelsWrapper) else []
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Persiapan series & pemilihan model
+# ------------------------------- | ------------------------------- | -------------------------------
+def prepare_series(df: pd.DataFrame, target: str) -> pd.Series:
+    """Series bulanan (freq MS) dari observasi pertama s/d terakhir; celah di tengah diinterpolasi."""
+    y = df.set_index("Date")[target].astype(float).sort_index()
+    first, last = y.first_valid_index(), y.last_valid_index()
+    if first is None:
+        return y.iloc[:0]
+    y = y.loc[first:last]
+    y = y.reindex(pd.date_range(first, last, freq="MS")).interpolate(limit_direction="both")
+    y.index.freq = "MS"
+    return y.rename(target)
+
+
+def candidate_models(n_obs: int, models: Optional[Sequence[str]] = None) -> List[str]:
+    names = models if models is not None else list(MODELS)
+    return [m for m in names if n_obs - VALIDATION_MONTHS >= MODELS[m].min_obs]
+
+
+def _mae(y: np.ndarray, yhat: np.ndarray) -> float:
+    return float(np.mean(np.abs(y - yhat)))
+
+
+def select_model(y: pd.Series, models: Optional[Sequence[str]] = None) -> str:
+    """Model dengan MAE holdout (VALIDATION_MONTHS terakhir) terkecil; fallback S-Naive."""
+    train, valid = y.iloc[:-VALIDATION_MONTHS], y.to_numpy()[-VALIDATION_MONTHS:]
+    scores = {}
+    for name in candidate_models(len(y), models):
+        try:
+            fc = fit_model(name, train).forecast(VALIDATION_MONTHS)
+        except Exception:
+            continue
+        if np.all(np.isfinite(fc.yhat)):
+            scores[name] = _mae(valid, fc.yhat)
+    return min(scores, key=scores.get) if scores else "S-Naive"
+
+
+def forecast_frame(target: str, y: pd.Series, name: str, fitted, horizon: int = HORIZON) -> pd.DataFrame:
+    """Forecast `horizon` bulan setelah observasi terakhir; semua indikator non-negatif → di-clip ke 0."""
+    fc = fitted.forecast(horizon)
+    return pd.DataFrame({
+        "target": target,
+        "date": pd.date_range(y.index[-1] + pd.offsets.MonthBegin(), periods=horizon, freq="MS"),
+        "yhat": np.clip(fc.yhat, 0, None),
+        "yhat_lower": np.clip(fc.lower, 0, None),
+        "yhat_upper": np.clip(fc.upper, 0, None),
+        "model": name,
+        "last_obs": y.index[-1],
+    })
+
+
+def forecast_series(target: str, y: pd.Series, models: Optional[Sequence[str]] = None,
+                    horizon: int = HORIZON) -> pd.DataFrame:
+    """Pilih model terbaik untuk satu series, refit di seluruh data, lalu forecast `horizon` bulan."""
+    name, fitted = fit_best(y, models)
+    return forecast_frame(target, y, name, fitted, horizon)
+
+
+def fit_best(y: pd.Series, models: Optional[Sequence[str]] = None):
+    """(nama, model terfit) terbaik untuk series `y`, difit di seluruh data."""
+    name = select_model(y, models)
+    return name, fit_model(name, y)
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Cache per task (hash input) & eksekusi paralel
+# ------------------------------- | ------------------------------- | -------------------------------
+def series_hash(y: pd.Series, models: Optional[Sequence[str]], horizon: int) -> str:
+    h = hashlib.sha1()
+    h.update(json.dumps([ENGINE_VERSION, y.name, str(y.index[0]) if len(y) else "", list(models or MODELS),
+                         horizon, VALIDATION_MONTHS]).encode())
+    h.update(np.ascontiguousarray(y.to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def _cache_path(region: str, target: str, digest: str) -> pathlib.Path:
+    return CACHE_DIR / urllib.parse.quote(region, safe="") / f"{urllib.parse.quote(target, safe='')}-{digest[:16]}.parquet"
+
+
+def _run_task(task: Tuple[str, str, pd.Series, Optional[List[str]], int]) -> pd.DataFrame:
+    region, target, y, models, horizon = task
+    return forecast_series(target, y, models, horizon)
+
+
+def forecast_regions(regions: Optional[Iterable[str]] = None, targets: Sequence[str] = TARGET_COLS,
+                     models: Optional[Sequence[str]] = None, horizon: int = HORIZON,
+                     workers: Optional[int] = None) -> pd.DataFrame:
+    """Forecast semua (region, target) dari panel; task yang hash-nya sudah ada di cache tidak difit ulang.
+
+    Kolom: region + RESULT_COLUMNS.
+    """
+    regions = list(regions) if regions is not None else panel.regions()
+    results: Dict[Tuple[str, str], pd.DataFrame] = {}
+    pending = []
+    for region in regions:
+        frame = panel.region_frame(region, columns=["Date", *targets])
+        for target in targets:
+            y = prepare_series(frame, target)
+            if len(y) < SEASONAL_PERIOD + VALIDATION_MONTHS:
+                continue
+            path = _cache_path(region, target, series_hash(y, models, horizon))
+            if path.is_file():
+                results[(region, target)] = pd.read_parquet(path)
+            else:
+                pending.append(((region, target, y, list(models) if models else None, horizon), path))
+
+    if pending:
+        workers = workers or min(len(pending), os.cpu_count() or 1)
+        tasks = [task for task, _ in pending]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                frames = list(pool.map(_run_task, tasks))
+        else:
+            frames = [_run_task(task) for task in tasks]
+        for (task, path), frame in zip(pending, frames):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            frame.to_parquet(path, index=False)
+            results[(task[0], task[1])] = frame
+
+    if not results:
+        return pd.DataFrame(columns=["region", *RESULT_COLUMNS])
+    out = pd.concat(
+        [frame.assign(region=region) for (region, _), frame in results.items()], ignore_index=True
+    )
+    return out[["region", *RESULT_COLUMNS]]
+
+
+def forecast_table(region: str = panel.PROVINCE) -> pd.DataFrame:
+    """Hasil engine untuk satu region (skema forecast_results), di-cache per versi data ABT."""
+    def _compute(_p):
+        out = forecast_regions([region]).drop(columns="region")
+        out["target"] = out["target"].astype("category")
+        out["model"] = out["model"].astype("category")
+        return out
+
+    return data_loader.cached_read(f"abt:forecast[{region}]", panel.source_paths(), _compute)
+
+
+def write_results(df: pd.DataFrame, path: Optional[pathlib.Path] = None) -> pathlib.Path:
+    """Tulis hasil ke CSV berformat forecast_results.csv (tanggal %Y-%m-%d)."""
+    path = path or data_loader.dataset_path("forecast_results")
+    out = df[RESULT_COLUMNS].copy()
+    for col in ("date", "last_obs"):
+        out[col] = pd.to_datetime(out[col]).dt.strftime("%Y-%m-%d")
+    out.to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Fit S-Naive/ETS/SARIMA untuk semua target indikator.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--write", action="store_true", help="Tulis ulang data/forecast_results.csv (provinsi).")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    result = forecast_regions(workers=args.workers)
+    print(result.groupby(["region", "target"], observed=True)["model"].first().to_string())
+    print(f"{len(result)} baris dalam {time.perf_counter() - t0:.1f} s")
+    if args.write:
+        dst = write_results(result[result["region"] == panel.PROVINCE])
+        print(f"Ditulis: {dst.relative_to(data_loader.ROOT_DIR)}")
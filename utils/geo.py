@@ -0,0 +1,107 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Geometry Store — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# GeoJSON kab/kota diproses sekali per versi file: reprojeksi, simplifikasi multi-level
+# (preserve_topology), centroid, dan bounding box. Tab peta tinggal mengambil GeoJSON ringan
+# sesuai ukuran viewport, tanpa to_json()/json.loads/to_crs di setiap rerun.
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader
+
+# Level simplifikasi: nama -> (toleransi derajat, presisi koordinat/desimal).
+# Jatim ± 5.4° lebar; di kontainer 1200 px → ±0.0045°/px, jadi "sedang" sudah sub-pixel.
+SIMPLIFY_LEVELS: Dict[str, Tuple[float, int]] = {
+    "tinggi": (0.0005, 5),
+    "sedang": (0.002, 4),
+    "rendah": (0.005, 3),
+    "sangat_rendah": (0.01, 3),
+}
+
+# Proyeksi metrik untuk centroid akurat (UTM 49S mencakup Jawa Timur)
+METRIC_CRS = "EPSG:32749"
+
+# Kolom atribut yang dibawa ke tabel atribut (tanpa geometry)
+ATTRIBUTE_COLS = ["GID_2", "NAME_2", "TYPE_2", "CC_2"]
+
+
+@dataclass
+class GeometryStore:
+    version: str
+    attributes: pd.DataFrame                      # fid + ATTRIBUTE_COLS (urutan = fid)
+    centroids: pd.DataFrame                       # fid, lon, lat (EPSG:4326)
+    bounds: Tuple[float, float, float, float]     # minx, miny, maxx, maxy (EPSG:4326)
+    _geojson: Dict[str, dict] = field(default_factory=dict, repr=False)
+    payload_bytes: Dict[str, int] = field(default_factory=dict)
+
+    def geojson(self, level: str = "sedang") -> dict:
+        """FeatureCollection ringan (properti hanya `id` = fid) untuk level simplifikasi tertentu."""
+        if level not in self._geojson:
+            raise KeyError(f"Level '{level}' tidak tersedia. Pilihan: {list(self._geojson)}")
+        return self._geojson[level]
+
+
+def _feature_collection(geoms, fids, decimals: int) -> dict:
+    import shapely
+
+    rounded = shapely.transform(geoms, lambda xy: np.round(xy, decimals))
+    features = [
+        {"type": "Feature", "id": int(fid), "properties": {}, "geometry": json.loads(gj)}
+        for fid, gj in zip(fids, shapely.to_geojson(rounded))
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _build_store(path) -> GeometryStore:
+    import geopandas as gpd
+    import shapely
+
+    gdf = gpd.read_file(path)
+    gdf = gdf.to_crs(epsg=4326) if gdf.crs is not None else gdf.set_crs(epsg=4326)
+    gdf = gdf.reset_index(drop=True)
+    fids = np.arange(len(gdf))
+
+    attributes = pd.DataFrame({"fid": fids})
+    for col in ATTRIBUTE_COLS:
+        if col in gdf.columns:
+            attributes[col] = gdf[col].values
+
+    cent = gdf.geometry.to_crs(METRIC_CRS).centroid.to_crs(epsg=4326)
+    centroids = pd.DataFrame({"fid": fids, "lon": cent.x.values, "lat": cent.y.values})
+
+    geoms = gdf.geometry.values
+    collections, payload = {}, {}
+    for level, (tol, decimals) in SIMPLIFY_LEVELS.items():
+        simplified = shapely.simplify(geoms, tol, preserve_topology=True)
+        collections[level] = _feature_collection(simplified, fids, decimals)
+        payload[level] = len(json.dumps(collections[level], separators=(",", ":")))
+
+    return GeometryStore(
+        version=data_loader.file_digest(path),
+        attributes=attributes,
+        centroids=centroids,
+        bounds=tuple(float(v) for v in gdf.total_bounds),
+        _geojson=collections,
+        payload_bytes=payload,
+    )
+
+
+def get_store() -> GeometryStore:
+    """GeometryStore untuk jatim_kabkota.geojson, dibangun sekali per versi file (cache proses)."""
+    return data_loader.cached_read(
+        "geo_kabkota:store", data_loader.dataset_path("geo_kabkota"), _build_store
+    )
+
+
+def level_for_viewport(width_px: int, height_px: int, bounds: Tuple[float, float, float, float]) -> str:
+    """Pilih level paling kasar yang errornya masih di bawah ±1 pixel pada viewport tersebut."""
+    minx, miny, maxx, maxy = bounds
+    deg_per_px = max((maxx - minx) / max(width_px, 1), (maxy - miny) / max(height_px, 1))
+    candidates = [lvl for lvl, (tol, _) in SIMPLIFY_LEVELS.items() if tol <= deg_per_px]
+    if not candidates:
+        return next(iter(SIMPLIFY_LEVELS))  # viewport sangat besar → level paling detail
+    return max(candidates, key=lambda lvl: SIMPLIFY_LEVELS[lvl][0])
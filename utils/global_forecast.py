@@ -0,0 +1,220 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Global LightGBM Forecaster — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Satu model gradient boosting untuk SEMUA (region, target) sekaligus, sebagai alternatif dari
+# ratusan fit ETS/SARIMA per series. Alur:
+#   1) panel → matriks Y [series × bulan], rata kanan (kolom terakhir = observasi terakhir tiap series)
+#      dan dinormalisasi per series (dibagi rata-rata |y|) agar skala antar target sebanding;
+#   2) fitur lag / rolling mean / bulan / kode target & region dibentuk dengan operasi array
+#      (slicing, sliding_window_view) — tanpa loop Python per series;
+#   3) satu kali training LightGBM di semua baris (target = perubahan dari lag-1, lebih stabil untuk
+#      series pendek daripada level), lalu forecast rekursif HORIZON langkah di mana tiap langkah
+#      memprediksi semua series dalam satu batch;
+#   4) interval: sd residual in-sample per series × Z_95 × sqrt(langkah).
+#
+# Hasil memakai skema forecast_results (+ region) dengan model "LightGBM(global)", di-cache di disk
+# per hash isi panel + konfigurasi.
+#
+#   python -m utils.global_forecast        # train + forecast semua series, tampilkan ringkasan
+import hashlib
+import json
+import pathlib
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, forecasting, panel
+
+MODEL_NAME = "LightGBM(global)"
+LAGS = (1, 2, 3, 6, 12)
+ROLLING_WINDOWS = (3, 12)
+MIN_OBS = forecasting.SEASONAL_PERIOD + forecasting.VALIDATION_MONTHS   # sama dengan engine per series
+NUM_BOOST_ROUND = 300
+# API native lightgbm.train (scikit-learn tidak ada di requirements)
+LGBM_PARAMS = dict(
+    objective="regression", learning_rate=0.05, num_leaves=15, min_data_in_leaf=10,
+    bagging_fraction=0.9, bagging_freq=1, feature_fraction=0.9, seed=42, num_threads=0, verbose=-1,
+)
+FEATURE_NAMES = (
+    [f"lag_{lag}" for lag in LAGS] + [f"roll_mean_{w}" for w in ROLLING_WINDOWS]
+    + ["seasonal_diff", "month", "target_code", "region_code"]
+)
+CATEGORICAL_FEATURES = ["month", "target_code", "region_code"]
+GLOBAL_VERSION = "1"       # naikkan jika fitur/parameter berubah → cache lama tidak terpakai
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Panel → matriks series
+# ------------------------------- | ------------------------------- | -------------------------------
+def series_matrix(regions: Optional[Sequence[str]] = None,
+                  targets: Sequence[str] = forecasting.TARGET_COLS) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """(keys, Y, last_obs): keys = DataFrame region/target per baris Y, Y = [series × bulan] rata kanan.
+
+    Series dipotong di observasi pertama/terakhir dan celah di tengah diinterpolasi (seperti
+    forecasting.prepare_series), tapi seluruhnya lewat reshape/interpolate pandas di sumbu bulan.
+    """
+    regions = list(regions) if regions is not None else panel.regions()
+    long = panel.load_panel(columns=["Date", *targets]).loc[regions]
+    wide = long[list(targets)].astype(float).unstack("Date")          # baris region, kolom (target, Date)
+    wide = wide.stack(0, future_stack=True)                             # baris (region, target), kolom Date
+    wide = wide.T.reindex(pd.date_range(wide.columns.min(), wide.columns.max(), freq="MS")).T
+    wide = wide.interpolate(axis=1, limit_area="inside")
+
+    values = wide.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    n_obs = valid.sum(axis=1)
+    keep = n_obs >= MIN_OBS
+    values, valid = values[keep], valid[keep]
+    last = values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)     # indeks observasi terakhir
+
+    # rata kanan: kolom j ← kolom (last - (T-1) + j); indeks negatif → NaN
+    width = values.shape[1]
+    src = last[:, None] - (width - 1) + np.arange(width)[None, :]
+    aligned = np.where(src >= 0, np.take_along_axis(values, np.clip(src, 0, None), axis=1), np.nan)
+
+    keys = wide.index[keep].to_frame(index=False)
+    keys.columns = [panel.REGION_COL, "target"]
+    return keys, aligned, wide.columns[last].to_numpy()
+
+
+def _month_grid(last_obs: np.ndarray, width: int) -> np.ndarray:
+    """Bulan (0-11) tiap kolom matriks rata kanan, per series."""
+    last_month = pd.DatetimeIndex(last_obs).month.to_numpy() - 1
+    return (last_month[:, None] - (width - 1) + np.arange(width)[None, :]) % 12
+
+
+def _features(Yn: np.ndarray, months: np.ndarray, codes: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Matriks fitur untuk memprediksi kolom `cols`, semua series sekaligus (hanya memakai kolom < col).
+
+    Return array [n_series × len(cols), n_fitur] berurutan (series, kolom).
+    """
+    n_series = Yn.shape[0]
+    pad = max(*LAGS, *ROLLING_WINDOWS, 13)
+    padded = np.concatenate([np.full((n_series, pad), np.nan), Yn], axis=1)
+    pc = cols + pad                                     # posisi kolom target di array ber-padding
+
+    feats = [padded[:, pc - lag] for lag in LAGS]
+    for w in ROLLING_WINDOWS:
+        windows = np.lib.stride_tricks.sliding_window_view(padded, w, axis=1)   # windows[:, i] = padded[:, i:i+w]
+        feats.append(windows[:, pc - w].mean(axis=-1))
+    feats.append(padded[:, pc - 1] - padded[:, pc - 13])                       # perubahan YoY bulan terakhir
+    feats.append(months[:, cols])
+    feats.append(np.repeat(codes[:, :1], len(cols), axis=1))
+    feats.append(np.repeat(codes[:, 1:], len(cols), axis=1))
+    return np.stack([np.asarray(f, dtype=float).reshape(-1) for f in feats], axis=1)
+
+
+def _scale(Y: np.ndarray) -> np.ndarray:
+    scale = np.nanmean(np.abs(Y), axis=1)
+    return np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Training satu kali + forecast batch
+# ------------------------------- | ------------------------------- | -------------------------------
+def fit_predict(keys: pd.DataFrame, Y: np.ndarray, last_obs: np.ndarray,
+                horizon: int = forecasting.HORIZON) -> pd.DataFrame:
+    """Train satu LightGBM di semua series lalu forecast `horizon` bulan; kolom: region + RESULT_COLUMNS."""
+    import lightgbm as lgb
+
+    n_series, width = Y.shape
+    scale = _scale(Y)
+    Yn = np.concatenate([Y / scale[:, None], np.full((n_series, horizon), np.nan)], axis=1)
+    months = _month_grid(last_obs, width + horizon)
+    target_idx = {t: i for i, t in enumerate(forecasting.TARGET_COLS)}
+    region_idx = {r: i for i, r in enumerate(panel.regions())}
+    codes = np.column_stack([
+        keys["target"].map(target_idx).fillna(-1).to_numpy(),
+        keys[panel.REGION_COL].map(region_idx).fillna(-1).to_numpy(),
+    ])
+
+    # baris training: semua (series, kolom) dengan target & lag-1 terisi
+    cols = np.arange(1, width)
+    X = _features(Yn, months, codes, cols)
+    y = Yn[:, cols].reshape(-1) - X[:, 0]                              # target = perubahan dari lag-1
+    mask = ~np.isnan(y)
+    train = lgb.Dataset(X[mask], y[mask], feature_name=FEATURE_NAMES,
+                        categorical_feature=CATEGORICAL_FEATURES, free_raw_data=True)
+    model = lgb.train(LGBM_PARAMS, train, num_boost_round=NUM_BOOST_ROUND)
+
+    # sd residual in-sample per series (bincount per indeks series)
+    series_of_row = np.repeat(np.arange(n_series), len(cols))[mask]
+    resid = y[mask] - model.predict(X[mask])
+    dof = np.maximum(np.bincount(series_of_row, minlength=n_series) - 1, 1)
+    sigma = np.sqrt(np.bincount(series_of_row, resid ** 2, minlength=n_series) / dof)
+
+    # forecast rekursif: tiap langkah = satu predict untuk semua series
+    for step in range(horizon):
+        col = np.array([width + step])
+        X_step = _features(Yn, months, codes, col)
+        Yn[:, col[0]] = np.clip(X_step[:, 0] + model.predict(X_step), 0, None)
+
+    yhat = Yn[:, width:] * scale[:, None]
+    half = forecasting.Z_95 * (sigma * scale)[:, None] * np.sqrt(np.arange(1, horizon + 1))[None, :]
+    first = last_obs.astype("datetime64[M]")[:, None] + np.arange(1, horizon + 1)[None, :]
+    return pd.DataFrame({
+        panel.REGION_COL: np.repeat(keys[panel.REGION_COL].to_numpy(), horizon),
+        "target": np.repeat(keys["target"].to_numpy(), horizon),
+        "date": first.reshape(-1).astype("datetime64[ns]"),
+        "yhat": yhat.reshape(-1),
+        "yhat_lower": np.clip(yhat - half, 0, None).reshape(-1),
+        "yhat_upper": (yhat + half).reshape(-1),
+        "model": MODEL_NAME,
+        "last_obs": np.repeat(last_obs.astype("datetime64[ns]"), horizon),
+    })
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Cache (hash isi panel + konfigurasi)
+# ------------------------------- | ------------------------------- | -------------------------------
+def _digest(keys: pd.DataFrame, Y: np.ndarray, horizon: int) -> str:
+    h = hashlib.sha1(json.dumps([
+        GLOBAL_VERSION, LGBM_PARAMS, NUM_BOOST_ROUND, LAGS, ROLLING_WINDOWS, horizon,
+        keys.to_numpy().tolist(), panel.regions(),
+    ]).encode())
+    h.update(np.ascontiguousarray(Y).tobytes())
+    return h.hexdigest()
+
+
+def _cache_path(digest: str) -> pathlib.Path:
+    return forecasting.CACHE_DIR / f"global-{digest[:16]}.parquet"
+
+
+def forecast_global(regions: Optional[Sequence[str]] = None, targets: Sequence[str] = forecasting.TARGET_COLS,
+                    horizon: int = forecasting.HORIZON) -> pd.DataFrame:
+    """Forecast global semua (region, target); model hanya ditrain ulang jika isi panel berubah."""
+    keys, Y, last_obs = series_matrix(regions, targets)
+    if not len(keys):
+        return pd.DataFrame(columns=[panel.REGION_COL, *forecasting.RESULT_COLUMNS])
+    path = _cache_path(_digest(keys, Y, horizon))
+    if path.is_file():
+        return pd.read_parquet(path)
+    out = fit_predict(keys, Y, last_obs, horizon)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    out.to_parquet(tmp, index=False)
+    tmp.replace(path)
+    return out
+
+
+def global_table(region: str = panel.PROVINCE) -> pd.DataFrame:
+    """Hasil global untuk satu region (skema forecast_results), di-cache per versi data ABT."""
+    def _compute(_p):
+        out = forecast_global()
+        out = out[out[panel.REGION_COL] == region].drop(columns=panel.REGION_COL).reset_index(drop=True)
+        out["target"] = out["target"].astype("category")
+        out["model"] = out["model"].astype("category")
+        return out
+
+    return data_loader.cached_read(f"abt:global_forecast[{region}]", panel.source_paths(), _compute)
+
+
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    _keys, _Y, _last = series_matrix()
+    _out = fit_predict(_keys, _Y, _last)
+    print(f"{len(_keys)} series, {len(_out)} baris forecast dalam {time.perf_counter() - t0:.1f} s")
+    print(_out.groupby([panel.REGION_COL, "target"])[["yhat", "yhat_lower", "yhat_upper"]].mean().round(3).to_string())
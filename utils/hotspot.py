@@ -0,0 +1,278 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Spatial Autocorrelation & Hotspot — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Apakah kab/kota dengan indikator buruk berkumpul secara spasial?
+#   - bobot kontiguitas queen (polygon bersinggungan, lewat STRtree utils.spatial) dibangun SEKALI per
+#     versi GeoJSON sebagai scipy.sparse CSR, urut regions.dimension(); graf networkx untuk tampilan;
+#   - Moran's I global  : I = (n / S0) · zᵀWz / zᵀz, W distandardisasi baris;
+#   - Getis-Ord Gi*     : z-score lokal dari W* = W + I (biner, termasuk diri sendiri);
+#   - p-value permutasi : Moran → permutasi penuh nilai; Gi* → permutasi kondisional (x_i tetap,
+#     tetangga diambil acak dari wilayah lain). Semua permutasi satu blok dihitung sebagai produk
+#     sparse / array sekaligus; blok dibagi ke ProcessPoolExecutor jika permutasinya banyak.
+# Wilayah tanpa data (NaN) dikeluarkan dari W sebelum statistik dihitung.
+#
+#   python -m utils.hotspot --column jumlah_bayi_bblr --permutations 9999 --workers 4
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import clustering, data_loader, regions, spatial
+
+if TYPE_CHECKING:                # scipy berat → di-import di fungsi yang memakainya (lihat utils.reconcile)
+    from scipy import sparse
+
+PERMUTATIONS = 999
+PERM_BLOCK = 500                 # permutasi per blok (memori Gi*: blok × n × n float)
+PARALLEL_MIN = 10_000            # di bawah ini overhead spawn process > waktu hitung → serial
+SEED = 12345
+ALPHAS = (0.05, 0.10)            # tingkat signifikansi kelas hotspot (95%, 90%)
+NO_DATA = "Tanpa data"
+NOT_SIGNIFICANT = "Tidak signifikan"
+HOTSPOT_LEVELS = [
+    "Hotspot 95%", "Hotspot 90%", NOT_SIGNIFICANT, "Coldspot 90%", "Coldspot 95%", NO_DATA,
+]
+INDICATORS: List[str] = clustering.feature_columns(clustering.FEATURE_GROUPS)
+
+
+@dataclass(frozen=True)
+class Contiguity:
+    codes: np.ndarray            # region_code per baris/kolom W (urut regions.dimension())
+    W: "sparse.csr_matrix"       # biner simetris, diagonal 0
+
+    def subset(self, mask: np.ndarray) -> "sparse.csr_matrix":
+        idx = np.flatnonzero(mask)
+        return self.W[idx][:, idx].tocsr()
+
+
+@dataclass(frozen=True)
+class HotspotResult:
+    column: str
+    moran_i: float
+    moran_expected: float
+    moran_z_sim: float           # (I - rata-rata permutasi) / std permutasi
+    moran_p: float
+    gi_z: np.ndarray             # [n wilayah dimensi], NaN untuk wilayah tanpa data
+    gi_p: np.ndarray
+    permutations: int
+
+    def frame(self, alpha_levels: Tuple[float, ...] = ALPHAS) -> pd.DataFrame:
+        """region_code + gi_z, gi_p, kelas hotspot (urut dimensi)."""
+        return pd.DataFrame({
+            regions.CODE_COL: regions.dimension()[regions.CODE_COL].to_numpy(),
+            "gi_z": self.gi_z,
+            "gi_p": self.gi_p,
+            "hotspot": classify(self.gi_z, self.gi_p, alpha_levels),
+        })
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Bobot kontiguitas & graf (sekali per versi GeoJSON)
+# ------------------------------- | ------------------------------- | -------------------------------
+def _build_contiguity(_p) -> Contiguity:
+    from scipy import sparse
+
+    index = spatial.get_index()
+    codes = regions.dimension()[regions.CODE_COL].to_numpy()
+    pos = pd.Series(np.arange(len(codes)), index=codes).reindex(index.codes).to_numpy()
+    geoms = index.tree.geometries
+    left, right = index.tree.query(geoms, predicate="intersects")
+    keep = left != right
+    rows, cols = pos[left[keep]], pos[right[keep]]
+
+    # pulau tanpa tetangga bersinggungan → dihubungkan ke polygon terdekat
+    isolated = np.setdiff1d(np.arange(len(geoms)), left[keep])
+    if len(isolated):
+        near_src, near_dst = index.tree.query_nearest(geoms[isolated], exclusive=True, all_matches=False)
+        extra_r, extra_c = pos[isolated[near_src]], pos[near_dst]
+        rows = np.concatenate([rows, extra_r, extra_c])
+        cols = np.concatenate([cols, extra_c, extra_r])
+
+    W = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(codes), len(codes)))
+    W.data[:] = 1.0                                                  # pasangan ganda → tetap biner
+    return Contiguity(codes, W)
+
+
+def contiguity() -> Contiguity:
+    """Bobot kontiguitas queen kab/kota (sparse), di-cache per versi jatim_kabkota.geojson."""
+    return data_loader.cached_read(
+        "geo_kabkota:contiguity", data_loader.dataset_path("geo_kabkota"), _build_contiguity
+    )
+
+
+def _build_graph(_p):
+    import networkx as nx
+
+    graph = nx.from_scipy_sparse_array(contiguity().W)
+    dim = regions.dimension()
+    nx.set_node_attributes(graph, dict(enumerate(dim[regions.CODE_COL].tolist())), regions.CODE_COL)
+    nx.set_node_attributes(graph, dict(enumerate(dim["region_name"].tolist())), "region_name")
+    return graph
+
+
+def graph():
+    """Graf ketetanggaan networkx (node = posisi di dimensi, atribut region_code & region_name)."""
+    return data_loader.cached_read(
+        "geo_kabkota:contiguity_graph", data_loader.dataset_path("geo_kabkota"), _build_graph
+    )
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Statistik & permutasi
+# ------------------------------- | ------------------------------- | -------------------------------
+def _row_standardize(W: "sparse.csr_matrix") -> "sparse.csr_matrix":
+    from scipy import sparse
+
+    deg = np.asarray(W.sum(axis=1)).ravel()
+    return sparse.diags(np.where(deg > 0, 1.0 / np.maximum(deg, 1e-12), 0.0)) @ W
+
+
+def _moran_num(Wr: "sparse.csr_matrix", Z: np.ndarray) -> np.ndarray:
+    """zᵀWz untuk tiap kolom Z [n × m] sekaligus."""
+    return np.asarray((Wr @ Z) * Z).sum(axis=0)
+
+
+def _gi_z(sums: np.ndarray, x: np.ndarray, w_star: np.ndarray) -> np.ndarray:
+    """z-score Gi* dari jumlah tetangga (termasuk diri) `sums`, bobot biner."""
+    n = len(x)
+    xbar = x.mean()
+    s = np.sqrt((x ** 2).mean() - xbar ** 2)
+    denom = s * np.sqrt((n * w_star - w_star ** 2) / (n - 1))
+    return (sums - xbar * w_star) / np.where(denom > 0, denom, np.nan)
+
+
+def _perm_block(task: Tuple[np.ndarray, "sparse.csr_matrix", np.ndarray, List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(zᵀWz permutasi [p], jumlah tetangga Gi* kondisional [p × n]) untuk satu blok seed."""
+    z, Wr, k, seeds = task
+    n, kmax = len(z), int(k.max(initial=0))
+    moran, gi = [], []
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        # Moran: PERM_BLOCK permutasi penuh sebagai kolom matriks → satu produk sparse
+        Z = z[rng.permuted(np.tile(np.arange(n), (PERM_BLOCK, 1)), axis=1).T]
+        moran.append(_moran_num(Wr, Z))
+        # Gi*: x_i tetap, k_i tetangga diambil tanpa pengembalian dari n-1 wilayah lain
+        keys = rng.random((PERM_BLOCK, n, n))
+        keys[:, np.arange(n), np.arange(n)] = 2.0
+        order = np.argsort(keys, axis=2)[:, :, :kmax]
+        take = np.arange(kmax)[None, :] < k[:, None]                    # [n × kmax]
+        gi.append(z[None, :] + (z[order] * take[None]).sum(axis=2))
+    return np.concatenate(moran), np.concatenate(gi, axis=0)
+
+
+def _folded_p(sim: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """p-value pseudo dua arah (dilipat, seperti PySAL): (min(#≥obs, #<obs) + 1) / (P + 1)."""
+    larger = (sim >= observed).sum(axis=0)
+    larger = np.minimum(larger, len(sim) - larger)
+    return (larger + 1.0) / (len(sim) + 1.0)
+
+
+def compute(values: np.ndarray, column: str = "", permutations: int = PERMUTATIONS,
+            workers: Optional[int] = None) -> HotspotResult:
+    """Moran's I + Gi* untuk nilai per wilayah (urut dimensi, NaN = tanpa data)."""
+    values = np.asarray(values, dtype=float)
+    observed = ~np.isnan(values)
+    W = contiguity().subset(observed)
+    x = values[observed]
+    n = len(x)
+    if n < 3 or np.nanstd(x) == 0:
+        raise ValueError(f"{column or 'indikator'}: butuh ≥ 3 wilayah dengan nilai bervariasi.")
+
+    z = x - x.mean()
+    Wr = _row_standardize(W)
+    s0 = Wr.sum()
+    scale = n / s0 / (z @ z)
+    moran_i = float(_moran_num(Wr, z[:, None])[0] * scale)
+
+    k = np.asarray(W.sum(axis=1)).ravel().astype(int)                 # jumlah tetangga (tanpa diri)
+    gi_sums = z + W @ z                                               # W* = W + I, pakai z (Gi* invarian geser)
+
+    n_blocks = max(1, -(-permutations // PERM_BLOCK))
+    seeds = [SEED + b for b in range(n_blocks)]
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, n_blocks) if permutations >= PARALLEL_MIN else 1
+    # blok seed berurutan per worker → hasil identik untuk jumlah worker berapa pun
+    tasks = [(z, Wr, k, list(chunk)) for chunk in np.array_split(seeds, workers) if len(chunk)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_perm_block, tasks))
+    else:
+        parts = [_perm_block(task) for task in tasks]
+    moran_sim = np.concatenate([p[0] for p in parts])[:permutations] * scale
+    gi_sim = np.concatenate([p[1] for p in parts], axis=0)[:permutations]
+
+    gi_z = np.full(len(values), np.nan)
+    gi_p = np.full(len(values), np.nan)
+    gi_z[observed] = _gi_z(gi_sums, z, k + 1.0)
+    gi_p[observed] = _folded_p(gi_sim, gi_sums[None, :])
+    return HotspotResult(
+        column=column,
+        moran_i=moran_i,
+        moran_expected=-1.0 / (n - 1),
+        moran_z_sim=float((moran_i - moran_sim.mean()) / (moran_sim.std() or np.nan)),
+        moran_p=float(_folded_p(moran_sim[:, None], np.array([moran_i]))[0]),
+        gi_z=gi_z, gi_p=gi_p, permutations=permutations,
+    )
+
+
+def classify(gi_z: np.ndarray, gi_p: np.ndarray, alpha_levels: Tuple[float, ...] = ALPHAS) -> np.ndarray:
+    """Kelas hotspot per wilayah: Hotspot/Coldspot per tingkat keyakinan, tidak signifikan, tanpa data."""
+    out = np.full(len(gi_z), NOT_SIGNIFICANT, dtype=object)
+    for alpha in sorted(alpha_levels, reverse=True):                 # tingkat paling ketat menimpa terakhir
+        level = f"{round((1 - alpha) * 100)}%"
+        out[(gi_p < alpha) & (gi_z > 0)] = f"Hotspot {level}"
+        out[(gi_p < alpha) & (gi_z < 0)] = f"Coldspot {level}"
+    out[np.isnan(gi_z)] = NO_DATA
+    return out
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Indikator dataset cluster (di-cache per versi file)
+# ------------------------------- | ------------------------------- | -------------------------------
+def indicator_values(column: str) -> np.ndarray:
+    """Nilai `column` dataset cluster per wilayah dimensi (NaN untuk wilayah tanpa data)."""
+    joined, _ = regions.join(
+        data_loader.load("cluster"), clustering.NAME_COL,
+        codes=regions.dataset_codes("cluster", clustering.NAME_COL),
+    )
+    return pd.to_numeric(joined[column], errors="coerce").to_numpy(dtype=float)
+
+
+def analyze(column: str = clustering.RANK_COL, permutations: int = PERMUTATIONS,
+            workers: Optional[int] = None) -> HotspotResult:
+    """Moran's I + Gi* satu indikator dataset cluster, di-memo per (kolom, permutasi) & versi file."""
+    if column not in INDICATORS:
+        raise ValueError(f"Indikator tidak dikenal: {column}")
+    return data_loader.cached_read(
+        f"cluster:hotspot[{column}|{permutations}]", data_loader.dataset_path("cluster"),
+        lambda _p: compute(indicator_values(column), column, permutations, workers),
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    import networkx as nx
+
+    parser = argparse.ArgumentParser(description="Moran's I & hotspot Gi* indikator kab/kota.")
+    parser.add_argument("--column", default=None, help="default: semua indikator")
+    parser.add_argument("--permutations", type=int, default=PERMUTATIONS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    G = graph()
+    print(f"Graf kontiguitas: {G.number_of_nodes()} wilayah, {G.number_of_edges()} sisi, "
+          f"{nx.number_connected_components(G)} komponen\n")
+    dim = regions.dimension()
+    for col in [args.column] if args.column else INDICATORS:
+        t0 = time.perf_counter()
+        res = compute(indicator_values(col), col, args.permutations, args.workers)
+        table = res.frame()
+        hot = dim.loc[table["hotspot"].str.startswith("Hotspot"), "region_name"].tolist()
+        cold = dim.loc[table["hotspot"].str.startswith("Coldspot"), "region_name"].tolist()
+        print(f"{col:<40} I={res.moran_i:+.3f} (E={res.moran_expected:+.3f}, p={res.moran_p:.3f}) "
+              f"({(time.perf_counter() - t0) * 1000:.0f} ms)\n    hot: {hot}\n    cold: {cold}")
@@ -0,0 +1,247 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Incremental Forecast Update — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Saat satu bulan baru masuk ke ABT, tidak perlu menjalankan ulang seluruh pipeline offline:
+#   - state model per (region, target) disimpan (nama model, parameter, last_obs, interval forecast);
+#   - bulan baru → warm start: filter/smoother dijalankan ulang dengan parameter tersimpan
+#     (tanpa optimasi), lalu forecast digeser ke horizon baru;
+#   - full refit (pemilihan model + fit) hanya jika: belum ada state, histori lama berubah,
+#     jadwal refit tercapai (REFIT_EVERY_MONTHS), atau drift (observasi baru keluar dari interval
+#     forecast sebelumnya);
+#   - hanya baris yang terdampak yang ditulis ulang di forecast_results.csv &
+#     df_merged_after_forecast.csv (baris target lain / bulan lain tidak disentuh).
+#
+#   python -m utils.incremental            # update inkremental (provinsi) + tulis CSV
+#   python -m utils.incremental --full     # paksa full refit
+#   python -m utils.incremental --dry-run  # hanya tampilkan rencana aksi
+import argparse
+import hashlib
+import json
+import pathlib
+import urllib.parse
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, features, forecasting, panel
+
+STATE_DIR = forecasting.CACHE_DIR / "state"
+REFIT_EVERY_MONTHS = 6     # full refit terjadwal tiap N bulan data baru
+DRIFT_MAX_OUTSIDE = 1      # jumlah observasi baru di luar interval sebelumnya yang memicu full refit
+
+# Konvensi file merged: ASI_gap_target = Persentase_ASI (proporsi) - target dalam persen
+ASI_GAP_OFFSET = 80.0
+
+
+@dataclass
+class SeriesState:
+    model: str
+    params: List[float]
+    n_obs: int
+    last_obs: str
+    last_full_refit: str
+    history_sha1: str
+    forecast: Dict[str, List] = field(default_factory=dict)   # date / lower / upper dari run terakhir
+
+
+def history_sha1(y: pd.Series) -> str:
+    h = hashlib.sha1(str(y.index[0]).encode())
+    h.update(np.ascontiguousarray(y.to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def _state_path(region: str) -> pathlib.Path:
+    return STATE_DIR / f"{urllib.parse.quote(region, safe='')}.json"
+
+
+def load_state(region: str) -> Dict[str, SeriesState]:
+    path = _state_path(region)
+    if not path.is_file():
+        return {}
+    return {target: SeriesState(**raw) for target, raw in json.loads(path.read_text()).items()}
+
+
+def save_state(region: str, state: Dict[str, SeriesState]) -> None:
+    path = _state_path(region)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({t: asdict(s) for t, s in state.items()}, indent=1))
+    tmp.replace(path)
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Rencana aksi per series
+# ------------------------------- | ------------------------------- | -------------------------------
+def plan(y: pd.Series, prev: Optional[SeriesState], force_full: bool = False) -> Tuple[str, str]:
+    """(aksi, alasan) untuk satu series; aksi ∈ {"skip", "warm", "full"}."""
+    if force_full:
+        return "full", "paksa"
+    if prev is None:
+        return "full", "belum ada state"
+    if len(y) < prev.n_obs or history_sha1(y.iloc[:prev.n_obs]) != prev.history_sha1:
+        return "full", "histori berubah"
+    if len(y) == prev.n_obs:
+        return "skip", "tidak ada bulan baru"
+
+    months_since_refit = (y.index[-1].to_period("M") - pd.Period(prev.last_full_refit, "M")).n
+    if months_since_refit >= REFIT_EVERY_MONTHS:
+        return "full", f"jadwal ({months_since_refit} bulan sejak refit)"
+
+    prev_fc = pd.DataFrame(prev.forecast).assign(date=lambda d: pd.to_datetime(d["date"])).set_index("date")
+    new_obs = y.iloc[prev.n_obs:]
+    band = prev_fc.reindex(new_obs.index)
+    # bulan baru di luar horizon forecast tersimpan (band NaN) tidak bisa dicek drift-nya → full refit,
+    # bukan lolos diam-diam (perbandingan dengan NaN selalu False)
+    unchecked = int(band[["lower", "upper"]].isna().any(axis=1).sum())
+    if unchecked:
+        return "full", f"{unchecked} bulan baru di luar horizon forecast sebelumnya"
+    outside = int(((new_obs < band["lower"]) | (new_obs > band["upper"])).sum())
+    if outside >= DRIFT_MAX_OUTSIDE:
+        return "full", f"drift ({outside} observasi di luar interval)"
+    return "warm", f"{len(new_obs)} bulan baru"
+
+
+def update(region: str = panel.PROVINCE, targets: Sequence[str] = forecasting.TARGET_COLS,
+           force_full: bool = False, dry_run: bool = False) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """Update forecast inkremental untuk satu region.
+
+    Return (ringkasan aksi per target, {target: forecast baru}) — hanya target yang berubah.
+    """
+    frame = panel.region_frame(region, columns=["Date", *targets])
+    state = load_state(region)
+    summary, changed = [], {}
+
+    for target in targets:
+        y = forecasting.prepare_series(frame, target)
+        if len(y) < forecasting.SEASONAL_PERIOD + forecasting.VALIDATION_MONTHS:
+            summary.append({"target": target, "aksi": "skip", "alasan": "series terlalu pendek", "model": None})
+            continue
+        prev = state.get(target)
+        action, reason = plan(y, prev, force_full)
+        if action == "skip" or dry_run:
+            summary.append({"target": target, "aksi": action, "alasan": reason, "model": prev.model if prev else None})
+            continue
+
+        if action == "warm":
+            name, params, last_full = prev.model, prev.params, prev.last_full_refit
+            fitted = forecasting.apply_params(name, y, params)
+        else:
+            name, fitted = forecasting.fit_best(y)
+            params, last_full = forecasting.model_params(fitted), y.index[-1].strftime("%Y-%m")
+
+        fc = forecasting.forecast_frame(target, y, name, fitted)
+        changed[target] = fc
+        state[target] = SeriesState(
+            model=name, params=params, n_obs=len(y), last_obs=y.index[-1].strftime("%Y-%m-%d"),
+            last_full_refit=last_full, history_sha1=history_sha1(y),
+            forecast={"date": fc["date"].dt.strftime("%Y-%m-%d").tolist(),
+                      "lower": fc["yhat_lower"].tolist(), "upper": fc["yhat_upper"].tolist()},
+        )
+        summary.append({"target": target, "aksi": action, "alasan": reason, "model": name})
+
+    if changed and not dry_run:
+        save_state(region, state)
+    return pd.DataFrame(summary), changed
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Tulis ulang hanya baris terdampak
+# ------------------------------- | ------------------------------- | -------------------------------
+def rewrite_forecast_results(changed: Dict[str, pd.DataFrame]) -> int:
+    """Ganti baris target yang berubah di forecast_results.csv; urutan target lama dipertahankan."""
+    path = data_loader.dataset_path("forecast_results")
+    current = pd.read_csv(path)
+    order = list(dict.fromkeys([*current["target"], *changed]))
+    kept = current[~current["target"].isin(list(changed))]
+    out = pd.concat([kept, *changed.values()], ignore_index=True)
+    out["_order"] = out["target"].map({t: i for i, t in enumerate(order)})
+    out = out.sort_values(["_order", "date"], kind="stable").drop(columns="_order")
+    forecasting.write_results(out, path)
+    return sum(len(fc) for fc in changed.values())
+
+
+def _isclose(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """Perbandingan elemen NaN-aware; kolom non-numerik dibandingkan sebagai string."""
+    out = {}
+    for col in a.columns:
+        x, y = a[col], b[col]
+        if pd.api.types.is_numeric_dtype(x) and pd.api.types.is_numeric_dtype(y):
+            out[col] = np.isclose(x.to_numpy(float), y.to_numpy(float), rtol=1e-9, atol=0, equal_nan=True)
+        else:
+            out[col] = (x.astype(str) == y.astype(str)).to_numpy()
+    return pd.DataFrame(out, index=a.index)
+
+
+def rewrite_merged(changed: Dict[str, pd.DataFrame]) -> int:
+    """Sinkronkan df_merged_after_forecast.csv dengan ABT terbaru & forecast baru; return jumlah baris yang berubah."""
+    path = data_loader.dataset_path("merged_forecast")
+    merged = pd.read_csv(path)
+    columns = list(merged.columns)
+    merged["Date"] = pd.to_datetime(merged["Date"], format="%Y-%m-%d")
+
+    abt = data_loader.load("abt").copy()
+    abt["Date"] = pd.to_datetime(abt["Date"], format="%Y-%m")
+    abt = abt.set_index("Date")
+
+    dates = merged["Date"].tolist() + abt.index.tolist() + [d for fc in changed.values() for d in fc["date"]]
+    merged = merged.set_index("Date").reindex(pd.DatetimeIndex(sorted(set(dates)), name="Date"))
+    before = merged.copy()
+
+    # 1) kolom mentah ABT (selain target forecast) di bulan-bulan ABT
+    raw_cols = [c for c in abt.columns if c not in forecasting.TARGET_COLS and c in merged.columns]
+    merged.loc[abt.index, raw_cols] = abt[raw_cols]
+
+    # 2) kolom target: aktual s/d last_obs, yhat + CI di horizon baru, kosong setelahnya
+    for target, fc in changed.items():
+        lo, up = f"{target}_fc_lower", f"{target}_fc_upper"
+        last_obs = pd.Timestamp(fc["last_obs"].iloc[0])
+        fc_idx = fc.set_index("date")
+        history = merged.index <= last_obs
+        merged.loc[history, target] = abt[target].reindex(merged.index[history]).to_numpy()
+        merged.loc[~history, target] = np.nan
+        merged[[lo, up]] = np.nan
+        merged.loc[fc_idx.index, target] = fc_idx["yhat"]
+        merged.loc[fc_idx.index, lo] = fc_idx["yhat_lower"]
+        merged.loc[fc_idx.index, up] = fc_idx["yhat_upper"]
+
+    touched = ~_isclose(merged, before).all(axis=1)
+
+    # 3) fitur turunan (dihitung dari ABT mentah) hanya untuk baris ABT yang berubah
+    feat_dates = merged.index[touched & merged.index.isin(abt.index)]
+    if len(feat_dates):
+        src = abt.loc[feat_dates].reset_index()
+        feats = features.add_capacity_features(src).set_index("Date")
+        feat_cols = [c for c in features.CAPACITY_FEATURES if c in merged.columns]
+        for col in feat_cols:
+            values = feats[col]
+            merged.loc[feat_dates, col] = values.astype(object) if col.endswith("_status") else values.astype(float)
+        if "ASI_gap_target" in merged.columns:
+            merged.loc[feat_dates, "ASI_gap_target"] = src["Persentase_ASI"].to_numpy() - ASI_GAP_OFFSET
+
+    if not touched.any():
+        return 0
+    out = merged.reset_index()
+    out["Date"] = out["Date"].dt.strftime("%Y-%m-%d")
+    out[columns].to_csv(path, index=False)
+    return int(touched.sum())
+
+
+def run(region: str = panel.PROVINCE, force_full: bool = False, dry_run: bool = False) -> pd.DataFrame:
+    """Update inkremental + tulis ulang CSV (hanya untuk series provinsi yang jadi sumber file offline)."""
+    summary, changed = update(region, force_full=force_full, dry_run=dry_run)
+    if changed and region == panel.PROVINCE:
+        n_fc = rewrite_forecast_results(changed)
+        n_merged = rewrite_merged(changed)
+        print(f"forecast_results: {n_fc} baris ditulis ulang; df_merged_after_forecast: {n_merged} baris berubah")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update forecast inkremental saat bulan baru masuk.")
+    parser.add_argument("--region", default=panel.PROVINCE)
+    parser.add_argument("--full", action="store_true", help="Paksa full refit semua target.")
+    parser.add_argument("--dry-run", action="store_true", help="Tampilkan rencana aksi saja.")
+    args = parser.parse_args()
+    print(run(args.region, force_full=args.full, dry_run=args.dry_run).to_string(index=False))
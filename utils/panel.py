@@ -0,0 +1,152 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Region × Month Panel — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Panel panjang ber-key (region, Date) untuk tab EDA. Sumber:
+#   - data/ABT_KabKota.csv (opsional): kolom `region` + `Date` + kolom ABT, per kab/kota × bulan
+#   - data/ABT_Master.csv: series level provinsi
+# Series provinsi: kolom count = jumlah kab/kota per bulan; kolom rasio/persentase/hari tetap dari
+# ABT_Master (angka resmi provinsi). Rata-rata rasio kab/kota tanpa bobot penyebut (tempat tidur,
+# kelahiran, …) bukan rasio provinsi, dan penyebutnya tidak ada di data. Tanpa data kab/kota,
+# series provinsi = ABT apa adanya.
+#
+# Agregasi dihitung sekali saat build, lalu disimpan sebagai Parquet terpartisi per region
+# (data/parquet/abt_panel/region=<nama>/part-0.parquet). View satu region hanya membaca partisinya,
+# dan hasilnya di-cache per (region, kolom) → ganti region = lookup, bukan filter ulang frame penuh.
+import json
+import pathlib
+import shutil
+import urllib.parse
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from utils import data_loader, storage
+
+REGION_COL = "region"
+PROVINCE = "Jawa Timur"
+PANEL_DIR = storage.PARQUET_DIR / "abt_panel"
+MANIFEST = "_manifest.json"
+
+# Kolom count → dijumlah saat roll-up; kolom numerik lain (rasio/persentase/hari) → rata-rata
+SUM_COLS = ["Jumlah Bidan", "Jumlah Perawat", "Jumlah Dokter Umum", "Jumlah Ahli Gizi",
+            "Layanan OBGYN", "Bayi BBLR"]
+
+
+def _sources() -> List[str]:
+    return ["abt"] + (["abt_kabkota"] if data_loader.dataset_path("abt_kabkota").is_file() else [])
+
+
+def source_paths() -> List[pathlib.Path]:
+    """File sumber panel, termasuk kab/kota opsional walau belum / tidak lagi ada.
+
+    Dipakai sebagai anchor cache turunan panel: menghapus ABT_KabKota.csv ikut membatalkan cache.
+    """
+    return [data_loader.dataset_path("abt"), data_loader.dataset_path("abt_kabkota")]
+
+
+def _source_digests() -> dict:
+    return {name: data_loader.file_digest(data_loader.dataset_path(name)) for name in _sources()}
+
+
+def partition_path(region: str) -> pathlib.Path:
+    return PANEL_DIR / f"{REGION_COL}={urllib.parse.quote(region, safe='')}" / "part-0.parquet"
+
+
+def rollup(kabkota: pd.DataFrame, province: pd.DataFrame) -> pd.DataFrame:
+    """Series provinsi per bulan: kolom count = jumlah kab/kota, kolom rasio = nilai ABT provinsi."""
+    value_cols = [c for c in kabkota.columns if c not in (REGION_COL, "Date")]
+    sums = kabkota.groupby("Date", sort=True)[[c for c in value_cols if c in SUM_COLS]].sum(min_count=1)  # semua NaN → NaN
+    rates = province.set_index("Date")[[c for c in value_cols if c not in SUM_COLS and c in province.columns]]
+    out = sums.join(rates, how="outer").reindex(columns=value_cols)
+    out.index.name = "Date"
+    return out.reset_index()
+
+
+def build_partitions() -> pathlib.Path:
+    """Tulis ulang partisi panel (atomic: folder tmp lalu rename)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    province = storage.load_table("abt")
+    groups = {}
+    if "abt_kabkota" in _sources():
+        kabkota = storage.load_table("abt_kabkota")
+        groups = {region: g.drop(columns=REGION_COL) for region, g in kabkota.groupby(REGION_COL, sort=True)}
+        province = rollup(kabkota, province)
+    groups[PROVINCE] = province
+
+    tmp = PANEL_DIR.with_name(PANEL_DIR.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    for region, frame in groups.items():
+        dst = tmp / partition_path(region).relative_to(PANEL_DIR)
+        dst.parent.mkdir(parents=True)
+        frame = frame.sort_values("Date").reset_index(drop=True)
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), dst, compression="zstd")
+
+    manifest = {"sources": _source_digests(), "regions": [PROVINCE] + sorted(r for r in groups if r != PROVINCE)}
+    (tmp / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    shutil.rmtree(PANEL_DIR, ignore_errors=True)
+    tmp.rename(PANEL_DIR)
+    return PANEL_DIR
+
+
+def _read_manifest() -> Optional[dict]:
+    try:
+        return json.loads((PANEL_DIR / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_fresh() -> dict:
+    """Build ulang partisi jika hash sumber berubah; kembalikan manifest.
+
+    Satu cached_read atas semua file sumber (termasuk kab/kota yang dihapus), jadi hash hanya dihitung
+    saat salah satu sumber berubah / muncul / hilang.
+    """
+    def _check(_p):
+        manifest = _read_manifest()
+        if manifest is None or manifest["sources"] != _source_digests():
+            build_partitions()
+            manifest = _read_manifest()
+        return manifest
+
+    return data_loader.cached_read("abt:panel", source_paths(), _check)
+
+
+def regions() -> List[str]:
+    """Region tersedia: provinsi (roll-up) lebih dulu, lalu kab/kota urut nama."""
+    return ensure_fresh()["regions"]
+
+
+def version() -> str:
+    """Versi panel (gabungan hash sumber) → bagian key cache figure."""
+    return "-".join(v[:12] for _, v in sorted(ensure_fresh()["sources"].items()))
+
+
+def region_frame(region: str = PROVINCE, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Series bulanan satu region (hanya partisi region itu yang dibaca), di-cache per (region, kolom).
+
+    Hasilnya di-share lintas session → jangan dimodifikasi in-place.
+    """
+    if region not in regions():
+        raise KeyError(f"Region '{region}' tidak ada di panel. Pilihan: {regions()}")
+    if not partition_path(region).is_file():   # folder parquet dihapus manual → build ulang
+        build_partitions()
+    cols = list(columns) if columns is not None else None
+    key = f"abt_panel:{region}[{','.join(cols) if cols else '*'}]"
+    return data_loader.cached_read(
+        key, partition_path(region), lambda p: pd.read_parquet(p, columns=cols, engine="pyarrow")
+    )
+
+
+def load_panel(columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Panel penuh (region, Date) ter-index, untuk perbandingan lintas region."""
+    frames = {r: region_frame(r, columns) for r in regions()}
+    return pd.concat(frames, names=[REGION_COL, None]).reset_index(level=1, drop=True).set_index("Date", append=True)
+
+
+if __name__ == "__main__":
+    build_partitions()
+    for _region in regions():
+        _p = partition_path(_region)
+        print(f"{_region:<28} {_p.relative_to(data_loader.ROOT_DIR)} ({_p.stat().st_size / 1024:.1f} KB)")
@@ -0,0 +1,128 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Hierarchical Forecast Reconciliation — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Hierarki 2 level: provinsi (total) ← kab/kota (bottom). Forecast base tiap node (engine per series)
+# tidak otomatis koheren: angka provinsi ≠ jumlah forecast kab/kota. Rekonsiliasi linear:
+#   ỹ = S · G · ŷ      S [n_node × n_bottom] = [1^T ; I]
+#   - bottom_up : G = [0 | I]                              → provinsi = jumlah kab/kota
+#   - mint_wls  : G = (S' W⁻¹ S)⁻¹ S' W⁻¹, W = diag(σ²)    → MinT WLS variance scaling: σ per node & target
+#                 dari interval base langkah-1 (= std residual in-sample model terpilih), jadi node yang
+#                 forecast-nya lebih tidak pasti menyerap koreksi lebih besar.
+# Hanya kolom count (panel.SUM_COLS) yang punya batasan agregasi: rasio provinsi adalah angka resmi ABT,
+# bukan rata-rata kab/kota (penyebutnya tidak ada di data). Karena itu sumber terekonsiliasi mem-forecast
+# series count (TARGETS) — bukan indikator rasio forecasting.TARGET_COLS — lalu merekonsiliasinya;
+# target lain yang ikut di input dibiarkan apa adanya.
+#
+# S disimpan sebagai scipy.sparse; forecast satu target (semua horizon) disusun jadi matriks
+# [n_node × bulan] sehingga satu target = satu solve sparse, tanpa loop per region.
+# Interval ikut digeser sebesar koreksi ŷ (lebar interval base dipertahankan).
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, forecasting, panel
+
+METHODS: Dict[str, str] = {"bottom_up": "Bottom-up", "mint_wls": "MinT (WLS)"}
+TARGETS: List[str] = list(panel.SUM_COLS)   # series yang dijumlah provinsi ← kab/kota
+
+
+def hierarchy(regions: List[str]) -> Tuple[str, List[str]]:
+    """(node total, node bottom) dari daftar region panel."""
+    return panel.PROVINCE, [r for r in regions if r != panel.PROVINCE]
+
+
+def summing_matrix(n_bottom: int):
+    """S sparse [(1 + n_bottom) × n_bottom]: baris 0 = jumlah provinsi, sisanya identitas."""
+    import scipy.sparse as sp
+
+    top = sp.csr_matrix(np.ones((1, n_bottom)))
+    return sp.vstack([top, sp.identity(n_bottom, format="csr")], format="csr")
+
+
+def reconcile_matrix(base: np.ndarray, S, method: str, variances: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rekonsiliasi matriks forecast base [n_node × k] (kolom = bulan) dalam satu pass.
+
+    `variances` [n_node] = diagonal W untuk mint_wls; None / tidak valid → structural scaling diag(S·1).
+    """
+    import scipy.sparse as sp
+    import scipy.sparse.linalg as spla
+
+    n_bottom = S.shape[1]
+    if method == "bottom_up":
+        bottom = base[-n_bottom:]
+    elif method == "mint_wls":
+        if variances is None or not (np.isfinite(variances).all() and (variances > 0).all()):
+            variances = np.asarray(S.sum(axis=1)).ravel()
+        StW = S.T @ sp.diags(1.0 / variances)
+        bottom = spla.spsolve((StW @ S).tocsc(), StW @ base)
+        bottom = np.asarray(bottom).reshape(n_bottom, -1)
+    else:
+        raise ValueError(f"Metode rekonsiliasi tidak dikenal: {method}. Pilihan: {list(METHODS)}")
+    return np.asarray(S @ bottom)
+
+
+def base_variances(base: pd.DataFrame, nodes: List[str]) -> pd.DataFrame:
+    """σ² forecast langkah-1 per node (baris) × target (kolom), dari lebar interval 95% base."""
+    first = base.sort_values("date").groupby([panel.REGION_COL, "target"], observed=True).head(1)
+    sigma = (first["yhat_upper"] - first["yhat_lower"]) / (2 * forecasting.Z_95)
+    return (first.assign(var=sigma ** 2)
+            .pivot_table(index=panel.REGION_COL, columns="target", values="var", observed=True)
+            .reindex(nodes))
+
+
+def reconcile(base: pd.DataFrame, method: str = "mint_wls") -> pd.DataFrame:
+    """Rekonsiliasi hasil forecast_regions (region + RESULT_COLUMNS); kolom & urutan tetap.
+
+    Hanya target count (panel.SUM_COLS); bulan yang tidak punya forecast di semua node dibiarkan apa adanya.
+    """
+    total, bottom = hierarchy(list(dict.fromkeys(base[panel.REGION_COL])))
+    if not bottom:                      # belum ada data kab/kota → hierarki satu node, tidak ada yang direkonsiliasi
+        return base
+    nodes = [total, *bottom]
+    out = base.copy()
+    yhat = base.pivot_table(index=panel.REGION_COL, columns=["target", "date"], values="yhat",
+                            observed=True, dropna=False).reindex(nodes)
+    variances = base_variances(base, nodes)
+    S = summing_matrix(len(bottom))
+
+    for target in yhat.columns.get_level_values("target").unique():
+        if target not in panel.SUM_COLS:
+            continue
+        block = yhat[target].to_numpy(dtype=float, copy=True)
+        complete = ~np.isnan(block).any(axis=0)
+        if not complete.any():
+            continue
+        var = variances[target].to_numpy(dtype=float) if target in variances.columns else None
+        block[:, complete] = reconcile_matrix(block[:, complete], S, method, var)
+        yhat[target] = block
+
+    adjusted = yhat.stack(["target", "date"], future_stack=True).rename("_rec").reset_index()
+    out = out.merge(adjusted, on=[panel.REGION_COL, "target", "date"], how="left")
+    shift = (out["_rec"] - out["yhat"]).fillna(0.0)
+    out["yhat"] = np.clip(out["yhat"] + shift, 0, None)
+    out["yhat_lower"] = np.clip(out["yhat_lower"] + shift, 0, None)
+    out["yhat_upper"] = np.clip(out["yhat_upper"] + shift, 0, None)
+    return out.drop(columns="_rec")[base.columns]
+
+
+def reconciled_table(method: str = "mint_wls") -> pd.DataFrame:
+    """Forecast engine series count (TARGETS) semua region setelah rekonsiliasi, di-cache per (metode, versi panel)."""
+    def _compute(_p):
+        return reconcile(forecasting.forecast_regions(targets=TARGETS), method)
+
+    return data_loader.cached_read(f"abt:reconciled[{method}]", panel.source_paths(), _compute)
+
+
+if __name__ == "__main__":
+    _base = forecasting.forecast_regions(targets=TARGETS)
+    for _method in METHODS:
+        _rec = reconcile(_base, _method)
+        _delta = (_rec["yhat"] - _base["yhat"]).abs().groupby(_base[panel.REGION_COL]).mean()
+        print(f"{METHODS[_method]}: rata-rata |koreksi| per region\n{_delta.round(4).to_string()}")
+        _yhat = _rec.pivot_table(index=["target", "date"], columns=panel.REGION_COL, values="yhat", observed=True)
+        _total, _bottom = hierarchy(list(_yhat.columns))
+        if _bottom:
+            _gap = (_yhat[_total] - _yhat[_bottom].sum(axis=1)).abs().max()
+            print(f"  max |provinsi − Σ kab/kota| = {_gap:.6f}")
+        print()
@@ -0,0 +1,140 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Region Dimension & Join Index — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Tabel dimensi kab/kota ber-key kode BPS (`CC_2`, integer) + GADM (`GID_2`) dari GeoJSON, dan index
+# alias (nama ternormalisasi → kode). Dataset lain di-join lewat kode integer dalam satu operasi
+# vektor (Series.str + map), bukan normalisasi nama per baris + merge string.
+#
+# Kunci alias = "<JENIS>|<NAMA>" (JENIS ∈ KAB / KOTA, NAMA = huruf/angka kapital), sehingga
+# "KOTA BLITAR" → KOTA|BLITAR → 3572 dan "KABUPATEN BLITAR" → KAB|BLITAR → 3505 tidak lagi bertabrakan.
+# Nama tanpa jenis ("|BLITAR") hanya dipakai jika tidak ambigu. Baris yang tidak cocok / kode ganda
+# dilaporkan di JoinReport, bukan diam-diam jatuh ke "Lainnya".
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import pandas as pd
+
+from utils import data_loader, geo
+
+CODE_COL = "region_code"
+TYPE_KAB, TYPE_KOTA = "KAB", "KOTA"
+DIM_COLUMNS = ["fid", CODE_COL, "gid", "region_type", "region_name", "label_short"]
+
+
+@dataclass
+class JoinReport:
+    unmatched: List[str] = field(default_factory=list)        # nama di dataset tanpa kode
+    duplicates: List[str] = field(default_factory=list)       # baris dataset dengan kode yang sudah terisi
+    missing: List[str] = field(default_factory=list)          # wilayah di dimensi tanpa data
+
+    @property
+    def ok(self) -> bool:
+        return not (self.unmatched or self.duplicates or self.missing)
+
+
+def normalize(names: pd.Series) -> pd.Series:
+    """Kunci alias "<JENIS>|<NAMA>" untuk seluruh Series sekaligus (JENIS kosong jika tidak disebut)."""
+    s = names.astype("string").str.upper().str.strip()
+    kind = pd.Series("", index=s.index, dtype="string")
+    kind = kind.mask(s.str.match(r"^KOTA\b|^KOTA(?=[A-Z])"), TYPE_KOTA)
+    kind = kind.mask(s.str.match(r"^KAB(UPATEN)?\b\.?"), TYPE_KAB)
+    base = s.str.replace(r"^(KABUPATEN|KAB\.?|KOTA)\s*", "", regex=True).str.replace(r"[^A-Z0-9]", "", regex=True)
+    return kind + "|" + base
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Dimensi & index alias (sekali per versi GeoJSON)
+# ------------------------------- | ------------------------------- | -------------------------------
+def _build_dim(_p) -> pd.DataFrame:
+    attrs = geo.get_store().attributes
+    kind = attrs["TYPE_2"].str.upper().map({"KABUPATEN": TYPE_KAB, "KOTA": TYPE_KOTA})
+    base = attrs["NAME_2"].str.replace(r"^Kota\s*", "", regex=True).str.strip()
+    return pd.DataFrame({
+        "fid": attrs["fid"].to_numpy(),
+        CODE_COL: attrs["CC_2"].astype(int).to_numpy(),
+        "gid": attrs["GID_2"].to_numpy(),
+        "region_type": kind.to_numpy(),
+        "region_name": (kind.map({TYPE_KAB: "", TYPE_KOTA: "Kota "}) + base).to_numpy(),
+        "label_short": base.to_numpy(),
+    })[DIM_COLUMNS]
+
+
+def dimension() -> pd.DataFrame:
+    """Tabel dimensi kab/kota (fid, kode BPS, GID GADM, jenis, nama tampilan, label singkat)."""
+    return data_loader.cached_read("geo_kabkota:region_dim", data_loader.dataset_path("geo_kabkota"), _build_dim)
+
+
+def _build_aliases(_p) -> pd.Series:
+    dim = dimension()
+    base = dim["label_short"].str.upper().str.replace(r"[^A-Z0-9]", "", regex=True)
+    typed = dim["region_type"] + "|" + base
+    bare = "|" + base
+    unique_bare = ~base.duplicated(keep=False)                     # "Blitar" ambigu (Kab & Kota) → tidak dipakai
+    aliases = pd.concat([
+        pd.Series(dim[CODE_COL].to_numpy(), index=typed.to_numpy()),
+        pd.Series(dim[CODE_COL][unique_bare].to_numpy(), index=bare[unique_bare].to_numpy()),
+        pd.Series(dim[CODE_COL].to_numpy(), index=dim["gid"].str.upper().to_numpy()),
+        pd.Series(dim[CODE_COL].to_numpy(), index=dim[CODE_COL].astype(str).to_numpy()),
+    ])
+    return aliases[~aliases.index.duplicated(keep="first")]
+
+
+def alias_index() -> pd.Series:
+    """Index alias → kode BPS (kunci normalize(), GID_2, dan kode sebagai string)."""
+    return data_loader.cached_read("geo_kabkota:region_alias", data_loader.dataset_path("geo_kabkota"), _build_aliases)
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Join
+# ------------------------------- | ------------------------------- | -------------------------------
+def resolve(names: pd.Series) -> pd.Series:
+    """Kode BPS (Int64, <NA> jika tidak dikenal) untuk Series nama / GID_2 / kode."""
+    aliases = alias_index()
+    raw = names.astype("string").str.strip()
+    codes = normalize(raw).map(aliases)
+    codes = codes.fillna(raw.str.upper().map(aliases))             # nama berupa GID_2 / kode langsung
+    return codes.astype("Int64").rename(CODE_COL)
+
+
+def dataset_codes(name: str, name_col: str) -> pd.Series:
+    """Kode per baris dataset terdaftar (index = index data_loader.load(name)), di-cache per versi file."""
+    return data_loader.cached_read(
+        f"{name}:region_codes[{name_col}]", data_loader.dataset_path(name),
+        lambda _p: resolve(data_loader.load(name)[name_col]),
+    )
+
+
+def attach_codes(df: pd.DataFrame, name_col: str, codes: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Salinan `df` dengan kolom region_code; `codes` (sejajar index df) dipakai jika sudah dihitung."""
+    codes = resolve(df[name_col]) if codes is None else codes.reindex(df.index)
+    return df.assign(**{CODE_COL: codes})
+
+
+def join(df: pd.DataFrame, name_col: str, codes: Optional[pd.Series] = None) -> "tuple[pd.DataFrame, JoinReport]":
+    """Dimensi (semua wilayah, urut fid) LEFT JOIN `df` lewat kode integer + laporan baris bermasalah.
+
+    Kode ganda di `df` (mis. baris duplikat) → baris pertama dipakai, sisanya dilaporkan.
+    """
+    coded = attach_codes(df, name_col, codes)
+    report = JoinReport()
+    report.unmatched = coded.loc[coded[CODE_COL].isna(), name_col].astype(str).tolist()
+    coded = coded.dropna(subset=[CODE_COL])
+    dup = coded[CODE_COL].duplicated(keep="first")
+    report.duplicates = coded.loc[dup, name_col].astype(str).tolist()
+    coded = coded[~dup]
+
+    # kode unik di kedua sisi → reindex ke urutan dimensi (setara LEFT JOIN, tanpa merge string)
+    dim = dimension()
+    codes = dim[CODE_COL].to_numpy()
+    data = coded.set_index(coded[CODE_COL].astype("int64").to_numpy()).drop(columns=CODE_COL).reindex(codes)
+    report.missing = dim.loc[~dim[CODE_COL].isin(coded[CODE_COL].astype("int64")), "region_name"].tolist()
+    return pd.concat([dim, data.reset_index(drop=True)], axis=1), report
+
+
+if __name__ == "__main__":
+    _joined, _report = join(data_loader.load("cluster"), "nama_kabupaten_kota")
+    print(dimension().to_string(index=False))
+    print(f"\nCluster-ABT-v2.csv → {_joined['nama_kabupaten_kota'].notna().sum()}/{len(_joined)} wilayah terisi")
+    print(f"  tidak dikenali : {_report.unmatched}")
+    print(f"  kode ganda     : {_report.duplicates}")
+    print(f"  tanpa data     : {_report.missing}")
@@ -0,0 +1,135 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Simulation-based Forecast Intervals — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Interval di CSV hanya 95%. Modul ini membangkitkan N_PATHS jalur masa depan per target lewat
+# residual bootstrap dan menyimpan grid kuantil (QUANTILES × horizon), sehingga band 50/80/95% atau
+# fan chart tinggal dibaca dari grid — tanpa fit ulang.
+#
+# Semua model kandidat linear dalam error (S-Naive, ETS aditif, SARIMA), jadi jalur ke-h dapat ditulis
+#   y(T+h) = ŷ(T+h) + Σ_j psi_j · e(T+h-j),  psi_0 = 1
+# dengan e = residual in-sample yang di-resample. Satu batch: E [N_PATHS × H] @ Psi^T [H × H].
+#   - S-Naive : psi_j = 1 jika j kelipatan m
+#   - ETS     : psi_j = alpha + beta·j + gamma·[j mod m = 0]   (Hyndman et al., 2008)
+#   - SARIMA  : impulse response model state space
+#   - model lain (mis. LightGBM global): psi_j = 1 (random walk, sama dengan interval sqrt(h) model
+#     itu), bentuk distribusi dari selisih bulanan, skala dicocokkan ke interval langkah-1 di store.
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, forecast_artifact, forecast_store, forecasting, panel
+
+N_PATHS = 5000
+SEED = 2024
+BAND_LEVELS = (50, 80, 95)                          # pilihan band di UI (persen)
+FAN_LEVELS = (10, 20, 30, 40, 50, 60, 70, 80, 90, 95)
+QUANTILES = tuple(sorted({round(q, 4) for lv in FAN_LEVELS for q in ((1 - lv / 100) / 2, (1 + lv / 100) / 2)} | {0.5}))
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Residual & bobot psi per model
+# ------------------------------- | ------------------------------- | -------------------------------
+def residuals(fitted) -> np.ndarray:
+    """Residual in-sample model terfit (tanpa periode burn-in/inisialisasi)."""
+    if isinstance(fitted, forecasting.SeasonalNaive):
+        resid = fitted.values[fitted.m:] - fitted.values[:-fitted.m]
+    else:
+        result = fitted.result
+        resid = np.asarray(result.resid, dtype=float)[getattr(result, "loglikelihood_burn", 0):]
+    resid = resid[np.isfinite(resid)]
+    return resid - resid.mean()
+
+
+def psi_weights(fitted, horizon: int) -> np.ndarray:
+    """Bobot psi_0..psi_{H-1} (respon forecast langkah-h terhadap error langkah-1)."""
+    steps = np.arange(horizon)
+    m = forecasting.SEASONAL_PERIOD
+    if isinstance(fitted, forecasting.SeasonalNaive):
+        return (steps % fitted.m == 0).astype(float)
+    result = fitted.result
+    if hasattr(result, "impulse_responses"):                  # SARIMAX
+        return np.asarray(result.impulse_responses(steps=horizon - 1), dtype=float).ravel()[:horizon]
+    params = dict(zip(result.model.param_names, np.asarray(result.params, dtype=float)))
+    psi = (params.get("smoothing_level", 0.0)
+           + params.get("smoothing_trend", 0.0) * steps
+           + params.get("smoothing_seasonal", 0.0) * ((steps % m == 0) & (steps > 0)))
+    psi[0] = 1.0
+    return psi
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Simulasi batch & grid kuantil
+# ------------------------------- | ------------------------------- | -------------------------------
+def simulate_paths(yhat: np.ndarray, resid: np.ndarray, psi: np.ndarray,
+                   n_paths: int = N_PATHS, seed: int = SEED) -> np.ndarray:
+    """Jalur masa depan [n_paths × H] = ŷ + E @ Psi^T; indikator non-negatif → di-clip ke 0."""
+    horizon = len(yhat)
+    rng = np.random.default_rng(seed)
+    shocks = rng.choice(resid, size=(n_paths, horizon), replace=True)
+    lag = np.arange(horizon)[:, None] - np.arange(horizon)[None, :]          # Psi[i, k] = psi_{i-k}
+    Psi = np.where(lag >= 0, psi[np.clip(lag, 0, None)], 0.0)
+    return np.clip(yhat[None, :] + shocks @ Psi.T, 0, None)
+
+
+def quantile_frame(paths: np.ndarray, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """Grid kuantil: index date, satu kolom per kuantil di QUANTILES."""
+    grid = np.quantile(paths, QUANTILES, axis=0)
+    return pd.DataFrame(grid.T, index=pd.DatetimeIndex(dates, name="date"), columns=list(QUANTILES))
+
+
+def band(grid: pd.DataFrame, level: int) -> Tuple[pd.Series, pd.Series]:
+    """(lower, upper) band `level`% dari grid kuantil."""
+    lo, up = round((1 - level / 100) / 2, 4), round((1 + level / 100) / 2, 4)
+    return grid[lo], grid[up]
+
+
+def _simulate(target: str, region: str, source: str) -> Optional[pd.DataFrame]:
+    item = forecast_store.store_for(source, region).get(target, region)
+    if item is None:
+        return None
+    frame = panel.region_frame(region, columns=["Date", target])
+    y = forecasting.prepare_series(frame, target).loc[:item.last_obs]
+    yhat = item.series.to_numpy(dtype=float)
+
+    if item.model in forecasting.MODELS and len(y) >= forecasting.MODELS[item.model].min_obs:
+        fitted = forecasting.fit_model(item.model, y)
+        resid, psi = residuals(fitted), psi_weights(fitted, len(yhat))
+    else:
+        # model tanpa representasi linear: random walk, skala = interval langkah-1 model itu
+        diff = np.diff(y.to_numpy(dtype=float))
+        lower, upper = item.interval()
+        sigma = float(upper.iloc[0] - lower.iloc[0]) / (2 * forecasting.Z_95)
+        resid = (diff - diff.mean()) / (diff.std(ddof=1) or 1.0) * sigma
+        psi = np.ones(len(yhat))
+    if not len(resid):
+        return None
+    return quantile_frame(simulate_paths(yhat, resid, psi), item.frame.index)
+
+
+def quantile_grid(target: str, region: str = panel.PROVINCE, source: str = "offline") -> Optional[pd.DataFrame]:
+    """Grid kuantil simulasi satu target, di-cache per (source, region, target) & versi file sumber.
+
+    Cache mengikuti SEMUA file sumber `source` (forecast_results.csv yang ditulis ulang → grid dihitung ulang)
+    plus sumber panel ABT, karena residual bootstrap difit dari histori panel.region_frame.
+    Hasil di-share lintas session → jangan diubah in-place. None jika target tidak ada di store.
+    """
+    name = forecast_artifact.SOURCES[source][0]
+    paths = list(dict.fromkeys([*forecast_artifact.source_paths(source), *panel.source_paths()]))
+    return data_loader.cached_read(
+        f"{name}:quantiles[{source}|{region}|{target}]", paths,
+        lambda _p: _simulate(target, region, source),
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    for _target in forecasting.TARGET_COLS:
+        t0 = time.perf_counter()
+        _grid = quantile_grid(_target)
+        if _grid is None:
+            continue
+        _lo, _up = band(_grid, 95)
+        print(f"{_target:<12} {len(_grid)} bulan × {len(QUANTILES)} kuantil ({(time.perf_counter() - t0) * 1000:.0f} ms) "
+              f"95% langkah-1: [{_lo.iloc[0]:.2f}, {_up.iloc[0]:.2f}]")
@@ -0,0 +1,171 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Spatial Index (STRtree) — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Penempatan titik (puskesmas / RS / fasilitas lain) ke polygon kab/kota jatim_kabkota.geojson.
+#   - STRtree shapely 2 atas geometri resolusi penuh dibangun SEKALI per versi GeoJSON (cache proses);
+#   - assign_points: semua titik sekaligus lewat tree.query(points, predicate="within"); titik yang
+#     jatuh tepat di luar garis pantai/batas di-snap ke polygon terdekat dalam SNAP_DEG;
+#   - aggregate: streaming per chunk (mis. pd.read_csv(chunksize=...)) — tiap chunk di-assign lalu
+#     dijumlah dengan np.bincount ke array per wilayah, jadi memori tidak tumbuh dengan jumlah titik.
+#     Yang dijumlah hanya kolom nilai yang disebut eksplisit (VALUE_COLS / `value_cols`): kolom numerik
+#     lain bisa saja ID (kode_faskes) yang tidak bermakna bila dijumlah.
+# Hasilnya ber-key region_code (utils.regions) dan langsung bisa di-join ke tabel peta cluster.
+#
+#   python -m utils.spatial data/Fasilitas_Kesehatan.csv      # agregasi file fasilitas per kab/kota
+import argparse
+import pathlib
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader, regions
+
+LON_COL, LAT_COL = "longitude", "latitude"
+CATEGORY_COL = "jenis"                 # opsional: jumlah fasilitas per jenis (Puskesmas, RS, …)
+COUNT_COL = "n_fasilitas"
+CATEGORY_PREFIX = "n_jenis_"           # kolom hitung per jenis → tidak bisa bertabrakan dengan COUNT_COL
+VALUE_COLS = ("tempat_tidur",)         # kolom nilai yang dijumlah per wilayah jika ada di file
+SNAP_DEG = 0.01                        # ± 1 km; titik di luar semua polygon tapi sedekat ini tetap di-assign
+CHUNKSIZE = 50_000
+
+
+@dataclass
+class SpatialIndex:
+    version: str
+    tree: object                 # shapely.STRtree atas geometri EPSG:4326 (urutan = fid)
+    codes: np.ndarray            # region_code per geometri di tree
+
+    def assign_points(self, lon: np.ndarray, lat: np.ndarray, snap_deg: float = SNAP_DEG) -> np.ndarray:
+        """region_code tiap titik (-1 jika di luar semua polygon & di luar jarak snap)."""
+        import shapely
+
+        points = shapely.points(np.asarray(lon, dtype=float), np.asarray(lat, dtype=float))
+        out = np.full(len(points), -1, dtype=np.int64)
+        pt_idx, geom_idx = self.tree.query(points, predicate="within")
+        # titik tepat di batas dua polygon → polygon pertama (urutan query)
+        first = np.unique(pt_idx, return_index=True)[1]
+        out[pt_idx[first]] = self.codes[geom_idx[first]]
+
+        missing = np.flatnonzero((out < 0) & ~shapely.is_missing(points) & ~np.isnan(np.asarray(lat, dtype=float)))
+        if snap_deg and len(missing):
+            near_pt, near_geom = self.tree.query_nearest(points[missing], max_distance=snap_deg, all_matches=False)
+            out[missing[near_pt]] = self.codes[near_geom]
+        return out
+
+
+def _build_index(path) -> SpatialIndex:
+    import geopandas as gpd
+    import shapely
+
+    gdf = gpd.read_file(path)
+    gdf = gdf.to_crs(epsg=4326) if gdf.crs is not None else gdf.set_crs(epsg=4326)
+    gdf = gdf.reset_index(drop=True)
+    geoms = gdf.geometry.values
+    shapely.prepare(geoms)                      # predicate within/contains lebih cepat di geometri prepared
+    return SpatialIndex(
+        version=data_loader.file_digest(path),
+        tree=shapely.STRtree(geoms),
+        codes=gdf["CC_2"].astype(np.int64).to_numpy(),
+    )
+
+
+def get_index() -> SpatialIndex:
+    """STRtree kab/kota, dibangun sekali per versi jatim_kabkota.geojson."""
+    return data_loader.cached_read(
+        "geo_kabkota:strtree", data_loader.dataset_path("geo_kabkota"), _build_index
+    )
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Agregasi streaming ke tabel kab/kota
+# ------------------------------- | ------------------------------- | -------------------------------
+def aggregate(chunks: Union[pd.DataFrame, Iterable[pd.DataFrame]], value_cols: Sequence[str] = (),
+              lon_col: str = LON_COL, lat_col: str = LAT_COL,
+              category_col: Optional[str] = CATEGORY_COL) -> "tuple[pd.DataFrame, int]":
+    """(tabel per wilayah, jumlah titik di luar Jawa Timur).
+
+    Tabel: region_code + n_fasilitas + n_jenis_<jenis> (jika ada kolom jenis) + jumlah tiap kolom di
+    `value_cols` (hanya yang disebut; tidak ada di chunk → error), urut sesuai regions.dimension().
+    """
+    clash = [c for c in value_cols if c == COUNT_COL or c.startswith(CATEGORY_PREFIX)]
+    if clash:
+        raise ValueError(f"Nama kolom nilai bentrok dengan kolom hitung: {clash}")
+    index = get_index()
+    dim_codes = regions.dimension()[regions.CODE_COL].to_numpy()
+    position = pd.Series(np.arange(len(dim_codes)), index=dim_codes)
+    n_regions = len(dim_codes)
+
+    counts = np.zeros(n_regions)
+    sums: dict = {}
+    by_category: dict = {}
+    outside = 0
+    for chunk in ([chunks] if isinstance(chunks, pd.DataFrame) else chunks):
+        codes = index.assign_points(chunk[lon_col].to_numpy(), chunk[lat_col].to_numpy())
+        pos = position.reindex(codes).to_numpy()
+        inside = ~np.isnan(pos)
+        outside += int((~inside).sum())
+        pos = pos[inside].astype(np.int64)
+
+        counts += np.bincount(pos, minlength=n_regions)
+        for col in value_cols:
+            values = np.nan_to_num(chunk[col].to_numpy(dtype=float)[inside])
+            sums[col] = sums.get(col, 0.0) + np.bincount(pos, weights=values, minlength=n_regions)
+        if category_col and category_col in chunk.columns:
+            cats = chunk[category_col].astype("string").fillna("lainnya").to_numpy()[inside]
+            for cat in np.unique(cats):
+                key = CATEGORY_PREFIX + str(cat).strip().lower().replace(" ", "_")
+                by_category[key] = by_category.get(key, 0.0) + np.bincount(pos[cats == cat], minlength=n_regions)
+
+    out = pd.DataFrame({regions.CODE_COL: dim_codes, COUNT_COL: counts.astype(np.int64)})
+    for key, arr in sorted(by_category.items()):
+        out[key] = np.asarray(arr).astype(np.int64)
+    for col, arr in sums.items():
+        out[col] = arr
+    return out, outside
+
+
+def aggregate_csv(path: pathlib.Path, value_cols: Optional[Sequence[str]] = None,
+                  chunksize: int = CHUNKSIZE) -> "tuple[pd.DataFrame, int]":
+    """Agregasi file CSV titik fasilitas per chunk (tanpa memuat seluruh file).
+
+    `value_cols` None → kolom VALUE_COLS yang ada di header file.
+    """
+    if value_cols is None:
+        value_cols = [c for c in VALUE_COLS if c in _columns_of(path)]
+    return aggregate(pd.read_csv(path, chunksize=chunksize), value_cols)
+
+
+def facility_table() -> Optional[pd.DataFrame]:
+    """Agregat dataset opsional `facilities` per kab/kota (None jika file belum ada), di-cache per versi file."""
+    path = data_loader.dataset_path("facilities")
+    if not path.is_file():
+        return None
+    return data_loader.cached_read("facilities:by_region", path, lambda p: aggregate_csv(p)[0])
+
+
+def _columns_of(path: pathlib.Path) -> List[str]:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Agregasi titik fasilitas ke kab/kota (STRtree).")
+    parser.add_argument("csv", nargs="?", default=str(data_loader.dataset_path("facilities")))
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--sum", nargs="*", default=None, metavar="KOLOM",
+                        help=f"kolom nilai yang dijumlah per kab/kota (default: {', '.join(VALUE_COLS)} jika ada)")
+    args = parser.parse_args()
+
+    src = pathlib.Path(args.csv)
+    missing_cols = {LON_COL, LAT_COL} - set(_columns_of(src))
+    if missing_cols:
+        raise SystemExit(f"{src.name}: kolom {sorted(missing_cols)} tidak ada")
+    t0 = time.perf_counter()
+    table, n_out = aggregate_csv(src, args.sum, chunksize=args.chunksize)
+    table = regions.dimension()[[regions.CODE_COL, "region_name"]].merge(table, on=regions.CODE_COL)
+    print(table.to_string(index=False))
+    print(f"\n{int(table[COUNT_COL].sum())} titik ter-assign, {n_out} di luar Jawa Timur "
+          f"({time.perf_counter() - t0:.2f} s)")
@@ -0,0 +1,190 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Bootstrap Cluster Stability — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Seberapa yakin label "Warning" vs "Perlu Diperhatikan" sebuah kab/kota? Clustering (utils.clustering)
+# dijalankan ulang di N_BOOT resample bootstrap baris data; tiap run:
+#   fit k-means di resample → assign SEMUA kab/kota ke centroid terdekat → kode diurutkan dari
+#   indeks_kesehatan (sama seperti clustering.cluster, jadi kode antar run sebanding).
+# Dari matriks label [N_BOOT × n]:
+#   - co-assignment P[i, j] = proporsi run di mana i & j satu cluster (one-hot einsum, satu pass)
+#   - confidence[i]         = proporsi run dengan label sama dengan label referensi
+#   - cohesion[i]           = rata-rata P[i, j] terhadap anggota cluster referensinya
+#
+# Run bootstrap dibagi per chunk seed ke ProcessPoolExecutor. Hasil di-cache di disk (.npz) per hash
+# (isi file cluster + fitur + k + N_BOOT) dan di memori; `get_or_start` menjalankan komputasi di
+# thread latar belakang sehingga UI tidak menunggu — hover peta menampilkan confidence saat siap.
+#
+#   python -m utils.stability --k 4        # hitung & tampilkan kab/kota dengan label paling tidak stabil
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import clustering, data_loader, storage
+
+N_BOOT = 200
+BOOT_N_INIT = 3             # k-means per resample cukup beberapa init (yang dicari variasinya)
+SEED = 7
+CACHE_DIR = storage.PARQUET_DIR / "cluster_stability"
+STABILITY_VERSION = "1"
+
+_RESULTS: Dict[str, "StabilityResult"] = {}
+_RUNNING: Dict[str, threading.Thread] = {}
+_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class StabilityResult:
+    coassign: np.ndarray        # [n × n] probabilitas satu cluster
+    confidence: np.ndarray      # [n] P(label bootstrap = label referensi)
+    cohesion: np.ndarray        # [n] rata-rata co-assignment dengan anggota cluster referensi
+    n_boot: int
+
+    def frame(self, index: pd.Index) -> pd.DataFrame:
+        return pd.DataFrame({"label_confidence": self.confidence, "label_cohesion": self.cohesion}, index=index)
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Bootstrap
+# ------------------------------- | ------------------------------- | -------------------------------
+def _run_chunk(task: Tuple[np.ndarray, np.ndarray, int, List[int]]) -> np.ndarray:
+    """Label terurut [len(seeds) × n] untuk satu chunk seed bootstrap."""
+    Z, rank_values, k, seeds = task
+    n = len(Z)
+    out = np.empty((len(seeds), n), dtype=np.int8)
+    for row, seed in enumerate(seeds):
+        idx = np.random.default_rng(seed).integers(n, size=n)
+        _, C, _ = clustering.kmeans(Z[idx], k, n_init=BOOT_N_INIT, seed=seed)
+        out[row] = clustering.rank_labels(clustering.assign(Z, C), rank_values, k)
+    return out
+
+
+def bootstrap_labels(Z: np.ndarray, rank_values: np.ndarray, k: int, n_boot: int = N_BOOT,
+                     workers: Optional[int] = None) -> np.ndarray:
+    """Matriks label [n_boot × n]; resample dibagi per chunk ke process pool (serial jika 1 worker)."""
+    seeds = [SEED + b for b in range(n_boot)]
+    workers = workers or min(n_boot, os.cpu_count() or 1)
+    chunks = [seeds[i::workers] for i in range(workers)]
+    tasks = [(Z, rank_values, k, chunk) for chunk in chunks if chunk]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, tasks))
+    else:
+        parts = [_run_chunk(task) for task in tasks]
+    return np.concatenate(parts, axis=0)
+
+
+def summarize(labels: np.ndarray, reference: np.ndarray, k: int) -> StabilityResult:
+    """Co-assignment, confidence & cohesion dari matriks label bootstrap."""
+    onehot = np.eye(k, dtype=np.float32)[labels]                     # [B × n × k]
+    coassign = np.einsum("bik,bjk->ij", onehot, onehot) / len(labels)
+    confidence = (labels == reference[None, :]).mean(axis=0)
+    same = reference[:, None] == reference[None, :]
+    np.fill_diagonal(same, False)
+    cohesion = np.where(same.any(1), (coassign * same).sum(1) / np.maximum(same.sum(1), 1), 1.0)
+    return StabilityResult(coassign, confidence, cohesion, len(labels))
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Cache (disk + memori) & eksekusi latar belakang
+# ------------------------------- | ------------------------------- | -------------------------------
+def _digest(columns: Sequence[str], k: int, n_boot: int) -> str:
+    h = hashlib.sha1(json.dumps([STABILITY_VERSION, list(columns), k, n_boot, BOOT_N_INIT, SEED]).encode())
+    h.update(data_loader.file_digest(data_loader.dataset_path("cluster")).encode())
+    return h.hexdigest()
+
+
+def _cache_path(digest: str) -> pathlib.Path:
+    return CACHE_DIR / f"{digest[:16]}.npz"
+
+
+def _load(path: pathlib.Path) -> Optional[StabilityResult]:
+    try:
+        with np.load(path) as npz:
+            return StabilityResult(npz["coassign"], npz["confidence"], npz["cohesion"], int(npz["n_boot"]))
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def compute(groups: Sequence[str] = clustering.DEFAULT_GROUPS, k: int = clustering.DEFAULT_K,
+            n_boot: int = N_BOOT, workers: Optional[int] = None) -> StabilityResult:
+    """Stabilitas untuk konfigurasi (fitur, k); dibaca dari cache disk jika ada."""
+    columns = clustering.feature_columns(groups)
+    digest = _digest(columns, k, n_boot)
+    path = _cache_path(digest)
+    result = _load(path) if path.is_file() else None
+    if result is None:
+        Z = clustering.standardized()[columns].to_numpy()
+        rank_values = np.nan_to_num(data_loader.load("cluster")[clustering.RANK_COL].to_numpy(dtype=float))
+        reference = clustering.cluster(groups, k).labels
+        result = summarize(bootstrap_labels(Z, rank_values, k, n_boot, workers), reference, k)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez_compressed(tmp, coassign=result.coassign, confidence=result.confidence,
+                            cohesion=result.cohesion, n_boot=result.n_boot)
+        tmp.replace(path)
+    with _LOCK:
+        _RESULTS[digest] = result
+    return result
+
+
+def get_or_start(groups: Sequence[str] = clustering.DEFAULT_GROUPS,
+                 k: int = clustering.DEFAULT_K) -> Optional[StabilityResult]:
+    """Hasil jika sudah ada (memori/disk); jika belum, mulai hitung di thread latar belakang & return None."""
+    digest = _digest(clustering.feature_columns(groups), k, N_BOOT)
+    with _LOCK:
+        if digest in _RESULTS:
+            return _RESULTS[digest]
+        running = _RUNNING.get(digest)
+        if running is not None and (running.is_alive() or running.ident is None):   # ident None: terdaftar, belum start
+            return None
+        # daftar dulu di critical section yang sama dengan cek di atas → session lain tidak memulai bootstrap kedua
+        thread = threading.Thread(target=compute, args=(list(groups), k), name=f"cluster-stability-{digest[:8]}",
+                                  daemon=True)
+        _RUNNING[digest] = thread
+
+    try:
+        path = _cache_path(digest)
+        result = _load(path) if path.is_file() else None
+        if result is not None:
+            with _LOCK:
+                _RESULTS[digest] = result
+                _RUNNING.pop(digest, None)
+            return result
+
+        # data & z-score sudah dimuat di thread UI → thread latar belakang hanya menjalankan bootstrap
+        clustering.standardized()
+        clustering.cluster(groups, k)
+    except BaseException:
+        with _LOCK:
+            _RUNNING.pop(digest, None)
+        raise
+    thread.start()
+    return None
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Stabilitas label cluster via bootstrap.")
+    parser.add_argument("--k", type=int, default=clustering.DEFAULT_K)
+    parser.add_argument("--n-boot", type=int, default=N_BOOT)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    res = compute(k=args.k, n_boot=args.n_boot, workers=args.workers)
+    df = data_loader.load("cluster")
+    out = res.frame(df.index).assign(
+        nama=df[clustering.NAME_COL], label=clustering.cluster(k=args.k).label_series(df.index)
+    ).sort_values("label_confidence")
+    print(out.head(10).round(3).to_string(index=False))
+    print(f"\n{res.n_boot} bootstrap dalam {time.perf_counter() - t0:.1f} s")
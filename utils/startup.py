@@ -0,0 +1,134 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Startup — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# 1) Konfigurasi global (warnings, opsi display pandas) yang cukup dijalankan sekali per proses.
+# 2) Laporan import-time (`python -X importtime`) & pengukuran cold start halaman Home,
+#    plus cek budget yang gagal (exit code 1) jika cold start melewati batas.
+#
+# Pakai di CI / sebelum deploy:
+#   python -m utils.startup                # laporan + cek budget default
+#   python -m utils.startup --budget 6.5   # budget cold start (detik)
+#   NUTRIHEALTH_STARTUP_BUDGET_S=6.5 python -m utils.startup
+#   python -m pytest tests/test_startup.py # cek budget yang sama sebagai test
+import argparse
+import os
+import re
+import subprocess
+import sys
+import warnings
+from typing import Dict, Iterable, List, Optional
+
+from utils.data_loader import ROOT_DIR
+
+HOME_SCRIPT = ROOT_DIR / "1_🏠_Home.py"
+DEFAULT_BUDGET_S = 10.0
+
+# Modul yang diimport di jalur request Home (untuk laporan import-time)
+REQUEST_PATH_MODULES = [
+    "streamlit", "pandas", "numpy", "pyarrow", "plotly.graph_objects", "plotly.express",
+    "geopandas", "shapely", "PIL",
+]
+
+_CONFIGURED = False
+
+
+def configure_once() -> None:
+    """Set opsi global proses (warnings & display pandas) sekali saja, bukan di setiap rerun."""
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+    import pandas as pd
+
+    # Silence warnings
+    warnings.filterwarnings("ignore")
+
+    # Pandas display options
+    pd.set_option("display.max_columns", None)
+    # pd.set_option("display.max_rows", None)
+    pd.set_option("display.float_format", lambda x: f"{x:.4f}")
+    _CONFIGURED = True
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Import-time report
+# ------------------------------- | ------------------------------- | -------------------------------
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(modules: Iterable[str] = REQUEST_PATH_MODULES) -> List[Dict]:
+    """Waktu import kumulatif (detik) tiap modul, diukur di interpreter baru (cold) satu per satu."""
+    rows = []
+    for mod in modules:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {mod}"],
+            capture_output=True, text=True, cwd=ROOT_DIR,
+        )
+        if proc.returncode != 0:
+            rows.append({"module": mod, "cumulative_s": None, "error": proc.stderr.strip().splitlines()[-1]})
+            continue
+        cumulative = 0
+        for line in proc.stderr.splitlines():
+            m = _IMPORTTIME_RE.match(line)
+            if m and m.group(4) == mod:
+                cumulative = int(m.group(2))
+        rows.append({"module": mod, "cumulative_s": cumulative / 1e6, "error": None})
+    return sorted(rows, key=lambda r: -(r["cumulative_s"] or 0))
+
+
+# ------------------------------- | ------------------------------- | -------------------------------
+# Cold start Home
+# ------------------------------- | ------------------------------- | -------------------------------
+_COLD_START_SNIPPET = """
+import time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({script!r}, default_timeout=300)
+at.session_state["welcomed"] = True   # lewati dialog sambutan (interaktif)
+at.run()
+elapsed = time.perf_counter() - t0
+if at.exception:
+    raise SystemExit("Home gagal dirender: " + str(at.exception[0].value))
+print(f"COLD_START_S={{elapsed:.4f}}")
+"""
+
+
+def cold_start_seconds(script=HOME_SCRIPT) -> float:
+    """Waktu render pertama Home (import + data + figure) di interpreter baru via AppTest."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _COLD_START_SNIPPET.format(script=str(script))],
+        capture_output=True, text=True, cwd=ROOT_DIR,
+    )
+    m = re.search(r"COLD_START_S=([\d.]+)", proc.stdout)
+    if proc.returncode != 0 or not m:
+        raise RuntimeError(f"Cold start gagal diukur:\n{proc.stderr[-2000:]}")
+    return float(m.group(1))
+
+
+def budget_seconds() -> float:
+    """Budget cold start (detik): env NUTRIHEALTH_STARTUP_BUDGET_S, default DEFAULT_BUDGET_S."""
+    return float(os.getenv("NUTRIHEALTH_STARTUP_BUDGET_S", DEFAULT_BUDGET_S))
+
+
+def check_budget(budget_s: Optional[float] = None) -> bool:
+    """Cetak laporan import-time + cold start; True jika cold start masih di dalam budget."""
+    if budget_s is None:
+        budget_s = budget_seconds()
+
+    print("Import time (cold, kumulatif):")
+    for row in import_times():
+        if row["error"]:
+            print(f"  {row['module']:<22} ERROR {row['error']}")
+        else:
+            print(f"  {row['module']:<22} {row['cumulative_s']:7.3f} s")
+
+    elapsed = cold_start_seconds()
+    ok = elapsed <= budget_s
+    print(f"\nCold start Home: {elapsed:.2f} s (budget {budget_s:.2f} s) → {'OK' if ok else 'MELEBIHI BUDGET'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Laporan import-time & cek budget cold start Home.")
+    parser.add_argument("--budget", type=float, default=None, help="Budget cold start (detik).")
+    args = parser.parse_args()
+    sys.exit(0 if check_budget(args.budget) else 1)
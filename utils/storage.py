@@ -0,0 +1,141 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Columnar Storage (Parquet/Arrow) — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# CSV sumber tetap jadi "source of truth"; modul ini mengonversinya ke Parquet dengan dtype final
+# (timestamp native, float32, categorical) supaya dashboard tidak perlu parsing tanggal berulang
+# dan cukup membaca kolom yang dibutuhkan tiap section.
+#
+# Konversi manual (opsional, loader juga otomatis rebuild jika CSV berubah):
+#   python -m utils.storage
+import pathlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import data_loader
+
+PARQUET_DIR = data_loader.DATA_DIR / "parquet"
+SOURCE_HASH_KEY = b"nutrihealth.source_sha1"
+
+# Aturan tipe per dataset: kolom tanggal (+ format) & kolom kategori; kolom numerik lain → float32
+SCHEMAS: Dict[str, Dict] = {
+    "abt": {
+        "dates": {"Date": "%Y-%m"},
+        "categoricals": [],
+    },
+    "abt_kabkota": {
+        "dates": {"Date": "%Y-%m"},
+        "categoricals": [],
+    },
+    "merged_forecast": {
+        "dates": {"Date": "%Y-%m-%d"},
+        "categoricals": ["BOR_status", "TOI_status"],
+    },
+    "forecast_results": {
+        "dates": {"date": "%Y-%m-%d", "last_obs": "%Y-%m-%d"},
+        "categoricals": ["target", "model"],
+    },
+}
+
+
+def parquet_path(name: str) -> pathlib.Path:
+    return PARQUET_DIR / f"{name}.parquet"
+
+
+def apply_schema(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Cast DataFrame mentah (hasil read_csv) ke dtype final sesuai SCHEMAS."""
+    schema = SCHEMAS[name]
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in schema["dates"]:
+            out[col] = pd.to_datetime(s, format=schema["dates"][col], errors="coerce")
+        elif col in schema["categoricals"]:
+            out[col] = s.astype("category")
+        elif pd.api.types.is_numeric_dtype(s):
+            out[col] = s.astype(np.float32)
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def _source_digest_of_parquet(path: pathlib.Path) -> Optional[str]:
+    import pyarrow.parquet as pq
+
+    if not path.is_file():
+        return None
+    meta = pq.read_schema(path).metadata or {}
+    value = meta.get(SOURCE_HASH_KEY)
+    return value.decode() if value else None
+
+
+def convert(name: str) -> pathlib.Path:
+    """Konversi CSV dataset `name` ke Parquet bertipe; hash CSV disimpan di metadata file."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    src = data_loader.dataset_path(name)
+    typed = apply_schema(name, pd.read_csv(src))
+    table = pa.Table.from_pandas(typed, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[SOURCE_HASH_KEY] = data_loader.file_digest(src).encode()
+
+    PARQUET_DIR.mkdir(parents=True, exist_ok=True)
+    dst = parquet_path(name)
+    tmp = dst.with_suffix(".parquet.tmp")
+    pq.write_table(table.replace_schema_metadata(meta), tmp, compression="zstd")
+    tmp.replace(dst)  # atomic: reader lain tidak pernah melihat file setengah jadi
+    return dst
+
+
+def ensure_fresh(name: str) -> pathlib.Path:
+    """Pastikan Parquet ada & sinkron dengan CSV sumber (dibandingkan via hash konten)."""
+    dst = parquet_path(name)
+    src_digest = data_loader.file_digest(data_loader.dataset_path(name))
+    if _source_digest_of_parquet(dst) != src_digest:
+        convert(name)
+    return dst
+
+
+def _read(name: str, columns: Optional[List[str]]) -> pd.DataFrame:
+    try:
+        path = ensure_fresh(name)
+        return pd.read_parquet(path, columns=columns, engine="pyarrow")
+    except OSError:
+        # folder data read-only (mis. deploy tertentu) → fallback: CSV + cast di memori
+        df = apply_schema(name, pd.read_csv(data_loader.dataset_path(name)))
+        return df[columns] if columns is not None else df
+
+
+def load_table(name: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Baca dataset bertipe (hanya `columns` jika diberikan), di-cache per proses.
+
+    Cache ikut invalid otomatis saat CSV sumber berubah (lihat data_loader.cached_read).
+    Hasilnya di-share lintas session → jangan dimodifikasi in-place.
+    """
+    if name not in SCHEMAS:
+        raise KeyError(f"Dataset '{name}' belum punya skema Parquet. Pilihan: {sorted(SCHEMAS)}")
+    cols = list(columns) if columns is not None else None
+    key = f"{name}:parquet[{','.join(cols) if cols else '*'}]"
+    return data_loader.cached_read(key, data_loader.dataset_path(name), lambda _p: _read(name, cols))
+
+
+def available_columns(name: str) -> List[str]:
+    """Daftar kolom dataset bertipe tanpa membaca datanya (hanya skema Parquet)."""
+    def _read_columns(_p):
+        import pyarrow.parquet as pq
+        try:
+            return list(pq.read_schema(ensure_fresh(name)).names)
+        except OSError:
+            return list(pd.read_csv(data_loader.dataset_path(name), nrows=0).columns)
+
+    return data_loader.cached_read(f"{name}:columns", data_loader.dataset_path(name), _read_columns)
+
+
+if __name__ == "__main__":
+    for _name in SCHEMAS:
+        if not data_loader.dataset_path(_name).is_file():
+            continue
+        _dst = convert(_name)
+        print(f"{_name:<18} -> {_dst.relative_to(data_loader.ROOT_DIR)} ({_dst.stat().st_size / 1024:.1f} KB)")
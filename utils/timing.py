@@ -0,0 +1,201 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# Rerun Timing & Latency Budget — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+# Instrumentasi ringan per rerun: tiap section dibungkus span bernama dengan jenis
+# (data / features / figure / serialize / render). Span dicatat per session, dibandingkan dengan
+# budget (per nama section atau per jenis), dan yang lambat/blocking ditandai otomatis.
+# Overlay debug bersifat opt-in (toggle di sidebar atau query param ?debug=timing).
+#
+# Budget bisa dioverride lewat env, contoh:
+#   NUTRIHEALTH_TIMING_BUDGETS='{"tab:eda": 400, "figure": 150}'
+import contextlib
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+SPAN_KINDS = ("data", "features", "figure", "serialize", "render")
+HISTORY_SIZE = 30
+
+# Budget (ms): key = nama span (prioritas) atau jenis span
+BUDGETS_MS: Dict[str, float] = {
+    # per jenis
+    "data": 150.0,
+    "features": 100.0,
+    "figure": 250.0,
+    "serialize": 150.0,
+    "render": 300.0,
+    # per section
+    "welcome_toasts": 50.0,
+    "sidebar": 50.0,
+    "hero": 30.0,
+    "tab:eda": 1500.0,
+    "tab:forecast": 500.0,
+    "tab:cluster": 1000.0,
+    "fragment:forecast": 300.0,
+    "fragment:cluster": 600.0,
+}
+BUDGETS_MS.update({k: float(v) for k, v in json.loads(os.getenv("NUTRIHEALTH_TIMING_BUDGETS", "{}")).items()})
+
+_CURRENT_KEY = "_timing_current"
+_HISTORY_KEY = "_timing_history"
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    start_ms: float
+    ms: float
+    depth: int
+
+    @property
+    def budget_ms(self) -> Optional[float]:
+        return budget_for(self.name, self.kind)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget_ms is not None and self.ms > self.budget_ms
+
+
+@dataclass
+class RunTimer:
+    label: str
+    started_at: float = field(default_factory=time.time)
+    _t0: float = field(default_factory=time.perf_counter)
+    spans: List[Span] = field(default_factory=list)
+    _depth: int = 0
+
+    @contextlib.contextmanager
+    def span(self, name: str, kind: str = "render") -> Iterator[None]:
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            end = time.perf_counter()
+            self.spans.append(Span(
+                name=name, kind=kind,
+                start_ms=(start - self._t0) * 1000, ms=(end - start) * 1000, depth=self._depth,
+            ))
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def flagged(self) -> List[Span]:
+        return [s for s in self.spans if s.over_budget]
+
+
+def budget_for(name: str, kind: str) -> Optional[float]:
+    """Budget span: nama section lebih spesifik daripada jenis; None = tidak dibatasi."""
+    return BUDGETS_MS.get(name, BUDGETS_MS.get(kind))
+
+
+def _session_state():
+    try:
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        return st.session_state if get_script_run_ctx() is not None else None
+    except Exception:
+        return None
+
+
+def begin_run(label: str = "page") -> RunTimer:
+    """Mulai timer untuk rerun ini (atau rerun fragment); timer sebelumnya masuk history session."""
+    timer = RunTimer(label=label)
+    state = _session_state()
+    if state is not None:
+        history = state.setdefault(_HISTORY_KEY, deque(maxlen=HISTORY_SIZE))
+        previous = state.get(_CURRENT_KEY)
+        if previous is not None and previous.spans:
+            history.append(previous)
+        state[_CURRENT_KEY] = timer
+    return timer
+
+
+def begin_fragment(label: str) -> Optional[RunTimer]:
+    """Timer terpisah untuk rerun fragment saja; saat full rerun span tetap masuk timer halaman."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+    except Exception:
+        return None
+    if ctx is None or not ctx.fragment_ids_this_run:
+        return None
+    return begin_run(label)
+
+
+def is_fragment_run() -> bool:
+    timer = current()
+    return timer is not None and timer.label.startswith("fragment:")
+
+
+def current() -> Optional[RunTimer]:
+    state = _session_state()
+    return state.get(_CURRENT_KEY) if state is not None else None
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "render") -> Iterator[None]:
+    """Span bernama pada timer rerun aktif; no-op di luar Streamlit / sebelum begin_run()."""
+    timer = current()
+    if timer is None:
+        yield
+        return
+    with timer.span(name, kind):
+        yield
+
+
+def debug_enabled() -> bool:
+    import streamlit as st
+
+    return st.session_state.get("debug_timing", False) or st.query_params.get("debug") == "timing"
+
+
+def render_overlay(container=None) -> None:
+    """Overlay debug (default di sidebar): span rerun terakhir + ringkasan history, span lewat budget ditandai."""
+    import pandas as pd
+    import streamlit as st
+
+    timer = current()
+    if timer is None or not debug_enabled():
+        return
+
+    rows = [
+        {
+            "span": ("  " * s.depth) + s.name,
+            "jenis": s.kind,
+            "ms": round(s.ms, 1),
+            "budget": s.budget_ms,
+            "status": "⚠️ lambat" if s.over_budget else "ok",
+        }
+        for s in sorted(timer.spans, key=lambda s: s.start_ms)
+    ]
+    flagged = timer.flagged()
+
+    target = container if container is not None else st.sidebar
+    with target.expander(f"⏱️ Timing rerun ({timer.label}) — {timer.total_ms:.0f} ms", expanded=True):
+        if flagged:
+            st.warning(", ".join(f"{s.name} ({s.ms:.0f} ms)" for s in flagged) + " melewati budget.")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+        history = list(st.session_state.get(_HISTORY_KEY, []))
+        if history:
+            summary = (
+                pd.DataFrame([
+                    {"span": s.name, "ms": s.ms, "over": s.over_budget}
+                    for run in history for s in run.spans
+                ])
+                .groupby("span")
+                .agg(runs=("ms", "size"), p50_ms=("ms", "median"), max_ms=("ms", "max"), over=("over", "sum"))
+                .round(1)
+                .sort_values("max_ms", ascending=False)
+            )
+            st.caption(f"History session ({len(history)} rerun sebelumnya)")
+            st.dataframe(summary, use_container_width=True)
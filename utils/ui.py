@@ -0,0 +1,40 @@
+# ------------------------------- | ------------------------------- | -------------------------------
+# UI Helpers — NutriHealth AI
+# ------------------------------- | ------------------------------- | -------------------------------
+from typing import Sequence
+
+import streamlit as st
+
+
+def lazy_tabs(labels: Sequence[str], key: str = "active_tab") -> str:
+    """Tab bar yang hanya mengeksekusi section aktif.
+
+    `st.tabs` menjalankan SEMUA body tab di setiap rerun; helper ini merender pilihan tab
+    (radio horizontal bergaya tab) dan mengembalikan label aktif, sehingga pemanggil cukup
+    menjalankan fungsi render milik tab tersebut. Pilihan tersimpan di session_state[key].
+    """
+    st.markdown(f"""
+    <style>
+        .st-key-{key} div[role="radiogroup"] {{
+            display: flex;
+            justify-content: center;
+            gap: 8px;
+            border-bottom: 1px solid rgba(49, 51, 63, 0.2);
+        }}
+        .st-key-{key} div[role="radiogroup"] label {{
+            padding: 6px 14px;
+            margin: 0;
+            border-bottom: 3px solid transparent;
+        }}
+        .st-key-{key} div[role="radiogroup"] label:has(input:checked) {{
+            border-bottom-color: #88CD33;
+            font-weight: 600;
+        }}
+        .st-key-{key} div[role="radiogroup"] label > div:first-child {{ display: none; }}
+    </style>
+    """, unsafe_allow_html=True)
+
+    return st.radio(
+        "Section", list(labels),
+        index=0, horizontal=True, key=key, label_visibility="collapsed"
+    )